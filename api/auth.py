@@ -1,81 +1,221 @@
+import base64
+import hashlib
+import hmac
 import os
+import re
 import time
-from typing import Optional, Tuple
+from functools import lru_cache
+from typing import Any, Optional, Tuple
 
 import jwt
-from fastapi import HTTPException, Request
-from google.auth.transport import requests as google_requests
-from google.oauth2 import id_token
+import orjson
+from fastapi import HTTPException
 from loguru import logger
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse
+from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from open_notebook.domain.user import User
+from open_notebook.utils.cache import TTLCache
 
+# Decoded app-JWT claims keyed by (secret, raw token). The SPA sends the same
+# bearer token on every call, so a short TTL saves the HMAC + JSON parse on
+# nearly all requests while still expiring well before the token itself does.
+TOKEN_CACHE_TTL = 5.0
+TOKEN_CACHE_MAXSIZE = 4096
+_token_cache: TTLCache[tuple[str, str], dict] = TTLCache(
+    TOKEN_CACHE_MAXSIZE, ttl=TOKEN_CACHE_TTL
+)
 
-class JWTAuthMiddleware(BaseHTTPMiddleware):
+
+def _b64url_encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64url_decode(segment: bytes) -> bytes:
+    return base64.urlsafe_b64decode(segment + b"=" * (-len(segment) % 4))
+
+
+# Every app JWT carries the same header, so its encoded form is a constant
+_JWT_HEADER_B64 = _b64url_encode(orjson.dumps({"alg": "HS256", "typ": "JWT"}))
+
+
+@lru_cache(maxsize=4)
+def _hmac_template(secret: str) -> "hmac.HMAC":
+    """
+    Keyed HMAC-SHA256 state for `secret`. Callers .copy() it so the key is
+    only encoded and hashed into the inner/outer pads once per secret.
+    """
+    return hmac.new(secret.encode(), digestmod=hashlib.sha256)
+
+
+def _decode_hs256(token: str, secret: str) -> dict:
+    """
+    Minimal HS256 verifier for the tokens issued by issue_app_jwt.
+
+    Skips PyJWT's algorithm dispatch and option handling and parses JSON with
+    orjson. Raises the same PyJWT exception types as jwt.decode so callers
+    can keep catching jwt.InvalidTokenError.
+    """
+    try:
+        header_b64, payload_b64, signature_b64 = token.encode("ascii").split(b".")
+        header = orjson.loads(_b64url_decode(header_b64))
+        signature = _b64url_decode(signature_b64)
+    except ValueError as exc:
+        raise jwt.DecodeError("Invalid token encoding") from exc
+    if not isinstance(header, dict) or header.get("alg") != "HS256":
+        raise jwt.InvalidAlgorithmError("The specified alg value is not allowed")
+
+    signing_input = header_b64 + b"." + payload_b64
+    mac = _hmac_template(secret).copy()
+    mac.update(signing_input)
+    expected = mac.digest()
+    if not hmac.compare_digest(expected, signature):
+        raise jwt.InvalidSignatureError("Signature verification failed")
+
+    try:
+        payload = orjson.loads(_b64url_decode(payload_b64))
+    except ValueError as exc:
+        raise jwt.DecodeError("Invalid payload encoding") from exc
+    if not isinstance(payload, dict):
+        raise jwt.DecodeError("Invalid payload")
+
+    now = time.time()
+    exp = payload.get("exp")
+    if exp is not None:
+        if not isinstance(exp, (int, float)) or isinstance(exp, bool):
+            raise jwt.DecodeError("Expiration Time claim (exp) must be a number")
+        if exp <= now:
+            raise jwt.ExpiredSignatureError("Signature has expired")
+    nbf = payload.get("nbf")
+    if nbf is not None:
+        if not isinstance(nbf, (int, float)) or isinstance(nbf, bool):
+            raise jwt.DecodeError("Not Before claim (nbf) must be a number")
+        if nbf > now:
+            raise jwt.ImmatureSignatureError("The token is not yet valid (nbf)")
+    return payload
+
+
+def decode_app_jwt(token: str, secret: str) -> dict:
+    """
+    Decode and verify an application JWT, reusing recently decoded claims.
+    Raises a PyJWT error (jwt.InvalidTokenError subclass) when the token is invalid.
+    """
+    key = (secret, token)
+    cached = _token_cache.get(key)
+    if cached is not None:
+        return cached
+
+    payload = _decode_hs256(token, secret)
+    ttl = TOKEN_CACHE_TTL
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        ttl = min(ttl, exp - time.time())
+    _token_cache.set(key, payload, ttl=ttl)
+    return payload
+
+
+# 401 bodies never change, so serialize them once
+_MISSING_AUTH_BODY = orjson.dumps({"detail": "Missing authorization header"})
+_INVALID_TOKEN_BODY = orjson.dumps({"detail": "Invalid or expired token"})
+
+
+def _unauthorized(body: bytes) -> Response:
+    return Response(
+        content=body,
+        status_code=401,
+        media_type="application/json",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+class JWTAuthMiddleware:
     """
     Middleware to enforce JWT Bearer authentication.
     Expects Authorization: Bearer <token> where token is signed with AUTH_JWT_SECRET.
+
+    Implemented as a plain ASGI app rather than BaseHTTPMiddleware so requests
+    are not routed through an extra task group and memory streams.
     """
 
-    def __init__(self, app, excluded_paths: Optional[list] = None):
-        super().__init__(app)
-        self.excluded_paths = excluded_paths or [
-            "/",
-            "/health",
-            "/docs",
-            "/openapi.json",
-            "/redoc",
-            "/api/config",
-        ]
-        # Prefixes to bypass auth (all auth endpoints)
-        self.excluded_prefixes = ["/api/auth/"]
+    def __init__(self, app: ASGIApp, excluded_paths: Optional[list] = None):
+        self.app = app
+        self.excluded_paths = frozenset(
+            excluded_paths
+            or [
+                "/",
+                "/health",
+                "/docs",
+                "/openapi.json",
+                "/redoc",
+                "/api/config",
+            ]
+        )
+        # Prefixes to bypass auth (all auth endpoints); a tuple lets
+        # str.startswith check them all in one call
+        self.excluded_prefixes = ("/api/auth/",)
         self.jwt_secret = os.environ.get("AUTH_JWT_SECRET")
         if not self.jwt_secret:
             logger.warning("AUTH_JWT_SECRET not set; authentication will be disabled")
 
-    async def dispatch(self, request: Request, call_next):
-        # Disable auth if secret not configured (dev fallback)
-        if not self.jwt_secret:
-            return await call_next(request)
-
-        # Skip excluded paths/prefixes and OPTIONS
-        if (
-            request.method == "OPTIONS"
-            or request.url.path in self.excluded_paths
-            or any(request.url.path.startswith(prefix) for prefix in self.excluded_prefixes)
-        ):
-            return await call_next(request)
-
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.lower().startswith("bearer "):
-            return JSONResponse(
-                status_code=401,
-                content={"detail": "Missing authorization header"},
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-
-        token = auth_header.split(" ", 1)[1]
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Only HTTP requests are authenticated; lifespan/websocket pass through
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Fast path for CORS preflights and excluded paths (health probes among
+        # them), the most frequent unauthenticated requests
+        path = scope["path"]
+        if scope["method"] == "OPTIONS" or path in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        # Disable auth if secret not configured (dev fallback), and skip
+        # excluded prefixes
+        if not self.jwt_secret or path.startswith(self.excluded_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        # ASGI header names are already lowercased bytes; compare only the
+        # 7-byte scheme prefix instead of lowercasing/splitting the whole value
+        token = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme = value[:7]
+                if scheme == b"Bearer " or scheme.lower() == b"bearer ":
+                    token = value[7:].decode("latin-1")
+                break
+
+        if not token:
+            await _unauthorized(_MISSING_AUTH_BODY)(scope, receive, send)
+            return
+
         try:
-            payload = jwt.decode(token, self.jwt_secret, algorithms=["HS256"])
-            user_id = payload.get("sub")
-            if not user_id:
-                raise ValueError("Missing sub in token")
-
-            # Attach user info to request state for downstream use
-            request.state.user_id = user_id
-            request.state.user_email = payload.get("email")
-            request.state.user_name = payload.get("name")
-        except Exception as exc:  # broad catch to return 401
-            logger.warning(f"JWT validation failed: {exc}")
-            return JSONResponse(
-                status_code=401,
-                content={"detail": "Invalid or expired token"},
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-
-        return await call_next(request)
+            payload = decode_app_jwt(token, self.jwt_secret)
+        except jwt.ExpiredSignatureError:
+            # Routine once a session outlives its token; the client re-logs in
+            logger.debug("JWT expired for {}", path)
+            await _unauthorized(_INVALID_TOKEN_BODY)(scope, receive, send)
+            return
+        except jwt.InvalidTokenError as exc:
+            logger.warning("JWT validation failed: {}", exc)
+            await _unauthorized(_INVALID_TOKEN_BODY)(scope, receive, send)
+            return
+
+        user_id = payload.get("sub")
+        if not user_id:
+            logger.warning("JWT validation failed: missing sub in token")
+            await _unauthorized(_INVALID_TOKEN_BODY)(scope, receive, send)
+            return
+
+        # Attach user info to request state (scope["state"] backs
+        # request.state) for downstream use
+        state = scope.setdefault("state", {})
+        state["user_id"] = user_id
+        state["user_email"] = payload.get("email")
+        state["user_name"] = payload.get("name")
+
+        await self.app(scope, receive, send)
 
 
 def _google_client_id() -> str:
@@ -85,16 +225,86 @@ def _google_client_id() -> str:
     return client_id
 
 
+# Google's signing certs rotate on the order of days; the certs endpoint sends
+# Cache-Control max-age, and this is the fallback when it is missing.
+GOOGLE_CERTS_DEFAULT_TTL = 60 * 60
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class _CachingGoogleRequest:
+    """
+    google-auth transport that memoizes successful GET responses (the cert
+    fetch done by id_token.verify_oauth2_token) for their max-age, so logins
+    don't round-trip to googleapis.com for keys every time.
+
+    google-auth only calls the transport, so this wraps one by duck typing
+    rather than subclassing google.auth.transport.Request at import time.
+    """
+
+    def __init__(self, inner: Any):
+        self._inner = inner
+        self._cache: dict[str, tuple[float, Any]] = {}
+
+    def __call__(self, url, method="GET", body=None, headers=None, timeout=None, **kwargs):
+        if method != "GET" or body is not None:
+            return self._inner(url, method=method, body=body, headers=headers, timeout=timeout, **kwargs)
+
+        now = time.time()
+        cached = self._cache.get(url)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        response = self._inner(url, method=method, headers=headers, timeout=timeout, **kwargs)
+        if response.status == 200:
+            match = _MAX_AGE_RE.search(response.headers.get("Cache-Control", "") or "")
+            ttl = int(match.group(1)) if match else GOOGLE_CERTS_DEFAULT_TTL
+            self._cache[url] = (now + ttl, response)
+        return response
+
+
+_GOOGLE_REQUEST: _CachingGoogleRequest | None = None
+
+
+def _google_request() -> _CachingGoogleRequest:
+    """
+    Shared google-auth transport so cert fetches reuse one requests.Session
+    (and its pooled TLS connections) and the cached certs.
+    """
+    global _GOOGLE_REQUEST
+    if _GOOGLE_REQUEST is None:
+        # Imported lazily: google-auth is only needed on the login path
+        from google.auth.transport import requests as google_requests
+
+        _GOOGLE_REQUEST = _CachingGoogleRequest(google_requests.Request())
+    return _GOOGLE_REQUEST
+
+
+# Verified Google claims keyed by sha256(id_token), kept until the token's
+# own exp so a retried login skips the RSA verification
+GOOGLE_CLAIMS_CACHE_MAXSIZE = 1024
+_google_claims_cache: TTLCache[str, dict] = TTLCache(GOOGLE_CLAIMS_CACHE_MAXSIZE)
+
+
 def verify_google_id_token(raw_id_token: str) -> dict:
     """
     Verify Google ID token and return decoded claims.
     """
+    cache_key = hashlib.sha256(raw_id_token.encode()).hexdigest()
+    cached = _google_claims_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    from google.oauth2 import id_token
+
     try:
         claims = id_token.verify_oauth2_token(
-            raw_id_token, google_requests.Request(), _google_client_id()
+            raw_id_token, _google_request(), _google_client_id()
         )
         if claims.get("iss") not in ("https://accounts.google.com", "accounts.google.com"):
             raise ValueError("Invalid issuer")
+        ttl = claims.get("exp", 0) - time.time()
+        if ttl > 0:
+            _google_claims_cache.set(cache_key, claims, ttl=ttl)
         return claims
     except Exception as exc:
         logger.error(f"Failed to verify Google ID token: {exc}")
@@ -116,7 +326,10 @@ def issue_app_jwt(user: User, expires_in: int = 60 * 60 * 24 * 7) -> str:
         "iat": now,
         "exp": now + expires_in,
     }
-    return jwt.encode(payload, secret, algorithm="HS256")
+    signing_input = _JWT_HEADER_B64 + b"." + _b64url_encode(orjson.dumps(payload))
+    mac = _hmac_template(secret).copy()
+    mac.update(signing_input)
+    return (signing_input + b"." + _b64url_encode(mac.digest())).decode("ascii")
 
 
 async def get_or_create_user_from_google_claims(claims: dict) -> User:
@@ -133,15 +346,19 @@ async def get_or_create_user_from_google_claims(claims: dict) -> User:
     if not email or not sub:
         raise HTTPException(status_code=400, detail="Google token missing email or sub")
 
-    # Look up by sub
-    existing = await repo_query("SELECT * FROM user WHERE sub = $sub LIMIT 1", {"sub": sub})
-    if existing:
-        return User(**existing[0])
+    # Look up by sub or email in one round-trip; sub wins when both match
+    rows = await repo_query(
+        "SELECT * FROM user WHERE sub = $sub OR email = $email LIMIT 2",
+        {"sub": sub, "email": email},
+    )
+    by_sub = next((row for row in rows if row.get("sub") == sub), None)
+    if by_sub:
+        return User(**by_sub)
 
-    # Else look up by email (handles previously created users)
-    existing_email = await repo_query("SELECT * FROM user WHERE email = $email LIMIT 1", {"email": email})
-    if existing_email:
-        user = User(**existing_email[0])
+    # Else match by email (handles previously created users)
+    by_email = next((row for row in rows if row.get("email") == email), None)
+    if by_email:
+        user = User(**by_email)
         user.sub = sub
         user.name = name
         user.picture = picture
@@ -154,9 +371,18 @@ async def get_or_create_user_from_google_claims(claims: dict) -> User:
     return user
 
 
+# Lowercased email domains allowed to log in (GOOGLE_ALLOWED_DOMAIN, comma
+# separated); None disables the check
+_ALLOWED_DOMAINS = (
+    frozenset(
+        d.strip().lower()
+        for d in os.environ.get("GOOGLE_ALLOWED_DOMAIN", "").split(",")
+        if d.strip()
+    )
+    or None
+)
+
+
 def assert_allowed_domain(email: str):
-    allowed_domain = os.environ.get("GOOGLE_ALLOWED_DOMAIN")
-    if not allowed_domain:
-        return
-    if not email.lower().endswith(f"@{allowed_domain.lower()}"):
+    if _ALLOWED_DOMAINS is not None and email.rpartition("@")[2].lower() not in _ALLOWED_DOMAINS:
         raise HTTPException(status_code=403, detail="Email domain not allowed")
@@ -1,52 +1,75 @@
 import os
-import jwt
+from typing import Optional
 
+import jwt
 from fastapi import Depends, HTTPException, Request
 
+from api.auth import decode_app_jwt
+
+
+def _jwt_secret() -> Optional[str]:
+    # Read at call time: the secret may be configured after startup
+    # (tests, local dev), which is exactly when the fallbacks below matter.
+    return os.environ.get("AUTH_JWT_SECRET")
+
+
+def _decode_from_header(request: Request, secret: str) -> Optional[dict]:
+    """
+    Decode the bearer token at most once per request and stash the claims on
+    request.state so every dependency on the same request reuses them.
+    """
+    payload = getattr(request.state, "jwt_payload", None)
+    if payload is not None:
+        return payload
+
+    auth_header = request.headers.get("Authorization", "")
+    if not auth_header.lower().startswith("bearer "):
+        return None
+    token = auth_header.split(" ", 1)[1]
+    try:
+        payload = decode_app_jwt(token, secret)
+    except jwt.InvalidTokenError:
+        return None
+
+    request.state.jwt_payload = payload
+    request.state.user_id = getattr(request.state, "user_id", None) or payload.get("sub")
+    request.state.user_email = getattr(request.state, "user_email", None) or payload.get("email")
+    return payload
+
 
 def get_current_user_id(request: Request) -> str:
     user_id = getattr(request.state, "user_id", None)
-    if not user_id:
+    if user_id:
+        return user_id
+
+    secret = _jwt_secret()
+    if not secret:
         # In dev/test mode when AUTH_JWT_SECRET is not set, allow anonymous access
-        if not os.environ.get("AUTH_JWT_SECRET"):
-            user_id = "user:dev"
-            request.state.user_id = user_id
-        else:
-            # Fallback: decode token directly if middleware didn't run (e.g., secret set after startup)
-            auth_header = request.headers.get("Authorization", "")
-            if auth_header.lower().startswith("bearer "):
-                token = auth_header.split(" ", 1)[1]
-                try:
-                    payload = jwt.decode(token, os.environ["AUTH_JWT_SECRET"], algorithms=["HS256"])
-                    user_id = payload.get("sub")
-                    request.state.user_id = user_id
-                    request.state.user_email = payload.get("email")
-                except Exception:
-                    pass
-            if not user_id:
-                raise HTTPException(status_code=401, detail="Unauthorized")
+        request.state.user_id = "user:dev"
+        return "user:dev"
+
+    # Fallback: decode token directly if middleware didn't run (e.g., secret set after startup)
+    payload = _decode_from_header(request, secret)
+    user_id = payload.get("sub") if payload else None
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
     return user_id
 
 
 def get_current_user_email(request: Request) -> str:
     email = getattr(request.state, "user_email", None)
+    if email:
+        return email
+
+    secret = _jwt_secret()
+    if not secret:
+        request.state.user_email = "dev@force10partners.com"
+        return "dev@force10partners.com"
+
+    payload = _decode_from_header(request, secret)
+    email = payload.get("email") if payload else None
     if not email:
-        if not os.environ.get("AUTH_JWT_SECRET"):
-            email = "dev@force10partners.com"
-            request.state.user_email = email
-        else:
-            auth_header = request.headers.get("Authorization", "")
-            if auth_header.lower().startswith("bearer "):
-                token = auth_header.split(" ", 1)[1]
-                try:
-                    payload = jwt.decode(token, os.environ["AUTH_JWT_SECRET"], algorithms=["HS256"])
-                    email = payload.get("email")
-                    request.state.user_id = request.state.user_id or payload.get("sub")
-                    request.state.user_email = email
-                except Exception:
-                    pass
-            if not email:
-                raise HTTPException(status_code=401, detail="Unauthorized")
+        raise HTTPException(status_code=401, detail="Unauthorized")
     return email
 
 
@@ -55,7 +78,7 @@ ADMIN_EMAILS = {"rjoshi@force10partners.com"}
 
 def require_admin(request: Request):
     # If auth is disabled (no secret), treat caller as admin for local/dev usage
-    if not os.environ.get("AUTH_JWT_SECRET"):
+    if not _jwt_secret():
         return "dev@force10partners.com"
 
     email = get_current_user_email(request)
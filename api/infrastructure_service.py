@@ -1,14 +1,18 @@
 import asyncio
 import os
+import time
 from dataclasses import dataclass
-from typing import Literal
+from typing import TYPE_CHECKING, Literal
 
-import google.auth
-from google.auth.transport.requests import AuthorizedSession, Request
+import httpx
 from loguru import logger
 
-# Minimal, dependency‑light Compute Engine helper built on google-auth only.
-# We avoid google-api-python-client to keep image size small.
+if TYPE_CHECKING:
+    from google.auth.transport.requests import Request
+
+# Minimal, dependency‑light Compute Engine helper built on google-auth + httpx.
+# We avoid google-api-python-client to keep image size small, and import
+# google-auth inside the functions that need it so startup doesn't pay for it.
 
 ComputeStatus = Literal[
     "PROVISIONING",
@@ -29,18 +33,56 @@ class DbVmConfig:
     estimated_start_seconds: int = 90
 
 
-_SESSION: AuthorizedSession | None = None
+_AUTH: "_GoogleCredentialsAuth | None" = None
+_HTTP_CLIENT: httpx.AsyncClient | None = None
 _CONFIG: DbVmConfig | None = None
+_AUTH_REQUEST: "Request | None" = None
+
+# Last observed VM status as (monotonic timestamp, status). The UI polls the
+# status endpoint, so a short TTL keeps polls from each hitting the Compute API;
+# the lock coalesces concurrent misses into a single upstream request.
+VM_STATUS_CACHE_TTL = float(os.environ.get("DB_VM_STATUS_CACHE_TTL", "3.0"))
+_STATUS_CACHE: tuple[float, ComputeStatus] | None = None
+_STATUS_LOCK = asyncio.Lock()
+
+# is_db_vm_configured resolves google-auth credentials, which can hit the
+# metadata server; the answer rarely changes, so memoize it briefly.
+VM_CONFIGURED_CACHE_TTL = 60.0
+_CONFIGURED_CACHE: tuple[float, tuple[bool, str | None]] | None = None
+
+
+def _auth_request() -> "Request":
+    """
+    Shared google-auth transport used for credential refreshes.
+    """
+    global _AUTH_REQUEST
+    if _AUTH_REQUEST is None:
+        from google.auth.transport.requests import Request
+
+        _AUTH_REQUEST = Request()
+    return _AUTH_REQUEST
 
 
 def is_db_vm_configured() -> tuple[bool, str | None]:
     """
     Lightweight check to see if DB VM controls are configured.
-    Returns (enabled, reason_if_disabled).
+    Returns (enabled, reason_if_disabled). Cached for VM_CONFIGURED_CACHE_TTL.
     """
+    global _CONFIGURED_CACHE
+    now = time.monotonic()
+    if _CONFIGURED_CACHE is not None and now - _CONFIGURED_CACHE[0] < VM_CONFIGURED_CACHE_TTL:
+        return _CONFIGURED_CACHE[1]
+    result = _check_db_vm_configured()
+    _CONFIGURED_CACHE = (now, result)
+    return result
+
+
+def _check_db_vm_configured() -> tuple[bool, str | None]:
     if os.environ.get("SKIP_DB_VM_CHECK") == "1" or os.environ.get("NODE_ENV") == "development":
         return False, "skipped in dev"
     try:
+        import google.auth
+
         project = os.environ.get("DB_VM_PROJECT")
         zone = os.environ.get("DB_VM_ZONE", "us-central1-c")
         name = os.environ.get("DB_VM_NAME", "open-notebook-updated")
@@ -50,7 +92,7 @@ def is_db_vm_configured() -> tuple[bool, str | None]:
         try:
             credentials, default_project = google.auth.default(scopes=["https://www.googleapis.com/auth/compute"])
         except Exception as exc:  # noqa: BLE001
-            logger.debug("No default credentials for DB VM: %s", exc)
+            logger.debug("No default credentials for DB VM: {}", exc)
 
         active_project = project or default_project
         if not active_project:
@@ -63,7 +105,7 @@ def is_db_vm_configured() -> tuple[bool, str | None]:
             return False, "missing credentials"
         return True, None
     except Exception as exc:  # noqa: BLE001
-        logger.warning("DB VM config check failed: %s", exc)
+        logger.warning("DB VM config check failed: {}", exc)
         return False, str(exc)
 
 
@@ -75,6 +117,8 @@ def get_db_vm_config() -> DbVmConfig:
     if _CONFIG:
         return _CONFIG
 
+    import google.auth
+
     # Environment overrides
     project = os.environ.get("DB_VM_PROJECT")
     zone = os.environ.get("DB_VM_ZONE", "us-central1-c")
@@ -92,48 +136,126 @@ def get_db_vm_config() -> DbVmConfig:
 
     _CONFIG = DbVmConfig(project=project, zone=zone, name=name)
     logger.info(
-        "DB VM config resolved project=%s zone=%s name=%s", _CONFIG.project, _CONFIG.zone, _CONFIG.name
+        "DB VM config resolved project={} zone={} name={}", _CONFIG.project, _CONFIG.zone, _CONFIG.name
     )
     return _CONFIG
 
 
-def _get_session() -> AuthorizedSession:
-    global _SESSION
-    if _SESSION is not None:
-        return _SESSION
+class _GoogleCredentialsAuth(httpx.Auth):
+    """
+    httpx auth flow mirroring AuthorizedSession: refresh the credentials when
+    they are stale (or the API answers 401) and attach the bearer token.
+    """
+
+    def __init__(self, credentials):
+        self._credentials = credentials
+
+    async def _refresh(self) -> None:
+        # google-auth refreshes synchronously; keep that rare call off the loop
+        await asyncio.to_thread(self._credentials.refresh, _auth_request())
+
+    async def async_auth_flow(self, request: httpx.Request):
+        if not self._credentials.valid:
+            await self._refresh()
+        self._credentials.apply(request.headers)
+        response = yield request
+
+        if response.status_code == 401:
+            await self._refresh()
+            self._credentials.apply(request.headers)
+            yield request
+
+
+def _get_auth() -> _GoogleCredentialsAuth:
+    global _AUTH
+    if _AUTH is not None:
+        return _AUTH
+
+    import google.auth
 
     credentials, _ = google.auth.default(scopes=["https://www.googleapis.com/auth/compute"])
-    credentials.refresh(Request())
-    _SESSION = AuthorizedSession(credentials)
-    return _SESSION
+    _AUTH = _GoogleCredentialsAuth(credentials)
+    return _AUTH
 
 
-async def _request(method: str, url: str) -> dict:
+def _get_http_client() -> httpx.AsyncClient:
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None or _HTTP_CLIENT.is_closed:
+        _HTTP_CLIENT = httpx.AsyncClient(timeout=30)
+    return _HTTP_CLIENT
+
+
+async def close_http_client() -> None:
+    """Close the shared Compute API client (called on API shutdown)."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is not None:
+        await _HTTP_CLIENT.aclose()
+        _HTTP_CLIENT = None
+
+
+class ComputeApiError(RuntimeError):
     """
-    Run a synchronous AuthorizedSession request in a thread so we don't block the event loop.
+    Compute API call returned an error; `reason` is the first Google error
+    reason (e.g. "conditionNotMet") when the response provides one.
     """
-    session = _get_session()
 
-    def _do():
-        resp = session.request(method, url)
-        return resp.status_code, resp.json() if resp.text else {}
+    def __init__(self, message: str, status_code: int, reason: str | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.reason = reason
+
 
-    status_code, data = await asyncio.to_thread(_do)
-    if status_code >= 400:
-        error_msg = data.get("error", {}).get("message", f"HTTP {status_code}")
-        raise RuntimeError(f"Compute API call failed: {error_msg}")
+async def _request(method: str, url: str) -> dict:
+    """
+    Issue an authenticated Compute API request on the event loop.
+    """
+    resp = await _get_http_client().request(method, url, auth=_get_auth())
+    data = resp.json() if resp.content else {}
+    if resp.status_code >= 400:
+        error = data.get("error", {})
+        error_msg = error.get("message", f"HTTP {resp.status_code}")
+        errors = error.get("errors") or [{}]
+        raise ComputeApiError(
+            f"Compute API call failed: {error_msg}",
+            status_code=resp.status_code,
+            reason=errors[0].get("reason"),
+        )
     return data
 
 
+def _cached_status() -> ComputeStatus | None:
+    cached = _STATUS_CACHE
+    if cached is not None and time.monotonic() - cached[0] < VM_STATUS_CACHE_TTL:
+        return cached[1]
+    return None
+
+
+def _invalidate_status_cache() -> None:
+    global _STATUS_CACHE
+    _STATUS_CACHE = None
+
+
 async def get_db_vm_status() -> ComputeStatus:
-    cfg = get_db_vm_config()
-    url = (
-        f"https://compute.googleapis.com/compute/v1/projects/{cfg.project}"
-        f"/zones/{cfg.zone}/instances/{cfg.name}"
-    )
-    data = await _request("GET", url)
-    status = data.get("status", "UNKNOWN")
-    logger.info("DB VM status=%s", status)
+    global _STATUS_CACHE
+    status = _cached_status()
+    if status is not None:
+        return status
+
+    async with _STATUS_LOCK:
+        # Another caller may have refreshed the status while we waited
+        status = _cached_status()
+        if status is not None:
+            return status
+
+        cfg = get_db_vm_config()
+        url = (
+            f"https://compute.googleapis.com/compute/v1/projects/{cfg.project}"
+            f"/zones/{cfg.zone}/instances/{cfg.name}"
+        )
+        data = await _request("GET", url)
+        status = data.get("status", "UNKNOWN")
+        _STATUS_CACHE = (time.monotonic(), status)  # type: ignore[assignment]
+    logger.info("DB VM status={}", status)
     return status  # type: ignore[return-value]
 
 
@@ -142,6 +264,8 @@ async def start_db_vm() -> dict:
     Start or resume the DB VM. Returns the operation resource.
     """
     cfg = get_db_vm_config()
+    # Start vs resume depends on the current state, so this read is needed;
+    # it is free when the UI polled the status moments ago.
     current = await get_db_vm_status()
 
     if current == "RUNNING":
@@ -156,8 +280,9 @@ async def start_db_vm() -> dict:
         f"https://compute.googleapis.com/compute/v1/projects/{cfg.project}"
         f"/zones/{cfg.zone}/instances/{cfg.name}/{action}"
     )
-    logger.info("Issuing VM %s", action)
+    logger.info("Issuing VM {}", action)
     data = await _request("POST", url)
+    _invalidate_status_cache()
     return {"status": current, "operation": data}
 
 
@@ -166,7 +291,9 @@ async def suspend_db_vm(prefer_suspend: bool = True) -> dict:
     Suspend the DB VM. Falls back to stop if suspend is unsupported.
     """
     cfg = get_db_vm_config()
-    status = await get_db_vm_status()
+    # Only use a status we already have; otherwise skip the extra GET and let
+    # the Compute API reject the suspend if the VM is not running.
+    status = _cached_status() or "UNKNOWN"
     if status in {"TERMINATED", "STOPPING"}:
         logger.info("DB VM already stopped/terminated; suspend skipped")
         return {"status": status, "operation": None}
@@ -180,9 +307,15 @@ async def suspend_db_vm(prefer_suspend: bool = True) -> dict:
         try:
             logger.info("Issuing VM suspend")
             data = await _request("POST", url)
+            _invalidate_status_cache()
             return {"status": status, "operation": data, "action": "suspend"}
+        except ComputeApiError as exc:
+            if exc.reason == "conditionNotMet":
+                logger.info("DB VM not running; suspend skipped ({})", exc)
+                return {"status": status, "operation": None}
+            logger.warning("Suspend failed ({}); falling back to stop", exc)
         except Exception as exc:  # noqa: BLE001
-            logger.warning("Suspend failed (%s); falling back to stop", exc)
+            logger.warning("Suspend failed ({}); falling back to stop", exc)
 
     url = (
         f"https://compute.googleapis.com/compute/v1/projects/{cfg.project}"
@@ -190,4 +323,5 @@ async def suspend_db_vm(prefer_suspend: bool = True) -> dict:
     )
     logger.info("Issuing VM stop")
     data = await _request("POST", url)
+    _invalidate_status_cache()
     return {"status": status, "operation": data, "action": "stop"}
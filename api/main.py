@@ -1,13 +1,17 @@
+import asyncio
 from contextlib import asynccontextmanager
 import os
+import time
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from loguru import logger
 from fastapi import Request, Response
 from fastapi.routing import APIRoute
 
 from api.auth import JWTAuthMiddleware
+from api import infrastructure_service
 from api.routers import (
     auth,
     chat,
@@ -47,8 +51,11 @@ async def lifespan(app: FastAPI):
     Lifespan event handler for the FastAPI application.
     Runs database migrations automatically on startup.
     """
+    auth.init_http_client()
     if os.environ.get("SKIP_MIGRATIONS_FOR_TESTS"):
         yield
+        await auth.close_http_client()
+        await infrastructure_service.close_http_client()
         return
     # Startup: Run database migrations
     logger.info("Starting API initialization...")
@@ -73,10 +80,17 @@ async def lifespan(app: FastAPI):
 
     logger.success("API initialization completed successfully")
 
+    # Seed the Google OAuth keep-alive pool in the background; the reference
+    # lives in this frame until shutdown
+    warmup_task = asyncio.create_task(auth.warm_http_client())
+
     # Yield control to the application
     yield
 
     # Shutdown: cleanup if needed
+    warmup_task.cancel()
+    await auth.close_http_client()
+    await infrastructure_service.close_http_client()
     logger.info("API shutdown complete")
 
 
@@ -85,6 +99,7 @@ app = FastAPI(
     description="API for Open Notebook - Research Assistant",
     version="0.2.2",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 
@@ -99,29 +114,30 @@ class LoggingRoute(APIRoute):
         original_route_handler = super().get_route_handler()
 
         async def logging_route_handler(request: Request):
-            logger.debug(
-                "ROUTE START path=%s method=%s user=%s client=%s route_name=%s",
-                request.url.path,
-                request.method,
-                getattr(request.state, "user_id", None),
-                getattr(request.client, "host", None),
-                self.name,
+            logger.opt(lazy=True).debug(
+                "ROUTE START path={} method={} user={} client={} route_name={}",
+                lambda: request.url.path,
+                lambda: request.method,
+                lambda: getattr(request.state, "user_id", None),
+                lambda: getattr(request.client, "host", None),
+                lambda: self.name,
             )
             response: Response = await original_route_handler(request)
-            logger.debug(
-                "ROUTE END path=%s method=%s status=%s headers=%s",
-                request.url.path,
-                request.method,
-                getattr(response, "status_code", None),
-                dict(response.headers),
+            logger.opt(lazy=True).debug(
+                "ROUTE END path={} method={} status={} headers={}",
+                lambda: request.url.path,
+                lambda: request.method,
+                lambda: getattr(response, "status_code", None),
+                lambda: dict(response.headers),
             )
             return response
 
         return logging_route_handler
 
 
-# Apply the logging route to all routers
-app.router.route_class = LoggingRoute
+# Per-route diagnostics are opt-in; they wrap every handler call
+if os.environ.get("ROUTE_DEBUG") == "1":
+    app.router.route_class = LoggingRoute
 
 # Add JWT authentication middleware first
 # Exclude auth + config endpoints + infra controls (needed before DB is up)
@@ -175,25 +191,32 @@ app.include_router(source_chat.router, prefix="/api", tags=["source-chat"])
 app.include_router(drive.router, prefix="/api", tags=["drive"])
 
 
+# Full header/body request logging is opt-in: reading the body forces large
+# uploads to be buffered in memory before the handler sees them.
+HTTP_VERBOSE_LOG = os.environ.get("HTTP_VERBOSE_LOG") == "1"
+
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    import time
-    start_time = time.time()
-    try:
-        body = await request.body()
-    except Exception:
-        body = b""
-    logger.info(
-        "HTTP START %s %s headers=%s body=%s",
-        request.method,
-        request.url.path,
-        dict(request.headers),
-        body[:2000],
-    )
+    start_time = time.perf_counter()
+    if HTTP_VERBOSE_LOG:
+        try:
+            body = await request.body()
+        except Exception:
+            body = b""
+        logger.opt(lazy=True).info(
+            "HTTP START {} {} headers={} body={}",
+            lambda: request.method,
+            lambda: request.url.path,
+            lambda: dict(request.headers),
+            lambda: body[:2000],
+        )
+    else:
+        logger.info("HTTP START {} {}", request.method, request.url.path)
     response: Response = await call_next(request)
-    duration = (time.time() - start_time) * 1000
+    duration = (time.perf_counter() - start_time) * 1000
     logger.info(
-        "HTTP END %s %s status=%s duration_ms=%.2f",
+        "HTTP END {} {} status={} duration_ms={:.2f}",
         request.method,
         request.url.path,
         response.status_code,
@@ -28,6 +28,29 @@ class NotebookResponse(BaseModel):
     note_count: int
 
 
+# Auth models
+class AuthUserResponse(BaseModel):
+    model_config = ConfigDict(extra="forbid", from_attributes=True)
+
+    id: str
+    email: str
+    name: Optional[str] = None
+    picture: Optional[str] = None
+
+
+class LoginResponse(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    token: str = Field(..., description="Application JWT")
+    user: AuthUserResponse
+
+
+class GoogleCodeLoginResponse(LoginResponse):
+    drive_scope: bool = Field(
+        True, description="Whether Drive access was granted and stored"
+    )
+
+
 # Search models
 class SearchRequest(BaseModel):
     query: str = Field(..., description="Search query")
@@ -3,11 +3,13 @@ Authentication router for Open Notebook API.
 Provides endpoints for Google login and status.
 """
 
+import importlib.util
 import os
 from datetime import datetime, timedelta, timezone
 
 import httpx
-from fastapi import APIRouter, Body, HTTPException, Request
+import orjson
+from fastapi import APIRouter, Body, HTTPException, Request, Response
 from loguru import logger
 
 from api.auth import (
@@ -16,27 +18,124 @@ from api.auth import (
     issue_app_jwt,
     verify_google_id_token,
 )
+from api.models import AuthUserResponse, GoogleCodeLoginResponse, LoginResponse
+from open_notebook.database.repository import ensure_record_id, repo_query
 from open_notebook.domain.google_credential import GoogleCredential
 from open_notebook.domain.user import User
 from open_notebook.utils.google_drive import DRIVE_SCOPES
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+# Shared client so logins reuse pooled TLS connections to oauth2.googleapis.com
+HTTP_LIMITS = httpx.Limits(
+    max_connections=100, max_keepalive_connections=20, keepalive_expiry=30
+)
+HTTP_TIMEOUT = httpx.Timeout(connect=3.0, read=5.0, write=5.0, pool=2.0)
+# HTTP/2 lets concurrent logins multiplex over one connection; it needs the
+# optional h2 package (httpx[http2]), so fall back to HTTP/1.1 without it
+HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
+_HTTP_CLIENT: httpx.AsyncClient | None = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None or _HTTP_CLIENT.is_closed:
+        # Limits/http2 belong to the transport once one is passed explicitly;
+        # retries=1 only re-attempts failed connects, never sent requests
+        transport = httpx.AsyncHTTPTransport(
+            limits=HTTP_LIMITS, http2=HTTP2_ENABLED, retries=1
+        )
+        _HTTP_CLIENT = httpx.AsyncClient(transport=transport, timeout=HTTP_TIMEOUT)
+    return _HTTP_CLIENT
+
+
+def init_http_client() -> None:
+    """Create the shared Google OAuth client up front (called on API startup)."""
+    _get_http_client()
+
+
+async def warm_http_client() -> None:
+    """
+    Open a keep-alive connection to the Google token endpoint ahead of the
+    first login so it doesn't pay the TCP/TLS handshake. Best effort.
+    """
+    if not _GOOGLE_CONFIGURED:
+        return
+    try:
+        await _get_http_client().head(GOOGLE_TOKEN_URL)
+    except httpx.HTTPError as exc:
+        logger.debug("Google token endpoint warm-up failed: {}", exc)
+
+
+async def _post_token_exchange(payload: dict) -> httpx.Response:
+    """
+    POST the code exchange exactly once. Authorization codes are single-use,
+    so a request that may have reached Google is never replayed (a replay
+    would only get invalid_grant and hide the real outcome); the transport's
+    retries=1 already covers connects that failed before anything was sent.
+    """
+    try:
+        return await _get_http_client().post(GOOGLE_TOKEN_URL, data=payload)
+    except httpx.TimeoutException as exc:
+        logger.error("Google token exchange timed out: {!r}", exc)
+        raise HTTPException(status_code=504, detail="Google token exchange timeout")
+    except httpx.TransportError as exc:
+        logger.error("Google token exchange transport error: {!r}", exc)
+        raise HTTPException(status_code=502, detail="Google token exchange failed")
+
+
+async def close_http_client() -> None:
+    """Close the shared Google OAuth client (called on API shutdown)."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is not None:
+        await _HTTP_CLIENT.aclose()
+        _HTTP_CLIENT = None
+
+
+# Login configuration is resolved once at import rather than per request
+GOOGLE_CLIENT_ID = os.environ.get("GOOGLE_CLIENT_ID")
+GOOGLE_CLIENT_SECRET = os.environ.get("GOOGLE_CLIENT_SECRET")
+_GOOGLE_CONFIGURED = bool(GOOGLE_CLIENT_ID and GOOGLE_CLIENT_SECRET)
+_DEV_LOGIN_ENABLED = os.environ.get("ALLOW_LOCAL_DEV_LOGIN") == "1"
+_LOCAL_HOSTS = frozenset({"127.0.0.1", "::1", "localhost"})
+if not _GOOGLE_CONFIGURED:
+    logger.warning("GOOGLE_CLIENT_ID/GOOGLE_CLIENT_SECRET not set; Google code login will fail")
+
+GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token"
+# Static part of the code-exchange form; each login adds code + redirect_uri
+_BASE_TOKEN_PAYLOAD = {
+    "client_id": GOOGLE_CLIENT_ID,
+    "client_secret": GOOGLE_CLIENT_SECRET,
+    "grant_type": "authorization_code",
+}
+
+# Auth mode is fixed for the process lifetime (the middleware also reads the
+# secret once), so the status body is serialized a single time and clients
+# may cache it briefly
+_AUTH_ENABLED = bool(os.environ.get("AUTH_JWT_SECRET"))
+_AUTH_STATUS_BODY = orjson.dumps(
+    {
+        "auth_enabled": _AUTH_ENABLED,
+        "message": "Authentication is required" if _AUTH_ENABLED else "Authentication is disabled",
+    }
+)
+AUTH_STATUS_MAX_AGE = 300
+
 
 @router.get("/status")
 async def get_auth_status():
     """
     Auth is enabled when AUTH_JWT_SECRET is set.
     """
-    auth_enabled = bool(os.environ.get("AUTH_JWT_SECRET"))
-    return {
-        "auth_enabled": auth_enabled,
-        "message": "Authentication is required" if auth_enabled else "Authentication is disabled",
-    }
+    return Response(
+        content=_AUTH_STATUS_BODY,
+        media_type="application/json",
+        headers={"Cache-Control": f"public, max-age={AUTH_STATUS_MAX_AGE}"},
+    )
 
 
-@router.post("/login/google")
-async def login_with_google(id_token: str = Body(..., embed=True)):
+@router.post("/login/google", response_model=LoginResponse)
+async def login_with_google(id_token: str = Body(..., embed=True)) -> LoginResponse:
     """
     Accept a Google ID token from the client, verify domain, create user, and return app JWT.
     Note: This flow does NOT issue Drive refresh tokens; prefer the code flow for Drive imports.
@@ -47,65 +146,48 @@ async def login_with_google(id_token: str = Body(..., embed=True)):
     user = await get_or_create_user_from_google_claims(claims)
     token = issue_app_jwt(user)
     logger.info(f"User {email} logged in via Google")
-    return {
-        "token": token,
-        "user": {
-            "id": user.id,
-            "email": user.email,
-            "name": user.name,
-            "picture": user.picture,
-        },
-    }
+    return LoginResponse(token=token, user=AuthUserResponse.model_validate(user))
 
 
-@router.post("/login/google-code")
+@router.post("/login/google-code", response_model=GoogleCodeLoginResponse)
 async def login_with_google_code(
     code: str = Body(..., embed=True),
     redirect_uri: str = Body(..., embed=True),
-):
+) -> GoogleCodeLoginResponse:
     """
     Fallback OAuth Code flow: exchange `code` for tokens server-side, verify id_token,
     enforce allowed domain, upsert user, and issue app JWT.
     """
-    client_id = os.environ.get("GOOGLE_CLIENT_ID")
-    client_secret = os.environ.get("GOOGLE_CLIENT_SECRET")
-    if not client_id or not client_secret:
+    if not _GOOGLE_CONFIGURED:
         raise HTTPException(status_code=500, detail="Google client credentials not configured")
 
-    token_url = "https://oauth2.googleapis.com/token"
     # Log minimal debug info about the incoming code (length only, no value)
     logger.info(
         "google-code: received auth code len=%s redirect_uri=%s client_id_suffix=%s",
         len(code) if code else 0,
         redirect_uri,
-        client_id[-6:] if client_id else None,
+        GOOGLE_CLIENT_ID[-6:] if GOOGLE_CLIENT_ID else None,
     )
 
-    payload = {
-        "code": code,
-        "client_id": client_id,
-        "client_secret": client_secret,
-        "redirect_uri": redirect_uri,
-        "grant_type": "authorization_code",
-    }
+    payload = _BASE_TOKEN_PAYLOAD | {"code": code, "redirect_uri": redirect_uri}
 
     token_data = None
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.post(token_url, data=payload)
+        resp = await _post_token_exchange(payload)
         if resp.status_code != 200:
-            body_text = resp.text
-            logger.error(
-                f"Google token exchange failed: status={resp.status_code} "
-                f"redirect_uri={redirect_uri} body={body_text}"
-            )
+            # Decode the body once: as JSON when possible, else as text
+            content = resp.content
             try:
-                err_json = resp.json()
+                err_json = orjson.loads(content)
                 err_detail = f"{err_json.get('error')}: {err_json.get('error_description')}"
             except Exception:
-                err_detail = body_text
+                err_detail = content.decode("utf-8", "replace")
+            logger.error(
+                f"Google token exchange failed: status={resp.status_code} "
+                f"redirect_uri={redirect_uri} body_len={len(content)} detail={err_detail}"
+            )
             raise HTTPException(status_code=401, detail=f"Google token exchange failed: {err_detail}")
-        token_data = resp.json()
+        token_data = orjson.loads(resp.content)
     except HTTPException:
         raise
     except Exception as exc:
@@ -149,8 +231,6 @@ async def login_with_google_code(
     try:
         expires_at = datetime.now(timezone.utc) + timedelta(seconds=int(expires_in) - 60)
         expires_at_str = expires_at.isoformat()
-        from open_notebook.database.repository import repo_query, ensure_record_id
-
         if not refresh_token:
             raise HTTPException(
                 status_code=403,
@@ -164,7 +244,6 @@ async def login_with_google_code(
             "expires_at": expires_at_str,
             "scope": scope_str,
             "token_type": token_type,
-            "updated": datetime.now(timezone.utc),
         }
         logger.debug(
             "google-code: upsert-by-user user=%s expires_at=%s scope_len=%s",
@@ -173,10 +252,12 @@ async def login_with_google_code(
             len(scope_str.split()) if isinstance(scope_str, str) else 0,
         )
 
-        # Try update by unique user; if nothing updated, create new
-        update_result = await repo_query(
+        # Single round-trip: UPSERT updates the user's credential or creates it
+        # when none matches (`created` keeps $before via its field definition)
+        upsert_result = await repo_query(
             """
-            UPDATE google_credential SET refresh_token = $refresh_token,
+            UPSERT google_credential SET user = $user,
+                                         refresh_token = $refresh_token,
                                          access_token = $access_token,
                                          expires_at = $expires_at,
                                          scope = $scope,
@@ -187,16 +268,10 @@ async def login_with_google_code(
             """,
             cred_data,
         )
-        if not update_result:
-            create_data = cred_data.copy()
-            create_data["created"] = datetime.now(timezone.utc)
-            create_result = await repo_query(
-                "CREATE google_credential CONTENT $data RETURN id;",
-                {"data": create_data},
-            )
-            logger.info("google-code: created credential id=%s", create_result[0].get("id") if create_result else None)
-        else:
-            logger.info("google-code: updated credential id=%s", update_result[0].get("id"))
+        logger.info(
+            "google-code: upserted credential id=%s",
+            upsert_result[0].get("id") if upsert_result else None,
+        )
     except Exception as exc:
         logger.exception(f"Failed to persist Drive credentials: {exc}")
         try:
@@ -214,29 +289,26 @@ async def login_with_google_code(
 
     token = issue_app_jwt(user)
     logger.info(f"User {email} logged in via Google (code flow)")
-    return {
-        "token": token,
-        "user": {
-            "id": user.id,
-            "email": user.email,
-            "name": user.name,
-            "picture": user.picture,
-        },
-        "drive_scope": True,
-    }
+    return GoogleCodeLoginResponse(
+        token=token,
+        user=AuthUserResponse.model_validate(user),
+        drive_scope=True,
+    )
 
 
-@router.post("/login/dev")
-async def dev_login(request: Request, email: str = Body("rjoshi@force10partners.com", embed=True)):
+@router.post("/login/dev", response_model=LoginResponse)
+async def dev_login(
+    request: Request, email: str = Body("rjoshi@force10partners.com", embed=True)
+) -> LoginResponse:
     """
     Dev-only local login without Google. Guarded by env ALLOW_LOCAL_DEV_LOGIN=1 and localhost origin.
     Issues a JWT for the given email (default rjoshi@force10partners.com) and creates the user if needed.
     """
-    if os.environ.get("ALLOW_LOCAL_DEV_LOGIN") != "1":
+    if not _DEV_LOGIN_ENABLED:
         raise HTTPException(status_code=403, detail="Dev login disabled")
 
     client_host = request.client.host if request.client else None
-    if client_host not in ("127.0.0.1", "::1", "localhost"):
+    if client_host not in _LOCAL_HOSTS:
         raise HTTPException(status_code=403, detail="Dev login only allowed from localhost")
 
     if not email:
@@ -245,23 +317,22 @@ async def dev_login(request: Request, email: str = Body("rjoshi@force10partners.
     # Enforce allowed domain if configured
     assert_allowed_domain(email)
 
-    from open_notebook.database.repository import repo_query
-
-    existing = await repo_query("SELECT * FROM user WHERE email = $email LIMIT 1", {"email": email})
-    if existing:
-        user = User(**existing[0])
-    else:
-        user = User(email=email, sub=f"dev-{email}", name=email.split("@")[0], picture=None)
-        await user.save()
+    # Single round-trip get-or-create (email is uniquely indexed). `??` keeps
+    # the sub/name of an existing user and only fills them in on creation.
+    rows = await repo_query(
+        """
+        UPSERT user SET email = $email,
+                        sub = sub ?? $sub,
+                        name = name ?? $name
+        WHERE email = $email
+        RETURN AFTER;
+        """,
+        {"email": email, "sub": f"dev-{email}", "name": email.split("@")[0]},
+    )
+    if not rows:
+        raise HTTPException(status_code=500, detail="Failed to create dev user")
+    user = User(**rows[0])
 
     token = issue_app_jwt(user)
     logger.info(f"[DEV LOGIN] Issued token for {email} from {client_host}")
-    return {
-        "token": token,
-        "user": {
-            "id": user.id,
-            "email": user.email,
-            "name": user.name,
-            "picture": user.picture,
-        },
-    }
+    return LoginResponse(token=token, user=AuthUserResponse.model_validate(user))
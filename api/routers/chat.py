@@ -1,14 +1,22 @@
 import asyncio
-from typing import Any, Dict, Iterable, List, Optional
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncGenerator, Dict, Iterable, List, Literal, Optional, Tuple, Union
 import os
 
 from fastapi import APIRouter, HTTPException, Query, Depends
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from langchain_core.messages import HumanMessage, AIMessage
 from langchain_core.runnables import RunnableConfig
 from loguru import logger
-from pydantic import BaseModel, Field, field_validator
+import orjson
+from pydantic import BaseModel, Field, field_validator, model_validator
 
-from open_notebook.database.repository import ensure_record_id, repo_query
+from open_notebook.database.repository import (
+    ensure_record_id,
+    repo_query,
+    with_table_prefix,
+)
 from open_notebook.domain.models import Model
 from open_notebook.domain.notebook import ChatSession, Note, Notebook, Source
 from open_notebook.exceptions import (
@@ -16,26 +24,67 @@ from open_notebook.exceptions import (
 )
 from open_notebook.graphs.chat import graph as chat_graph
 from open_notebook.graphs.image_generation import generate_image_message
-from open_notebook.utils import render_message_content
+from open_notebook.utils import TTLCache, render_message_content
 from api.deps import get_current_user_id
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Upper bound on a single /chat/execute graph run
+CHAT_TIMEOUT_SECONDS = int(os.getenv("CHAT_TIMEOUT_SECONDS", "40"))
+# Largest serialized `context` a chat request may carry (2 MiB, roughly 500k tokens)
+CHAT_CONTEXT_MAX_BYTES = int(os.getenv("CHAT_CONTEXT_MAX_BYTES", str(2 * 1024 * 1024)))
+
+
+def _orjson_response(content: Union[BaseModel, List[BaseModel]]) -> ORJSONResponse:
+    """
+    Serialize response models the handler just built straight to JSON. Returning a
+    Response skips FastAPI's response_model pass (dump, re-validate, re-serialize),
+    which is costly for message-heavy payloads; the declared response_model still
+    documents the schema.
+    """
+    if isinstance(content, list):
+        return ORJSONResponse([item.model_dump(mode="json") for item in content])
+    return ORJSONResponse(content.model_dump(mode="json"))
+
+
+# Ownership of a notebook effectively never changes, and the chat UI polls the
+# same notebook repeatedly, so each notebook's owner is remembered briefly to
+# skip the SELECT. Only the owner is cached, never the model, so handlers that
+# read notebook fields always load them fresh.
+NOTEBOOK_OWNER_CACHE_TTL = 5.0
+NOTEBOOK_OWNER_CACHE_MAXSIZE = 1024
+_notebook_owner_cache: TTLCache[str, str] = TTLCache(
+    NOTEBOOK_OWNER_CACHE_MAXSIZE, ttl=NOTEBOOK_OWNER_CACHE_TTL
+)
 
 
-async def _ensure_notebook_owned(notebook_id: str, user_id: str) -> Notebook:
-    notebook = await Notebook.get(notebook_id)
-    if not notebook or str(notebook.owner) != str(user_id):
+async def _ensure_notebook_owned(notebook_id: str, user_id: str) -> str:
+    """Check the caller owns the notebook and return its full `notebook:` id."""
+    notebook_id = with_table_prefix(notebook_id, "notebook")
+    owner = _notebook_owner_cache.get(notebook_id)
+    if owner is None:
+        notebook = await Notebook.get(notebook_id)
+        if not notebook:
+            raise HTTPException(status_code=404, detail="Notebook not found")
+        owner = str(notebook.owner)
+        _notebook_owner_cache.set(notebook_id, owner)
+    if owner != str(user_id):
         raise HTTPException(status_code=404, detail="Notebook not found")
-    return notebook
+    return notebook_id
 
 
-async def _ensure_session_owned(session_id: str, user_id: str) -> ChatSession:
-    full_session_id = (
-        session_id if session_id.startswith("chat_session:") else f"chat_session:{session_id}"
-    )
-    session = await ChatSession.get(full_session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
+async def owned_notebook_id(
+    notebook_id: str = Query(..., description="Notebook ID"),
+    user_id: str = Depends(get_current_user_id),
+) -> str:
+    """Dependency checking the caller owns the notebook; cached per request by FastAPI."""
+    try:
+        return await _ensure_notebook_owned(notebook_id, user_id)
+    except NotFoundError:
+        raise HTTPException(status_code=404, detail="Notebook not found")
+
+
+async def _check_session_owner(session: ChatSession, user_id: str) -> None:
     # Backward compatibility: older sessions may not have an owner set.
     session_owner = getattr(session, "owner", None)
     if session_owner is None:
@@ -46,8 +95,86 @@ async def _ensure_session_owned(session_id: str, user_id: str) -> ChatSession:
             pass
     elif str(session_owner) != str(user_id):
         raise HTTPException(status_code=404, detail="Session not found")
+
+
+async def _ensure_session_owned(session_id: str, user_id: str) -> ChatSession:
+    session = await ChatSession.get(with_table_prefix(session_id, "chat_session"))
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    await _check_session_owner(session, user_id)
     return session
 
+
+# A chat session row plus the notebook it refers to, in one statement
+_SESSION_WITH_NOTEBOOK_QUERY = (
+    "SELECT *, (->refers_to->notebook)[0] AS notebook_id FROM $session_id"
+)
+
+
+async def _ensure_session_owned_with_notebook(
+    session_id: str, user_id: str
+) -> Tuple[ChatSession, Optional[str]]:
+    """Load an owned session and its related notebook id in one query."""
+    rows = await repo_query(
+        _SESSION_WITH_NOTEBOOK_QUERY,
+        {"session_id": ensure_record_id(session_id, "chat_session")},
+    )
+    if not rows:
+        raise HTTPException(status_code=404, detail="Session not found")
+    row = dict(rows[0])
+    notebook_id = row.pop("notebook_id", None)
+    session = ChatSession(**row)
+    await _check_session_owner(session, user_id)
+    return session, notebook_id
+
+
+# Messages live in the graph checkpoint, so saving a session after a chat turn
+# only refreshes its `updated` timestamp (used to order the session list). Turns
+# arriving within this window of the last refresh skip that write.
+SESSION_TOUCH_INTERVAL = timedelta(seconds=60)
+
+
+async def _touch_session(session: ChatSession) -> None:
+    updated = getattr(session, "updated", None)
+    if isinstance(updated, datetime):
+        if updated.tzinfo is None:
+            updated = updated.replace(tzinfo=timezone.utc)
+        if datetime.now(timezone.utc) - updated < SESSION_TOUCH_INTERVAL:
+            return
+    await session.save()
+
+
+async def owned_session(
+    session_id: str, user_id: str = Depends(get_current_user_id)
+) -> ChatSession:
+    """Dependency resolving the caller's chat session from the path."""
+    try:
+        return await _ensure_session_owned(session_id, user_id)
+    except NotFoundError:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+
+# Upper bound on concurrent graph-state reads when listing sessions
+STATE_FETCH_CONCURRENCY = 8
+
+
+async def _bulk_message_counts(session_ids: List[str]) -> Dict[str, int]:
+    """Message count per session, fetching graph states concurrently."""
+    semaphore = asyncio.Semaphore(STATE_FETCH_CONCURRENCY)
+
+    async def count(session_id: str) -> int:
+        async with semaphore:
+            state = await chat_graph.aget_state(
+                config=RunnableConfig(configurable={"thread_id": session_id})
+            )
+        if state and state.values:
+            return len(state.values.get("messages", []))
+        return 0
+
+    results = await asyncio.gather(*(count(sid) for sid in session_ids))
+    return dict(zip(session_ids, results))
+
+
 # Request/Response models
 class CreateSessionRequest(BaseModel):
     notebook_id: str = Field(..., description="Notebook ID to create session for")
@@ -84,6 +211,26 @@ class ChatMessage(BaseModel):
             return str(value)
 
 
+def _to_chat_messages(raw_messages: Iterable[Any]) -> List[ChatMessage]:
+    """
+    Convert graph messages to response models. _render_message already yields
+    plain strings, so the models are built with model_construct and skip
+    validation (the content validator above only matters for external input).
+    """
+    # Local aliases keep attribute/global lookups out of the per-message loop
+    construct = ChatMessage.model_construct
+    render = _render_message
+    return [
+        construct(
+            id=getattr(msg, "id", None) or f"msg_{i}",
+            type=getattr(msg, "type", "unknown"),
+            content=render(msg),
+            timestamp=None,  # LangChain messages don't have timestamps by default
+        )
+        for i, msg in enumerate(_iter_messages(raw_messages))
+    ]
+
+
 class ChatSessionResponse(BaseModel):
     id: str = Field(..., description="Session ID")
     title: str = Field(..., description="Session title")
@@ -104,11 +251,45 @@ class ChatSessionWithMessagesResponse(ChatSessionResponse):
     )
 
 
+class ChatContext(BaseModel):
+    """Context items selected for a chat turn, as returned by /chat/context."""
+
+    sources: List[Dict[str, Any]] = Field(
+        default_factory=list, description="Source context payloads"
+    )
+    notes: List[Dict[str, Any]] = Field(
+        default_factory=list, description="Note context payloads"
+    )
+
+    @model_validator(mode="after")
+    def _check_size(self) -> "ChatContext":
+        # Reject oversized payloads before they are copied into graph state and
+        # rendered into the prompt; no model accepts this much context anyway.
+        size = len(orjson.dumps([self.sources, self.notes], default=str))
+        if size > CHAT_CONTEXT_MAX_BYTES:
+            raise ValueError(
+                f"Chat context is {size} bytes; the limit is {CHAT_CONTEXT_MAX_BYTES}. "
+                "Select fewer sources or use insights instead of full content."
+            )
+        return self
+
+    def to_state(self) -> Dict[str, Any]:
+        """Plain dict for the graph state (the prompt template renders it as-is)."""
+        return {"sources": self.sources, "notes": self.notes}
+
+
 class ExecuteChatRequest(BaseModel):
     session_id: str = Field(..., description="Chat session ID")
     message: str = Field(..., description="User message content")
-    context: Dict[str, Any] = Field(
-        ..., description="Chat context with sources and notes"
+    context: ChatContext = Field(
+        default_factory=ChatContext, description="Chat context with sources and notes"
+    )
+    context_config: Optional[Dict[str, Any]] = Field(
+        None,
+        description=(
+            "Context configuration (as for /chat/context) to resolve server-side; "
+            "replaces `context` when given"
+        ),
     )
     model_override: Optional[str] = Field(
         None, description="Optional model override for this message"
@@ -123,9 +304,8 @@ class ExecuteChatResponse(BaseModel):
 class GenerateImageRequest(BaseModel):
     session_id: str = Field(..., description="Chat session ID")
     message: str = Field(..., description="User prompt for image generation")
-    context: Dict[str, Any] = Field(
-        default_factory=lambda: {"sources": [], "notes": []},
-        description="Optional RAG context",
+    context: ChatContext = Field(
+        default_factory=ChatContext, description="Optional RAG context"
     )
     model_override: Optional[str] = Field(
         None, description="Optional planner model override"
@@ -153,39 +333,30 @@ class SuccessResponse(BaseModel):
 @router.get("/chat/sessions", response_model=List[ChatSessionResponse])
 async def get_sessions(
     notebook_id: str = Query(..., description="Notebook ID"),
+    owned_id: str = Depends(owned_notebook_id),
     user_id: str = Depends(get_current_user_id),
 ):
     """Get all chat sessions for a notebook."""
     try:
-        notebook = await _ensure_notebook_owned(notebook_id, user_id)
-        sessions = [
-            s for s in await notebook.get_chat_sessions()
-            if str(s.owner) == str(user_id)
-        ]
+        sessions = await ChatSession.get_for_notebook(owned_id, owner=user_id)
 
-        responses: list[ChatSessionResponse] = []
-        for session in sessions:
-            # Pull message history from chat_graph state to avoid "missing" messages (e.g., image replies)
-            state = chat_graph.get_state(
-                config=RunnableConfig(configurable={"thread_id": session.id})
-            )
-            messages = []
-            if state and state.values:
-                messages = list(state.values.get("messages", []))
+        # Count messages from chat_graph state to avoid "missing" messages (e.g., image replies)
+        counts = await _bulk_message_counts([s.id for s in sessions if s.id])
 
-            responses.append(
+        return _orjson_response(
+            [
                 ChatSessionResponse(
                     id=session.id or "",
                     title=session.title or "Untitled Session",
                     notebook_id=notebook_id,
                     created=str(session.created),
                     updated=str(session.updated),
-                    message_count=len(messages),
+                    message_count=counts.get(session.id or "", 0),
                     model_override=getattr(session, "model_override", None),
                 )
-            )
-
-        return responses
+                for session in sessions
+            ]
+        )
     except NotFoundError:
         raise HTTPException(status_code=404, detail="Notebook not found")
     except Exception as e:
@@ -200,11 +371,11 @@ async def create_session(request: CreateSessionRequest, user_id: str = Depends(g
     """Create a new chat session."""
     try:
         # Verify notebook exists
-        notebook = await _ensure_notebook_owned(request.notebook_id, user_id)
+        await _ensure_notebook_owned(request.notebook_id, user_id)
 
         # Create new session
         session = ChatSession(
-            title=request.title or f"Chat Session {asyncio.get_event_loop().time():.0f}",
+            title=request.title or f"Chat Session {int(time.time())}",
             model_override=request.model_override,
             owner=user_id,
         )
@@ -237,43 +408,23 @@ async def create_session(request: CreateSessionRequest, user_id: str = Depends(g
 async def get_session(session_id: str, user_id: str = Depends(get_current_user_id)):
     """Get a specific session with its messages."""
     try:
-        # Get session
-        session = await _ensure_session_owned(session_id, user_id)
-        logger.info("get_session: id=%s user=%s", session_id, user_id)
-
-        # Get session state from LangGraph to retrieve messages
-        thread_state = chat_graph.get_state(
-            config=RunnableConfig(configurable={"thread_id": session_id})
+        # Load the session (with its notebook relationship) and its LangGraph
+        # state concurrently; the state is discarded if the ownership check fails.
+        (session, notebook_id), thread_state = await asyncio.gather(
+            _ensure_session_owned_with_notebook(session_id, user_id),
+            chat_graph.aget_state(
+                config=RunnableConfig(configurable={"thread_id": session_id})
+            ),
         )
+        logger.info("get_session: id={} user={}", session_id, user_id)
 
         # Extract messages from state
-        messages: list[ChatMessage] = []
-        if thread_state and thread_state.values and "messages" in thread_state.values:
-            for msg in thread_state.values["messages"]:
-                messages.append(
-                    ChatMessage(
-                        id=getattr(msg, "id", f"msg_{len(messages)}"),
-                        type=msg.type if hasattr(msg, "type") else "unknown",
-                        content=_render_message(msg),
-                        timestamp=None,  # LangChain messages don't have timestamps by default
-                    )
-                )
-        logger.debug("get_session: recovered %s messages from state", len(messages))
-
-        # Find notebook_id (we need to query the relationship)
-        # Ensure session_id has proper table prefix
-        full_session_id = (
-            session_id
-            if session_id.startswith("chat_session:")
-            else f"chat_session:{session_id}"
-        )
-
-        notebook_query = await repo_query(
-            "SELECT out FROM refers_to WHERE in = $session_id",
-            {"session_id": ensure_record_id(full_session_id)},
+        messages = _to_chat_messages(
+            thread_state.values.get("messages", [])
+            if thread_state and thread_state.values
+            else []
         )
-
-        notebook_id = notebook_query[0]["out"] if notebook_query else None
+        logger.debug("get_session: recovered {} messages from state", len(messages))
 
         if not notebook_id:
             # This might be an old session created before API migration
@@ -281,15 +432,17 @@ async def get_session(session_id: str, user_id: str = Depends(get_current_user_i
                 f"No notebook relationship found for session {session_id} - may be an orphaned session"
             )
 
-        return ChatSessionWithMessagesResponse(
-            id=session.id or "",
-            title=session.title or "Untitled Session",
-            notebook_id=notebook_id,
-            created=str(session.created),
-            updated=str(session.updated),
-            message_count=len(messages),
-            messages=messages,
-            model_override=getattr(session, "model_override", None),
+        return _orjson_response(
+            ChatSessionWithMessagesResponse(
+                id=session.id or "",
+                title=session.title or "Untitled Session",
+                notebook_id=notebook_id,
+                created=str(session.created),
+                updated=str(session.updated),
+                message_count=len(messages),
+                messages=messages,
+                model_override=getattr(session, "model_override", None),
+            )
         )
     except NotFoundError:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -302,7 +455,7 @@ async def get_session(session_id: str, user_id: str = Depends(get_current_user_i
 async def update_session(session_id: str, request: UpdateSessionRequest, user_id: str = Depends(get_current_user_id)):
     """Update session title."""
     try:
-        session = await _ensure_session_owned(session_id, user_id)
+        session, notebook_id = await _ensure_session_owned_with_notebook(session_id, user_id)
 
         update_data = request.model_dump(exclude_unset=True)
 
@@ -314,19 +467,6 @@ async def update_session(session_id: str, request: UpdateSessionRequest, user_id
 
         await session.save()
 
-        # Find notebook_id
-        # Ensure session_id has proper table prefix
-        full_session_id = (
-            session_id
-            if session_id.startswith("chat_session:")
-            else f"chat_session:{session_id}"
-        )
-        notebook_query = await repo_query(
-            "SELECT out FROM refers_to WHERE in = $session_id",
-            {"session_id": ensure_record_id(full_session_id)},
-        )
-        notebook_id = notebook_query[0]["out"] if notebook_query else None
-
         return ChatSessionResponse(
             id=session.id or "",
             title=session.title or "",
@@ -344,11 +484,9 @@ async def update_session(session_id: str, request: UpdateSessionRequest, user_id
 
 
 @router.delete("/chat/sessions/{session_id}", response_model=SuccessResponse)
-async def delete_session(session_id: str, user_id: str = Depends(get_current_user_id)):
+async def delete_session(session: ChatSession = Depends(owned_session)):
     """Delete a chat session."""
     try:
-        session = await _ensure_session_owned(session_id, user_id)
-
         await session.delete()
 
         return SuccessResponse(success=True, message="Session deleted successfully")
@@ -359,53 +497,74 @@ async def delete_session(session_id: str, user_id: str = Depends(get_current_use
         raise HTTPException(status_code=500, detail=f"Error deleting session: {str(e)}")
 
 
+def _prepare_chat_state(
+    request: ExecuteChatRequest, session: ChatSession
+) -> Tuple[Dict[str, Any], Optional[str]]:
+    """
+    Build the graph input for a text chat turn and the effective model override.
+    Only the new user message is sent: the checkpointer restores the thread's
+    history and the add_messages reducer appends to it.
+    """
+    # Determine model override (per-request override takes precedence over session-level)
+    model_override = (
+        request.model_override
+        if request.model_override is not None
+        else getattr(session, "model_override", None)
+    )
+
+    state_input: Dict[str, Any] = {
+        "messages": [HumanMessage(content=request.message)],
+        "context": request.context.to_state(),
+        "model_override": model_override,
+        "image_generation": None,
+    }
+    return state_input, model_override
+
+
+async def _prepare_chat_turn(
+    request: ExecuteChatRequest, user_id: str
+) -> Tuple[ChatSession, Dict[str, Any], Optional[str]]:
+    """
+    Validate the session and build the graph input. When the client sends a
+    context_config, the context is resolved concurrently with the session
+    checks instead of costing the client a separate /chat/context round-trip.
+    """
+    context_task = (
+        asyncio.create_task(_build_context_payload(user_id, request.context_config))
+        if request.context_config
+        else None
+    )
+    try:
+        session = await _ensure_session_owned(request.session_id, user_id)
+        state_values, model_override = _prepare_chat_state(request, session)
+        if context_task is not None:
+            state_values["context"] = await context_task
+    finally:
+        if context_task is not None and not context_task.done():
+            context_task.cancel()
+    return session, state_values, model_override
+
+
 @router.post("/chat/execute", response_model=ExecuteChatResponse)
 async def execute_chat(request: ExecuteChatRequest, user_id: str = Depends(get_current_user_id)):
     """Execute a chat request and get AI response."""
     try:
-        # Verify session exists
-        session = await _ensure_session_owned(request.session_id, user_id)
+        # Verify session exists and build the graph input
+        session, state_values, model_override = await _prepare_chat_turn(request, user_id)
+        context = state_values.get("context") or {}
         logger.info(
-            "chat_execute: session=%s notebook=%s model_override=%s ctx_sources=%s ctx_notes=%s",
+            "chat_execute: session={} notebook={} model_override={} ctx_sources={} ctx_notes={}",
             request.session_id,
             getattr(session, "notebook_id", None),
             request.model_override,
-            len(request.context.get("sources", [])) if request.context else 0,
-            len(request.context.get("notes", [])) if request.context else 0,
-        )
-
-        # Determine model override (per-request override takes precedence over session-level)
-        model_override = (
-            request.model_override
-            if request.model_override is not None
-            else getattr(session, "model_override", None)
-        )
-
-        # Get current state
-        current_state = chat_graph.get_state(
-            config=RunnableConfig(
-                configurable={"thread_id": request.session_id}
-            )
+            len(context.get("sources", [])),
+            len(context.get("notes", [])),
         )
 
-        # Prepare state for execution
-        state_values = current_state.values if current_state else {}
-        state_values["messages"] = state_values.get("messages", [])
-        state_values["context"] = request.context
-        state_values["model_override"] = model_override
-        state_values["image_generation"] = None
-
-        # Add user message to state
-        user_message = HumanMessage(content=request.message)
-        state_values["messages"].append(user_message)
-
         # Primary path: call chat_graph with timeout; surface errors instead of silent fallback
-        import asyncio
-
-        timeout_s = int(os.getenv("CHAT_TIMEOUT_SECONDS", "40"))
         try:
             result = await asyncio.wait_for(
-                chat_graph.ainvoke(  # type: ignore[arg-type]
+                chat_graph.ainvoke(  # type: ignore[call-overload]
                     input=state_values,
                     config=RunnableConfig(
                         configurable={
@@ -414,35 +573,23 @@ async def execute_chat(request: ExecuteChatRequest, user_id: str = Depends(get_c
                         }
                     ),
                 ),
-                timeout=timeout_s,
+                timeout=CHAT_TIMEOUT_SECONDS,
             )
         except asyncio.TimeoutError:
-            logger.error(f"Chat graph timed out after {timeout_s}s")
+            logger.error(f"Chat graph timed out after {CHAT_TIMEOUT_SECONDS}s")
             raise HTTPException(status_code=504, detail="Chat generation timed out. Please retry.")
         except Exception as e:
             logger.error(f"Chat graph failed: {e}")
             raise HTTPException(status_code=500, detail=f"Chat generation failed: {e}")
 
-        # Persist messages back into graph state so subsequent fetches see them
-        chat_graph.update_state(
-            config=RunnableConfig(configurable={"thread_id": request.session_id}),
-            values={"messages": result.get("messages", [])},
-        )
-        await session.save()
+        # The checkpointer has already persisted the run; result holds the full thread
+        await _touch_session(session)
 
-        messages: list[ChatMessage] = []
-        for msg in result.get("messages", []):
-            msg_id = getattr(msg, "id", None) or f"msg_{len(messages)}"
-            messages.append(
-                ChatMessage(
-                    id=msg_id,
-                    type=msg.type if hasattr(msg, "type") else "unknown",
-                    content=_render_message(msg),
-                    timestamp=None,
-                )
-            )
+        messages = _to_chat_messages(result.get("messages", []))
 
-        return ExecuteChatResponse(session_id=request.session_id, messages=messages)
+        return _orjson_response(
+            ExecuteChatResponse(session_id=request.session_id, messages=messages)
+        )
     except NotFoundError:
         raise HTTPException(status_code=404, detail="Session not found")
     except Exception as e:
@@ -450,6 +597,77 @@ async def execute_chat(request: ExecuteChatRequest, user_id: str = Depends(get_c
         raise HTTPException(status_code=500, detail=f"Error executing chat: {str(e)}")
 
 
+def _sse(event: Dict[str, Any]) -> bytes:
+    return b"data: " + orjson.dumps(event) + b"\n\n"
+
+
+async def stream_chat_response(
+    session_id: str, state_values: Dict[str, Any], model_override: Optional[str]
+) -> AsyncGenerator[bytes, None]:
+    """
+    Stream a chat turn as Server-Sent Events: `token` events while the model
+    generates, then the full `messages` list and a `complete` marker. The graph's
+    checkpointer persists the final state when the run finishes.
+    """
+    final_state: Optional[Dict[str, Any]] = None
+    try:
+        async for mode, payload in chat_graph.astream(  # type: ignore[call-overload]
+            input=state_values,
+            config=RunnableConfig(
+                configurable={"thread_id": session_id, "model_id": model_override}
+            ),
+            stream_mode=["messages", "values"],
+        ):
+            if mode == "messages":
+                chunk, _metadata = payload
+                if getattr(chunk, "type", None) not in ("ai", "AIMessageChunk"):
+                    continue
+                # Every chunk of one response shares the message id, so chunks
+                # are rendered directly and never through the id-keyed cache
+                content = getattr(chunk, "content", None)
+                text = content if isinstance(content, str) else _render_content(content)
+                if text:
+                    yield _sse({"type": "token", "content": text})
+            elif mode == "values":
+                final_state = payload
+
+        messages = [
+            {
+                "id": getattr(msg, "id", None) or f"msg_{i}",
+                "type": getattr(msg, "type", "unknown"),
+                "content": _render_message(msg),
+                "timestamp": None,
+            }
+            for i, msg in enumerate((final_state or {}).get("messages", []))
+        ]
+        yield _sse({"type": "messages", "session_id": session_id, "messages": messages})
+        yield _sse({"type": "complete"})
+    except Exception as e:
+        logger.error(f"Error in chat streaming: {str(e)}")
+        yield _sse({"type": "error", "message": str(e)})
+
+
+@router.post("/chat/stream")
+async def stream_chat(request: ExecuteChatRequest, user_id: str = Depends(get_current_user_id)):
+    """Execute a chat request and stream the AI response as Server-Sent Events."""
+    try:
+        session, state_values, model_override = await _prepare_chat_turn(request, user_id)
+        await _touch_session(session)
+    except NotFoundError:
+        raise HTTPException(status_code=404, detail="Session not found")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error starting chat stream: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error executing chat: {str(e)}")
+
+    return StreamingResponse(
+        stream_chat_response(request.session_id, state_values, model_override),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/chat/image", response_model=ExecuteChatResponse)
 async def generate_image(request: GenerateImageRequest):
     """Generate an image via Nano Banana models and store messages in the chat session."""
@@ -460,24 +678,19 @@ async def generate_image(request: GenerateImageRequest):
             request.model_override,
             request.image_model_id,
             request.use_rag,
-            len(request.context.get("sources", [])) if request.context else 0,
-            len(request.context.get("notes", [])) if request.context else 0,
+            len(request.context.sources),
+            len(request.context.notes),
         )
-        full_session_id = (
-            request.session_id
-            if request.session_id.startswith("chat_session:")
-            else f"chat_session:{request.session_id}"
+        # The session, image model and graph state are independent lookups
+        session, image_model, current_state = await asyncio.gather(
+            ChatSession.get(with_table_prefix(request.session_id, "chat_session")),
+            Model.get(with_table_prefix(request.image_model_id, "model")),
+            chat_graph.aget_state(
+                config=RunnableConfig(configurable={"thread_id": request.session_id})
+            ),
         )
-        session = await ChatSession.get(full_session_id)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
-
-        image_model_id = (
-            request.image_model_id
-            if request.image_model_id.startswith("model:")
-            else f"model:{request.image_model_id}"
-        )
-        image_model = await Model.get(image_model_id)
         if not image_model:
             raise HTTPException(status_code=404, detail="Image model not found")
         if image_model.type != "image":
@@ -491,12 +704,11 @@ async def generate_image(request: GenerateImageRequest):
             else getattr(session, "model_override", None)
         )
 
-        current_state = chat_graph.get_state(
-            config=RunnableConfig(configurable={"thread_id": request.session_id})
-        )
         state_values = current_state.values if current_state else {}
         state_values["messages"] = state_values.get("messages", [])
-        state_values["context"] = request.context if request.use_rag else {"sources": [], "notes": []}
+        state_values["context"] = (
+            request.context.to_state() if request.use_rag else {"sources": [], "notes": []}
+        )
         state_values["model_override"] = model_override
         state_values["image_generation"] = {
             "image_prompt": request.message,
@@ -538,26 +750,18 @@ async def generate_image(request: GenerateImageRequest):
         result = {"messages": messages_result}
 
         # Persist messages to graph state so they are returned on subsequent fetches
-        chat_graph.update_state(
+        await chat_graph.aupdate_state(
             config=RunnableConfig(configurable={"thread_id": request.session_id}),
             values={"messages": messages_result},
         )
 
-        await session.save()
+        await _touch_session(session)
 
-        messages: list[ChatMessage] = []
-        for msg in result.get("messages", []):
-            msg_id = getattr(msg, "id", None) or f"msg_{len(messages)}"
-            messages.append(
-                ChatMessage(
-                    id=msg_id,
-                    type=msg.type if hasattr(msg, "type") else "unknown",
-                    content=_render_message(msg),
-                    timestamp=None,
-                )
-            )
+        messages = _to_chat_messages(result.get("messages", []))
 
-        return ExecuteChatResponse(session_id=request.session_id, messages=messages)
+        return _orjson_response(
+            ExecuteChatResponse(session_id=request.session_id, messages=messages)
+        )
     except NotFoundError:
         raise HTTPException(status_code=404, detail="Session not found")
     except HTTPException:
@@ -567,94 +771,112 @@ async def generate_image(request: GenerateImageRequest):
         raise HTTPException(status_code=500, detail=f"Error generating image: {str(e)}")
 
 
+async def _build_context_payload(
+    user_id: str,
+    context_config: Optional[Dict[str, Any]],
+    notebook_id: Optional[str] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Resolve a context configuration into source/note context payloads. With an
+    empty configuration, every source and note of the (already owner-checked)
+    notebook is included.
+    """
+    context_data: Dict[str, List[Dict[str, Any]]] = {"sources": [], "notes": []}
+
+    # Process context configuration if provided
+    if context_config:
+        # Load the requested sources and notes the caller owns with one query
+        # per table, then pick each source's context size from its status.
+        source_items = [
+            (with_table_prefix(source_id, "source"), status)
+            for source_id, status in context_config.get("sources", {}).items()
+            if "not in" not in status
+        ]
+        note_items = [
+            (with_table_prefix(note_id, "note"), status)
+            for note_id, status in context_config.get("notes", {}).items()
+            if "not in" not in status and "full content" in status
+        ]
+        owned_sources, owned_notes = await asyncio.gather(
+            Source.get_many([source_id for source_id, _ in source_items], owner=user_id),
+            Note.get_many([note_id for note_id, _ in note_items], owner=user_id),
+        )
+
+        selected_sources: list[tuple[str, Source, Literal["short", "long"]]] = []
+        for source_id, status in source_items:
+            source = owned_sources.get(source_id)
+            if source is None:
+                continue
+            if "insights" in status:
+                selected_sources.append((source_id, source, "short"))
+            elif "full content" in status:
+                selected_sources.append((source_id, source, "long"))
+
+        source_contexts = await asyncio.gather(
+            *(source.get_context(context_size=size) for _, source, size in selected_sources),
+            return_exceptions=True,
+        )
+        for (source_id, _, _), source_context in zip(selected_sources, source_contexts):
+            if isinstance(source_context, BaseException):
+                logger.warning(f"Error processing source {source_id}: {str(source_context)}")
+                continue
+            context_data["sources"].append(source_context)
+
+        # Process notes
+        for note_id, _ in note_items:
+            note = owned_notes.get(note_id)
+            if note is None:
+                continue
+            try:
+                context_data["notes"].append(note.get_context(context_size="long"))
+            except Exception as e:
+                logger.warning(f"Error processing note {note_id}: {str(e)}")
+    elif notebook_id is not None:
+        # Default behavior - include all sources and notes with full context so RAG has real content
+        notebook = await Notebook.get(notebook_id)
+        sources, notes = await asyncio.gather(notebook.get_sources(), notebook.get_notes())
+
+        # The notebook listings omit full text, so reload the full records
+        full_sources, full_notes = await asyncio.gather(
+            Source.get_many([s.id for s in sources if s.id]),
+            Note.get_many([n.id for n in notes if n.id]),
+        )
+        kept_sources = [full_sources.get(str(source.id)) or source for source in sources]
+        source_contexts = await asyncio.gather(
+            *(source.get_context(context_size="long") for source in kept_sources),
+            return_exceptions=True,
+        )
+        for source, source_context in zip(kept_sources, source_contexts):
+            if isinstance(source_context, BaseException):
+                logger.warning(f"Error processing source {source.id}: {str(source_context)}")
+                continue
+            context_data["sources"].append(source_context)
+
+        for note in notes:
+            try:
+                context_data["notes"].append(
+                    (full_notes.get(str(note.id)) or note).get_context(context_size="long")
+                )
+            except Exception as e:
+                logger.warning(f"Error processing note {note.id}: {str(e)}")
+
+    return context_data
+
+
 @router.post("/chat/context", response_model=BuildContextResponse)
 async def build_context(request: BuildContextRequest, user_id: str = Depends(get_current_user_id)):
     """Build context for a notebook based on context configuration."""
     try:
         # Verify notebook exists
-        notebook = await _ensure_notebook_owned(request.notebook_id, user_id)
-
-        context_data: dict[str, list[dict[str, str]]] = {"sources": [], "notes": []}
-        total_content = ""
-
-        # Process context configuration if provided
-        if request.context_config:
-            # Process sources
-            for source_id, status in request.context_config.get("sources", {}).items():
-                if "not in" in status:
-                    continue
-
-                try:
-                    # Add table prefix if not present
-                    full_source_id = (
-                        source_id
-                        if source_id.startswith("source:")
-                        else f"source:{source_id}"
-                    )
-
-                    try:
-                        source = await Source.get(full_source_id)
-                    except Exception:
-                        continue
-                    if not source or str(source.owner) != str(user_id):
-                        continue
-
-                    if "insights" in status:
-                        source_context = await source.get_context(context_size="short")
-                        context_data["sources"].append(source_context)
-                        total_content += str(source_context)
-                    elif "full content" in status:
-                        source_context = await source.get_context(context_size="long")
-                        context_data["sources"].append(source_context)
-                        total_content += str(source_context)
-                except Exception as e:
-                    logger.warning(f"Error processing source {source_id}: {str(e)}")
-                    continue
-
-            # Process notes
-            for note_id, status in request.context_config.get("notes", {}).items():
-                if "not in" in status:
-                    continue
+        notebook_id = await _ensure_notebook_owned(request.notebook_id, user_id)
 
-                try:
-                    # Add table prefix if not present
-                    full_note_id = (
-                        note_id if note_id.startswith("note:") else f"note:{note_id}"
-                    )
-                    note = await Note.get(full_note_id)
-                    if not note or str(note.owner) != str(user_id):
-                        continue
-
-                    if "full content" in status:
-                        note_context = note.get_context(context_size="long")
-                        context_data["notes"].append(note_context)
-                        total_content += str(note_context)
-                except Exception as e:
-                    logger.warning(f"Error processing note {note_id}: {str(e)}")
-                    continue
-        else:
-            # Default behavior - include all sources and notes with full context so RAG has real content
-            sources = await notebook.get_sources()
-            for source in sources:
-                try:
-                    full_source = await Source.get(source.id) or source
-                    source_context = await full_source.get_context(context_size="long")
-                    context_data["sources"].append(source_context)
-                    total_content += str(source_context)
-                except Exception as e:
-                    logger.warning(f"Error processing source {source.id}: {str(e)}")
-                    continue
+        context_data = await _build_context_payload(
+            user_id, request.context_config, notebook_id
+        )
 
-            notes = await notebook.get_notes()
-            for note in notes:
-                try:
-                    full_note = await Note.get(note.id) or note
-                    note_context = full_note.get_context(context_size="long")
-                    context_data["notes"].append(note_context)
-                    total_content += str(note_context)
-                except Exception as e:
-                    logger.warning(f"Error processing note {note.id}: {str(e)}")
-                    continue
+        total_content = "".join(
+            str(item) for item in (*context_data["sources"], *context_data["notes"])
+        )
 
         # Calculate character and token counts
         char_count = len(total_content)
@@ -679,29 +901,53 @@ async def build_context(request: BuildContextRequest, user_id: str = Depends(get
 
 def _iter_messages(raw_messages: Any) -> Iterable[Any]:
     """LangGraph can return a single message or a list; normalize to an iterable."""
-    if raw_messages is None:
-        return []
-    if isinstance(raw_messages, BaseMessage):
-        return [raw_messages]
+    # Lists are by far the common case, so test for them first
     if isinstance(raw_messages, list):
         return raw_messages
+    if raw_messages is None:
+        return []
     if isinstance(raw_messages, tuple):
-        return list(raw_messages)
+        return raw_messages
     return [raw_messages]
 
 
+# Rendered text of structured (multi-part) message content, keyed by message
+# id. Complete messages never change, so repeated session fetches only pay the
+# rendering cost for messages they have not seen before. Streamed chunks share
+# their message's id while each carries different content, so they are never
+# cached.
+RENDER_CACHE_MAXSIZE = 4096
+_render_cache: TTLCache[str, str] = TTLCache(RENDER_CACHE_MAXSIZE)
+
+
+def _render_content(content: Any) -> str:
+    try:
+        rendered = render_message_content(content)
+    except Exception:
+        rendered = str(content)
+    return rendered if isinstance(rendered, str) else str(rendered)
+
+
 def _render_message(msg: Any) -> str:
     """
     Normalize LangChain/Gemini message payloads into plain text for responses.
     Some providers return structured content (lists of parts, inline data, etc.)
     and FastAPI's response validation requires that we always emit strings.
     """
-    if isinstance(msg, dict) and "content" in msg:
-        content = msg["content"]
-    else:
-        content = getattr(msg, "content", msg)
-    try:
-        rendered = render_message_content(content)
-    except Exception:
-        rendered = str(content)
-    return rendered if isinstance(rendered, str) else str(rendered)
+    is_dict = isinstance(msg, dict) and "content" in msg
+    content = msg["content"] if is_dict else getattr(msg, "content", msg)
+    if isinstance(content, str):
+        return content
+
+    msg_id = msg.get("id") if is_dict else getattr(msg, "id", None)
+    msg_type = msg.get("type") if is_dict else getattr(msg, "type", None)
+    is_chunk = isinstance(msg_type, str) and msg_type.endswith("Chunk")
+    if not (isinstance(msg_id, str) and msg_id and not is_chunk):
+        return _render_content(content)
+
+    cached = _render_cache.get(msg_id)
+    if cached is not None:
+        return cached
+    rendered = _render_content(content)
+    _render_cache.set(msg_id, rendered)
+    return rendered
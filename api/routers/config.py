@@ -1,36 +1,77 @@
 import asyncio
+import functools
 import os
 import time
 import tomllib
+from dataclasses import dataclass, replace
 from pathlib import Path
 from typing import Optional
 
 from fastapi import APIRouter, Request
+from fastapi.responses import ORJSONResponse
 from loguru import logger
 
 from open_notebook.database.repository import repo_query
 from open_notebook.utils.version_utils import (
     compare_versions,
-    get_version_from_github,
+    get_version_from_github_conditional,
 )
 from api.infrastructure_service import is_db_vm_configured
 
 router = APIRouter()
 
-# In-memory cache for version check results
-_version_cache: dict = {
-    "latest_version": None,
-    "has_update": False,
-    "timestamp": 0,
-    "check_failed": False,
-}
+@dataclass(frozen=True)
+class VersionCache:
+    latest_version: Optional[str] = None
+    has_update: bool = False
+    timestamp: float = 0.0
+    check_failed: bool = False
+    next_retry: float = 0.0
+    etag: Optional[str] = None
+
+
+# In-memory cache for version check results. Immutable and replaced with a
+# single assignment, so readers never see a half-updated entry.
+_version_cache = VersionCache()
 
 # Cache TTL in seconds (24 hours)
 VERSION_CACHE_TTL = 24 * 60 * 60
 
+# Backoff before retrying GitHub after a failed check (5 minutes)
+VERSION_RETRY_BACKOFF = 5 * 60
+
+# Deployment flags; the environment is fixed for the life of the process
+_DEV_MODE = os.environ.get("NODE_ENV") == "development"
+_SKIP_VERSION_CHECK = os.environ.get("SKIP_VERSION_CHECK") == "1" or _DEV_MODE
+_SKIP_DB_HEALTH_CHECK = os.environ.get("SKIP_DB_HEALTH_CHECK") == "1" or _DEV_MODE
+_SKIP_DB_VM_CHECK = os.environ.get("SKIP_DB_VM_CHECK") == "1" or _DEV_MODE
+
+# Keep the endpoint fast for UI polling; Surreal should answer RETURN 1 quickly
+DB_HEALTH_CHECK_TIMEOUT = float(os.environ.get("DB_HEALTH_CHECK_TIMEOUT", "1.0"))
+
+# Circuit breaker: after a few consecutive failures (e.g. the DB VM is suspended),
+# report offline without probing until the cooldown passes.
+DB_HEALTH_FAILURE_THRESHOLD = 3
+DB_HEALTH_COOLDOWN_SECONDS = 10.0
+_db_fail_count = 0
+_db_cooldown_until = 0.0
+_db_last_error: Optional[str] = None
+
+# Whole /config payload is reused for a few seconds so frontend polling does
+# not re-probe the database on every request.
+CONFIG_RESPONSE_CACHE_TTL = float(os.environ.get("CONFIG_RESPONSE_CACHE_TTL", "3.0"))
+_config_response_cache: tuple[float, dict] | None = None
+_config_response_lock = asyncio.Lock()
 
+# Single-flight guard so an expired cache triggers one GitHub fetch, not N
+_version_refresh_lock = asyncio.Lock()
+# Background refresh in flight, if any (held so the task isn't garbage collected)
+_version_refresh_task: Optional[asyncio.Task] = None
+
+
+@functools.lru_cache(maxsize=1)
 def get_version() -> str:
-    """Read version from pyproject.toml"""
+    """Read version from pyproject.toml (once; it does not change at runtime)"""
     try:
         pyproject_path = Path(__file__).parent.parent.parent / "pyproject.toml"
         with open(pyproject_path, "rb") as f:
@@ -41,36 +82,88 @@ def get_version() -> str:
         return "unknown"
 
 
-def get_latest_version_cached(current_version: str) -> tuple[Optional[str], bool]:
+def _cached_version_result() -> Optional[tuple[Optional[str], bool]]:
+    """Return the cached (latest_version, has_update) if no refresh is due yet."""
+    cache = _version_cache
+    now = time.time()
+    # After a failure, keep serving the last known result until the backoff ends
+    if cache.check_failed and now < cache.next_retry:
+        return cache.latest_version, cache.has_update
+    cache_age = now - cache.timestamp
+    if cache.timestamp > 0 and cache_age < VERSION_CACHE_TTL:
+        logger.debug(f"Using cached version check result (age: {cache_age:.0f}s)")
+        return cache.latest_version, cache.has_update
+    return None
+
+
+async def get_latest_version_cached(current_version: str) -> tuple[Optional[str], bool]:
     """
     Check for the latest version from GitHub with caching.
 
+    Once a result has been cached, an expired entry is served as-is while a
+    background task refreshes it, so callers never wait on GitHub. Only the very
+    first check blocks, and concurrent callers share that single fetch.
+
     Returns:
         tuple: (latest_version, has_update)
         - latest_version: str or None if check failed
         - has_update: bool indicating if update is available
     """
-    global _version_cache
+    cached = _cached_version_result()
+    if cached is not None:
+        return cached
 
-    # Check if cache is still valid (within TTL)
-    cache_age = time.time() - _version_cache["timestamp"]
-    if _version_cache["timestamp"] > 0 and cache_age < VERSION_CACHE_TTL:
-        logger.debug(f"Using cached version check result (age: {cache_age:.0f}s)")
-        return _version_cache["latest_version"], _version_cache["has_update"]
+    if _version_cache.timestamp > 0:
+        _schedule_version_refresh(current_version)
+        return _version_cache.latest_version, _version_cache.has_update
 
-    # Cache expired or not yet set
-    if _version_cache["timestamp"] > 0:
+    return await _refresh_version_single_flight(current_version)
+
+
+def _schedule_version_refresh(current_version: str) -> None:
+    global _version_refresh_task
+    if _version_refresh_task is None or _version_refresh_task.done():
+        _version_refresh_task = asyncio.create_task(
+            _refresh_version_single_flight(current_version)
+        )
+
+
+async def _refresh_version_single_flight(current_version: str) -> tuple[Optional[str], bool]:
+    async with _version_refresh_lock:
+        # Another request may have refreshed while we waited
+        cached = _cached_version_result()
+        if cached is not None:
+            return cached
+        return await _refresh_latest_version(current_version)
+
+
+async def _refresh_latest_version(current_version: str) -> tuple[Optional[str], bool]:
+    """Fetch the latest version from GitHub and update the cache."""
+    global _version_cache
+    cache = _version_cache
+    if cache.timestamp > 0:
+        cache_age = time.time() - cache.timestamp
         logger.info(f"Version cache expired (age: {cache_age:.0f}s), refreshing...")
 
     # Perform version check with strict error handling
     try:
         logger.info("Checking for latest version from GitHub...")
 
-        # Fetch latest version from GitHub with 10-second timeout
-        latest_version = get_version_from_github(
+        # Fetch latest version from GitHub with 10-second timeout. Revalidate
+        # with the last ETag only when there is a cached version to fall back on.
+        etag = cache.etag if cache.latest_version else None
+        latest_version, etag = await asyncio.to_thread(
+            get_version_from_github_conditional,
             "https://github.com/lfnovo/open-notebook",
-            "main"
+            "main",
+            etag,
         )
+        if latest_version is None:
+            logger.info("GitHub version unchanged since last check (304)")
+            if cache.latest_version is None:
+                # Only revalidated when a version is cached; treat as a failed check
+                raise RuntimeError("GitHub returned 304 with no cached version")
+            latest_version = cache.latest_version
 
         logger.info(f"Latest version from GitHub: {latest_version}, Current version: {current_version}")
 
@@ -78,10 +171,12 @@ def get_latest_version_cached(current_version: str) -> tuple[Optional[str], bool
         has_update = compare_versions(current_version, latest_version) < 0
 
         # Cache the result
-        _version_cache["latest_version"] = latest_version
-        _version_cache["has_update"] = has_update
-        _version_cache["timestamp"] = time.time()
-        _version_cache["check_failed"] = False
+        _version_cache = VersionCache(
+            latest_version=latest_version,
+            has_update=has_update,
+            timestamp=time.time(),
+            etag=etag,
+        )
 
         logger.info(f"Version check complete. Update available: {has_update}")
 
@@ -90,13 +185,14 @@ def get_latest_version_cached(current_version: str) -> tuple[Optional[str], bool
     except Exception as e:
         logger.warning(f"Version check failed: {e}")
 
-        # Cache the failure to avoid repeated attempts
-        _version_cache["latest_version"] = None
-        _version_cache["has_update"] = False
-        _version_cache["timestamp"] = time.time()
-        _version_cache["check_failed"] = True
+        # Keep the last known-good result and back off before retrying
+        _version_cache = replace(
+            cache,
+            check_failed=True,
+            next_retry=time.time() + VERSION_RETRY_BACKOFF,
+        )
 
-        return None, False
+        return cache.latest_version, cache.has_update
 
 
 async def check_database_health() -> dict:
@@ -106,19 +202,71 @@ async def check_database_health() -> dict:
     Returns:
         dict with 'status' ("online" | "offline") and optional 'error'
     """
-    timeout_s = 3.0  # keep the endpoint fast for UI; Surreal should respond quickly to RETURN 1
+    global _db_fail_count, _db_cooldown_until, _db_last_error
+
+    if time.monotonic() < _db_cooldown_until:
+        return {"status": "offline", "error": _db_last_error}
+
+    timeout_s = DB_HEALTH_CHECK_TIMEOUT
     try:
-        result = await asyncio.wait_for(repo_query("RETURN 1"), timeout=timeout_s)
+        async with asyncio.timeout(timeout_s):
+            result = await repo_query("RETURN 1")
         if result:
+            _db_fail_count = 0
             return {"status": "online"}
-        return {"status": "offline", "error": "Empty result"}
+        error = "Empty result"
     except asyncio.TimeoutError:
-        msg = f"Health check timed out after {timeout_s} seconds"
-        logger.warning(msg)
-        return {"status": "offline", "error": msg}
+        error = f"Health check timed out after {timeout_s} seconds"
+        logger.warning(error)
     except Exception as e:
         logger.warning(f"Database health check failed: {e}")
-        return {"status": "offline", "error": str(e)}
+        error = str(e)
+
+    _db_fail_count += 1
+    _db_last_error = error
+    if _db_fail_count >= DB_HEALTH_FAILURE_THRESHOLD:
+        _db_cooldown_until = time.monotonic() + DB_HEALTH_COOLDOWN_SECONDS
+        logger.info(
+            f"Database health check failed {_db_fail_count} times in a row; "
+            f"skipping probes for {DB_HEALTH_COOLDOWN_SECONDS:.0f}s"
+        )
+    return {"status": "offline", "error": error}
+
+
+async def _check_latest_version(
+    current_version: str, skip: bool
+) -> tuple[Optional[str], bool]:
+    """Version check (with caching); optionally skipped in dev."""
+    if skip:
+        return None, False
+    try:
+        return await get_latest_version_cached(current_version)
+    except Exception as e:
+        # Extra safety: ensure version check never breaks the config endpoint
+        logger.error(f"Unexpected error during version check: {e}")
+        return None, False
+
+
+async def _check_db_health(skip: bool) -> dict:
+    """Database health, unless explicitly skipped in dev."""
+    if skip:
+        return {"status": "online", "skipped": True}
+    db_health = await check_database_health()
+    if db_health["status"] == "offline":
+        logger.warning(f"Database offline: {db_health.get('error', 'Unknown error')}")
+    return db_health
+
+
+async def _check_db_vm_enabled(skip: bool) -> bool:
+    """Whether DB VM controls are configured; resolving credentials may block."""
+    if skip:
+        return False
+    try:
+        db_vm_enabled, _ = await asyncio.to_thread(is_db_vm_configured)
+        return db_vm_enabled
+    except Exception as exc:  # noqa: BLE001
+        logger.warning(f"DB VM config check failed: {exc}")
+        return False
 
 
 @router.get("/config")
@@ -131,43 +279,36 @@ async def get_config(request: Request):
     so this endpoint no longer returns apiUrl.
 
     Also checks for version updates from GitHub (with caching and error handling).
+    The assembled response is cached for CONFIG_RESPONSE_CACHE_TTL seconds.
     """
+    global _config_response_cache
+
+    cached = _config_response_cache
+    if cached is not None and time.monotonic() - cached[0] < CONFIG_RESPONSE_CACHE_TTL:
+        return ORJSONResponse(cached[1])
+
+    async with _config_response_lock:
+        # Another request may have rebuilt the payload while we waited
+        cached = _config_response_cache
+        if cached is not None and time.monotonic() - cached[0] < CONFIG_RESPONSE_CACHE_TTL:
+            return ORJSONResponse(cached[1])
+        config = await _build_config()
+        _config_response_cache = (time.monotonic(), config)
+        return ORJSONResponse(config)
+
+
+async def _build_config() -> dict:
+    """Run the version, database and VM checks and assemble the /config payload."""
     # Get current version
     current_version = get_version()
 
-    # Check for updates (with caching and error handling) — optionally skipped in dev
-    skip_version_check = os.environ.get("SKIP_VERSION_CHECK") == "1" or os.environ.get("NODE_ENV") == "development"
-    latest_version = None
-    has_update = False
-
-    if not skip_version_check:
-        try:
-            latest_version, has_update = get_latest_version_cached(current_version)
-        except Exception as e:
-            # Extra safety: ensure version check never breaks the config endpoint
-            logger.error(f"Unexpected error during version check: {e}")
-
-    # Check database health (skip in dev when explicitly requested)
-    skip_db_health = os.environ.get("SKIP_DB_HEALTH_CHECK") == "1" or os.environ.get("NODE_ENV") == "development"
-    if skip_db_health:
-        db_health = {"status": "online", "skipped": True}
-        db_status = "online"
-    else:
-        db_health = await check_database_health()
-        db_status = db_health["status"]
-        if db_status == "offline":
-            logger.warning(f"Database offline: {db_health.get('error', 'Unknown error')}")
-
-    skip_db_vm_check = os.environ.get("SKIP_DB_VM_CHECK") == "1" or os.environ.get("NODE_ENV") == "development"
-    db_vm_enabled = True
-    if skip_db_vm_check:
-        db_vm_enabled = False
-    else:
-        try:
-            db_vm_enabled, _ = is_db_vm_configured()
-        except Exception as exc:  # noqa: BLE001
-            logger.warning(f"DB VM config check failed: {exc}")
-            db_vm_enabled = False
+    # The three checks are independent I/O, so run them concurrently
+    (latest_version, has_update), db_health, db_vm_enabled = await asyncio.gather(
+        _check_latest_version(current_version, _SKIP_VERSION_CHECK),
+        _check_db_health(_SKIP_DB_HEALTH_CHECK),
+        _check_db_vm_enabled(_SKIP_DB_VM_CHECK),
+    )
+    db_status = db_health["status"]
 
     return {
         "version": current_version,
@@ -175,7 +316,7 @@ async def get_config(request: Request):
         "hasUpdate": has_update,
         "dbStatus": db_status,
         "dbVmEnabled": db_vm_enabled,
-        "dbHealthSkipped": skip_db_health,
-        "versionCheckSkipped": skip_version_check,
-        "dbVmCheckSkipped": skip_db_vm_check,
+        "dbHealthSkipped": _SKIP_DB_HEALTH_CHECK,
+        "versionCheckSkipped": _SKIP_VERSION_CHECK,
+        "dbVmCheckSkipped": _SKIP_DB_VM_CHECK,
     }
@@ -1,11 +1,15 @@
-from typing import List, Optional
+from typing import AsyncGenerator, AsyncIterator, List, Optional
 
+import orjson
 from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from loguru import logger
 from pydantic import BaseModel, Field
 
 from api.deps import get_current_user_id
 from open_notebook.utils.google_drive import (
+    DriveFile,
+    DriveLink,
     GoogleDriveClient,
     export_mime_for,
     parse_drive_url,
@@ -13,6 +17,28 @@ from open_notebook.utils.google_drive import (
 
 router = APIRouter(prefix="/drive", tags=["drive"])
 
+_GAPPS_PREFIX = "application/vnd.google-apps."
+
+
+def _classify(mime_type: str) -> tuple[bool, Optional[str]]:
+    """Return (is_google_doc, export_mime_type) for a Drive MIME type."""
+    is_google_doc = mime_type.startswith(_GAPPS_PREFIX)
+    return is_google_doc, export_mime_for(mime_type) if is_google_doc else None
+
+
+def _resolved_item(file: DriveFile, web_view_url: str) -> dict:
+    """Plain-dict DriveResolvedItem; large folders skip per-item model validation."""
+    is_google_doc, export_mime_type = _classify(file.mime_type)
+    return {
+        "id": file.id,
+        "name": file.name,
+        "mime_type": file.mime_type,
+        "resource_key": file.resource_key,
+        "is_google_doc": is_google_doc,
+        "export_mime_type": export_mime_type,
+        "web_view_url": web_view_url,
+    }
+
 
 class DriveResolveRequest(BaseModel):
     url: str = Field(..., description="Google Drive file or folder URL")
@@ -35,6 +61,16 @@ class DriveResolveResponse(BaseModel):
     items: List[DriveResolvedItem]
 
 
+async def _drive_client(user_id: str) -> GoogleDriveClient:
+    try:
+        return await GoogleDriveClient.from_user(user_id)
+    except PermissionError as exc:
+        raise HTTPException(status_code=403, detail=str(exc))
+    except Exception as exc:
+        logger.error(f"Failed to init Drive client: {exc}")
+        raise HTTPException(status_code=500, detail="Failed to initialize Drive access")
+
+
 @router.post("/resolve", response_model=DriveResolveResponse)
 async def resolve_drive_link(
     payload: DriveResolveRequest = Body(...),
@@ -61,28 +97,15 @@ async def resolve_drive_link(
         payload.max_items,
     )
 
-    try:
-        client = await GoogleDriveClient.from_user(user_id)
-    except PermissionError as exc:
-        raise HTTPException(status_code=403, detail=str(exc))
-    except Exception as exc:
-        logger.error(f"Failed to init Drive client: {exc}")
-        raise HTTPException(status_code=500, detail="Failed to initialize Drive access")
+    client = await _drive_client(user_id)
 
     try:
         if link.kind == "file":
             meta = await client.get_file_metadata(link.id, link.resource_key)
             meta = await client.resolve_drive_file(meta)
-            item = DriveResolvedItem(
-                id=meta.id,
-                name=meta.name,
-                mime_type=meta.mime_type,
-                resource_key=meta.resource_key,
-                is_google_doc=meta.mime_type.startswith("application/vnd.google-apps."),
-                export_mime_type=export_mime_for(meta.mime_type),
-                web_view_url=payload.url,
+            return ORJSONResponse(
+                {"kind": "file", "items": [_resolved_item(meta, payload.url)]}
             )
-            return DriveResolveResponse(kind="file", items=[item])
 
         # Folder path
         files = await client.list_children(
@@ -91,19 +114,11 @@ async def resolve_drive_link(
             recursive=payload.recursive,
             max_items=payload.max_items,
         )
-        resolved_items = [
-            DriveResolvedItem(
-                id=f.id,
-                name=f.name,
-                mime_type=f.mime_type,
-                resource_key=f.resource_key,
-                is_google_doc=f.mime_type.startswith("application/vnd.google-apps."),
-                export_mime_type=export_mime_for(f.mime_type),
-                web_view_url=payload.url,
-            )
-            for f in files
-        ]
-        return DriveResolveResponse(kind="folder", items=resolved_items)
+        # Returned directly so FastAPI doesn't validate each item against
+        # response_model, which stays on the route for the OpenAPI schema
+        return ORJSONResponse(
+            {"kind": "folder", "items": [_resolved_item(f, payload.url) for f in files]}
+        )
     except HTTPException:
         raise
     except PermissionError as exc:
@@ -119,3 +134,81 @@ async def resolve_drive_link(
     except Exception as exc:
         logger.exception(f"Drive resolve failed: {exc}")
         raise HTTPException(status_code=500, detail="Failed to resolve Drive link")
+
+
+async def _iter_file(client: GoogleDriveClient, link: DriveLink) -> AsyncGenerator[DriveFile, None]:
+    meta = await client.get_file_metadata(link.id, link.resource_key)
+    yield await client.resolve_drive_file(meta)
+
+
+@router.post("/resolve/stream")
+async def resolve_drive_link_stream(
+    payload: DriveResolveRequest = Body(...),
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    Streaming variant of /drive/resolve for large folders.
+    Emits one DriveResolvedItem per line (NDJSON) as Drive pages are listed instead
+    of buffering the whole folder. Failures before the first item map to HTTP errors
+    as in /drive/resolve; later failures end the stream with an {"error": ...} line.
+    """
+    link = parse_drive_url(payload.url)
+    if not link:
+        raise HTTPException(status_code=400, detail="Not a valid Google Drive link")
+
+    logger.info(
+        "drive.resolve_stream start user={} url={} kind={} id={} recursive={} max_items={}",
+        user_id,
+        payload.url,
+        link.kind,
+        link.id,
+        payload.recursive,
+        payload.max_items,
+    )
+
+    client = await _drive_client(user_id)
+    if link.kind == "file":
+        files = _iter_file(client, link)
+    else:
+        files = client.iter_children(
+            folder_id=link.id,
+            resource_key=link.resource_key,
+            recursive=payload.recursive,
+            max_items=payload.max_items,
+        )
+
+    # Pull the first item up front so access errors still get a proper status code
+    try:
+        first = await anext(files, None)
+    except PermissionError as exc:
+        await files.aclose()
+        logger.error(
+            "Drive resolve failed permission user={} link={} id={} err={}",
+            user_id,
+            payload.url,
+            link.id,
+            exc,
+        )
+        raise HTTPException(status_code=403, detail=str(exc))
+    except Exception as exc:
+        await files.aclose()
+        logger.exception(f"Drive resolve failed: {exc}")
+        raise HTTPException(status_code=500, detail="Failed to resolve Drive link")
+
+    async def _emit() -> AsyncIterator[bytes]:
+        # Close the listing on every exit, including a client disconnect, so
+        # its httpx client is released now rather than whenever GC runs
+        try:
+            if first is None:
+                return
+            yield orjson.dumps(_resolved_item(first, payload.url)) + b"\n"
+            try:
+                async for f in files:
+                    yield orjson.dumps(_resolved_item(f, payload.url)) + b"\n"
+            except Exception as exc:
+                logger.exception(f"Drive resolve stream failed: {exc}")
+                yield orjson.dumps({"error": "Failed to resolve Drive link"}) + b"\n"
+        finally:
+            await files.aclose()
+
+    return StreamingResponse(_emit(), media_type="application/x-ndjson")
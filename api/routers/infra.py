@@ -2,6 +2,7 @@ import asyncio
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 from loguru import logger
 
 from api.infrastructure_service import (
@@ -15,21 +16,22 @@ from api.infrastructure_service import (
 router = APIRouter()
 
 
+# Compute Engine status -> UI status. STOPPING is treated the same as SUSPENDING
+# so the UI shows a waiting state while the Compute Engine operation completes.
+_STATUS_MAP = {
+    "RUNNING": "running",
+    "SUSPENDING": "suspending",
+    "STOPPING": "suspending",
+    "SUSPENDED": "suspended",
+    "TERMINATED": "stopped",
+    "PROVISIONING": "starting",
+    "STAGING": "starting",
+}
+
+
 def _normalize_status(raw: str) -> str:
     raw_upper = (raw or "").upper()
-    if raw_upper == "RUNNING":
-        return "running"
-    if raw_upper in {"SUSPENDING", "STOPPING"}:
-        # Treat STOPPING the same as SUSPENDING so the UI shows a waiting state
-        # while the Compute Engine operation completes.
-        return "suspending"
-    if raw_upper == "SUSPENDED":
-        return "suspended"
-    if raw_upper == "TERMINATED":
-        return "stopped"
-    if raw_upper in {"PROVISIONING", "STAGING"}:
-        return "starting"
-    return raw_upper.lower() or "unknown"
+    return _STATUS_MAP.get(raw_upper, raw_upper.lower() or "unknown")
 
 
 @router.get("/infra/db-vm/status")
@@ -41,7 +43,7 @@ async def db_vm_status():
         logger.error("Failed to fetch VM status: %s", exc)
         raise HTTPException(status_code=502, detail=str(exc))
 
-    return {
+    return ORJSONResponse({
         "status": _normalize_status(status),
         "rawStatus": status,
         "checkedAt": datetime.now(timezone.utc).isoformat(),
@@ -51,7 +53,7 @@ async def db_vm_status():
             "name": cfg.name,
             "estimatedStartSeconds": cfg.estimated_start_seconds,
         },
-    }
+    })
 
 
 @router.post("/infra/db-vm/start")
@@ -63,7 +65,7 @@ async def db_vm_start():
         logger.error("VM start failed: %s", exc)
         raise HTTPException(status_code=502, detail=str(exc))
 
-    return {
+    return ORJSONResponse({
         "requestedAt": datetime.now(timezone.utc).isoformat(),
         "previousStatus": _normalize_status(result.get("status", "")),
         "operation": result.get("operation"),
@@ -73,7 +75,7 @@ async def db_vm_start():
             "name": cfg.name,
             "estimatedStartSeconds": cfg.estimated_start_seconds,
         },
-    }
+    })
 
 
 @router.post("/infra/db-vm/stop")
@@ -85,7 +87,7 @@ async def db_vm_stop():
         logger.error("VM suspend/stop failed: %s", exc)
         raise HTTPException(status_code=502, detail=str(exc))
 
-    return {
+    return ORJSONResponse({
         "requestedAt": datetime.now(timezone.utc).isoformat(),
         "previousStatus": _normalize_status(result.get("status", "")),
         "operation": result.get("operation"),
@@ -95,4 +97,4 @@ async def db_vm_stop():
             "zone": cfg.zone,
             "name": cfg.name,
         },
-    }
+    })
@@ -1,16 +1,31 @@
+import asyncio
 from typing import List, Literal, Optional
 
 from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi.responses import ORJSONResponse
 from loguru import logger
 
 from api.models import NoteCreate, NoteResponse, NoteUpdate
-from open_notebook.domain.notebook import Note
+from open_notebook.domain.notebook import Note, Notebook
 from open_notebook.exceptions import InvalidInputError
+from open_notebook.graphs.prompt import graph as prompt_graph
 from api.deps import get_current_user_id
 
 router = APIRouter()
 
 
+def _note_payload(note: Note) -> dict:
+    """NoteResponse as a plain dict, for listings that skip model validation."""
+    return {
+        "id": note.id or "",
+        "title": note.title,
+        "content": note.content,
+        "note_type": note.note_type,
+        "created": str(note.created),
+        "updated": str(note.updated),
+    }
+
+
 @router.get("/notes", response_model=List[NoteResponse])
 async def get_notes(
     notebook_id: Optional[str] = Query(None, description="Filter by notebook ID"),
@@ -20,26 +35,17 @@ async def get_notes(
     try:
         if notebook_id:
             # Get notes for a specific notebook
-            from open_notebook.domain.notebook import Notebook
             notebook = await Notebook.get(notebook_id)
             if not notebook or str(notebook.owner) != str(user_id):
                 raise HTTPException(status_code=404, detail="Notebook not found")
-            notes = [n for n in await notebook.get_notes() if str(n.owner) == str(user_id)]
+            notes = await notebook.get_notes(owner=user_id)
         else:
             # Get all notes
-            notes = [n for n in await Note.get_all(order_by="updated desc") if str(n.owner) == str(user_id)]
-        
-        return [
-            NoteResponse(
-                id=note.id or "",
-                title=note.title,
-                content=note.content,
-                note_type=note.note_type,
-                created=str(note.created),
-                updated=str(note.updated),
-            )
-            for note in notes
-        ]
+            notes = await Note.get_all(order_by="updated desc", owner=user_id)
+
+        # Returned directly so FastAPI doesn't re-validate every row against
+        # response_model, which stays on the route for the OpenAPI schema
+        return ORJSONResponse([_note_payload(note) for note in notes])
     except HTTPException:
         raise
     except Exception as e:
@@ -54,7 +60,6 @@ async def create_note(note_data: NoteCreate, user_id: str = Depends(get_current_
         # Auto-generate title if not provided and it's an AI note
         title = note_data.title
         if not title and note_data.note_type == "ai" and note_data.content:
-            from open_notebook.graphs.prompt import graph as prompt_graph
             prompt = "Based on the Note below, please provide a Title for this content, with max 15 words"
             result = await prompt_graph.ainvoke(
                 {  # type: ignore[arg-type]
@@ -77,16 +82,18 @@ async def create_note(note_data: NoteCreate, user_id: str = Depends(get_current_
             note_type=note_type,
             owner=user_id,
         )
-        await new_note.save()
-        
-        # Add to notebook if specified
+        # Add to notebook if specified; the notebook lookup doesn't depend on
+        # the save, so overlap the two round trips
         if note_data.notebook_id:
-            from open_notebook.domain.notebook import Notebook
-            notebook = await Notebook.get(note_data.notebook_id)
+            _, notebook = await asyncio.gather(
+                new_note.save(), Notebook.get(note_data.notebook_id)
+            )
             if not notebook or str(notebook.owner) != str(user_id):
                 raise HTTPException(status_code=404, detail="Notebook not found")
             await new_note.add_to_notebook(note_data.notebook_id)
-        
+        else:
+            await new_note.save()
+
         return NoteResponse(
             id=new_note.id or "",
             title=new_note.title,
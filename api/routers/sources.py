@@ -1,10 +1,14 @@
 import os
 import asyncio
+import functools
+import shutil
 import tempfile
-from pathlib import Path
-from typing import Any, List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, List, Optional
 from uuid import uuid4
 
+import orjson
 from fastapi import (
     APIRouter,
     Depends,
@@ -20,7 +24,6 @@ from surreal_commands import execute_command_sync
 
 from api.command_service import CommandService
 from api.deps import get_current_user_id
-from open_notebook.exceptions import NotFoundError
 from api.models import (
     AssetModel,
     CreateSourceInsightRequest,
@@ -33,10 +36,15 @@ from api.models import (
 )
 from commands.source_commands import SourceProcessingInput
 from open_notebook.config import GCS_BUCKET, STORAGE_BACKEND, UPLOADS_FOLDER
-from open_notebook.database.repository import ensure_record_id, repo_query
+from open_notebook.database.repository import (
+    ensure_record_id,
+    repo_query,
+    with_table_prefix,
+)
 from open_notebook.domain.notebook import Notebook, Source
 from open_notebook.domain.transformation import Transformation
 from open_notebook.exceptions import InvalidInputError
+from open_notebook.utils.storage import generate_unique_filename
 
 router = APIRouter()
 
@@ -48,37 +56,91 @@ async def _ensure_source_owned(source_id: str, user_id: str) -> Source:
     return source
 
 
-def generate_unique_filename(original_filename: str, upload_folder: str) -> str:
-    """Generate unique filename like Streamlit app (append counter if file exists)."""
-    file_path = Path(upload_folder)
-    file_path.mkdir(parents=True, exist_ok=True)
-
-    # Split filename and extension
-    stem = Path(original_filename).stem
-    suffix = Path(original_filename).suffix
+async def _cancel_queued_command(command_id: str) -> None:
+    """Keep workers from picking up a command whose source was never inserted."""
+    try:
+        await repo_query(
+            "UPDATE $id SET status = 'canceled' WHERE status = 'new'",
+            {"id": ensure_record_id(command_id)},
+        )
+    except Exception as e:
+        logger.warning(f"Failed to cancel queued command {command_id}: {e}")
 
-    # Check if file exists and generate unique name
-    counter = 0
-    while True:
-        if counter == 0:
-            new_filename = original_filename
-        else:
-            new_filename = f"{stem} ({counter}){suffix}"
 
-        full_path = file_path / new_filename
-        if not full_path.exists():
-            return str(full_path)
-        counter += 1
+# Connection pool size for the shared GCS client's HTTP session
+GCS_HTTP_POOL_SIZE = 128
 
 
-def _get_gcs_client():
+def _new_gcs_client(pool_size: Optional[int] = None):
+    """
+    Build a storage.Client. With `pool_size`, its authorized session is created
+    up front with a connection pool of that size and handed to the client,
+    rather than patching the session the client builds for itself.
+    """
     try:
         from google.cloud import storage  # type: ignore
     except Exception as exc:
         raise RuntimeError(
             "google-cloud-storage is required for GCS uploads"
         ) from exc
-    return storage.Client()
+    if pool_size is None:
+        return storage.Client()
+
+    import google.auth
+    from google.auth.transport.requests import AuthorizedSession
+    from requests.adapters import HTTPAdapter
+
+    credentials, project = google.auth.default(scopes=storage.Client.SCOPE)
+    session = AuthorizedSession(credentials)
+    session.mount(
+        "https://", HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    )
+    return storage.Client(project=project, credentials=credentials, _http=session)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_gcs_client():
+    """
+    Process-wide client for downloads and existence checks, so credentials and
+    keep-alive connections are reused instead of rebuilt on every call.
+    """
+    return _new_gcs_client(pool_size=GCS_HTTP_POOL_SIZE)
+
+
+# Chunk size for resumable GCS uploads; large files go up in pieces of this size
+GCS_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Read size when copying uploads to the local uploads folder
+LOCAL_UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Uploads run on a dedicated pool (not the default to_thread executor) and each
+# worker keeps its own storage.Client, avoiding contention on a shared client's
+# HTTP session so concurrent uploads proceed in parallel.
+GCS_UPLOAD_WORKERS = int(os.getenv("GCS_UPLOAD_WORKERS", "16"))
+_gcs_upload_pool = ThreadPoolExecutor(
+    max_workers=GCS_UPLOAD_WORKERS, thread_name_prefix="gcs-upload"
+)
+_gcs_upload_local = threading.local()
+
+
+def _upload_client():
+    client = getattr(_gcs_upload_local, "client", None)
+    if client is None:
+        client = _gcs_upload_local.client = _new_gcs_client()
+    return client
+
+
+def _upload_to_gcs(fileobj: BinaryIO, blob_path: str, content_type: Optional[str]) -> None:
+    client = _upload_client()
+    blob = client.bucket(GCS_BUCKET).blob(blob_path, chunk_size=GCS_UPLOAD_CHUNK_SIZE)
+    blob.upload_from_file(fileobj, content_type=content_type, rewind=True)
+
+
+def _copy_upload_to_disk(fileobj: BinaryIO, file_path: str) -> None:
+    # Bounded-chunk copy so memory stays at one chunk regardless of file size
+    fileobj.seek(0)
+    with open(file_path, "wb") as f:
+        shutil.copyfileobj(fileobj, f, LOCAL_UPLOAD_CHUNK_SIZE)
 
 
 async def save_uploaded_file(upload_file: UploadFile) -> str:
@@ -93,12 +155,16 @@ async def save_uploaded_file(upload_file: UploadFile) -> str:
     if STORAGE_BACKEND == "gcs":
         if not GCS_BUCKET:
             raise RuntimeError("GCS_BUCKET_NAME is not configured")
-        client = _get_gcs_client()
-        bucket = client.bucket(GCS_BUCKET)
         blob_path = f"uploads/{uuid4()}_{upload_file.filename}"
-        blob = bucket.blob(blob_path)
-        data = await upload_file.read()
-        blob.upload_from_string(data, content_type=upload_file.content_type)
+        # Stream from the spooled upload file on a worker thread rather than
+        # reading the whole body into memory and blocking the event loop
+        await asyncio.get_running_loop().run_in_executor(
+            _gcs_upload_pool,
+            _upload_to_gcs,
+            upload_file.file,
+            blob_path,
+            upload_file.content_type,
+        )
         gcs_uri = f"gs://{GCS_BUCKET}/{blob_path}"
         logger.info(f"Saved uploaded file to GCS: {gcs_uri}")
         return gcs_uri
@@ -106,9 +172,7 @@ async def save_uploaded_file(upload_file: UploadFile) -> str:
     # Default: local filesystem
     file_path = generate_unique_filename(upload_file.filename, UPLOADS_FOLDER)
     try:
-        with open(file_path, "wb") as f:
-            content = await upload_file.read()
-            f.write(content)
+        await asyncio.to_thread(_copy_upload_to_disk, upload_file.file, file_path)
         logger.info(f"Saved uploaded file to: {file_path}")
         return file_path
     except Exception as e:
@@ -118,6 +182,10 @@ async def save_uploaded_file(upload_file: UploadFile) -> str:
         raise
 
 
+# Form values accepted as boolean true
+_FORM_TRUE_VALUES = frozenset(("true", "1", "yes", "on"))
+
+
 def parse_source_form_data(
     type: str = Form(...),
     notebook_id: Optional[str] = Form(None),
@@ -137,30 +205,25 @@ def parse_source_form_data(
     file: Optional[UploadFile] = File(None),
 ) -> tuple[SourceCreate, Optional[UploadFile]]:
     """Parse form data into SourceCreate model and return upload file separately."""
-    import json
-
     # Convert string booleans to actual booleans
-    def str_to_bool(value: str) -> bool:
-        return value.lower() in ("true", "1", "yes", "on")
-
-    embed_bool = str_to_bool(embed)
-    delete_source_bool = str_to_bool(delete_source)
-    async_processing_bool = str_to_bool(async_processing)
+    embed_bool = embed.lower() in _FORM_TRUE_VALUES
+    delete_source_bool = delete_source.lower() in _FORM_TRUE_VALUES
+    async_processing_bool = async_processing.lower() in _FORM_TRUE_VALUES
 
     # Parse JSON strings
     notebooks_list = None
     if notebooks:
         try:
-            notebooks_list = json.loads(notebooks)
-        except json.JSONDecodeError:
+            notebooks_list = orjson.loads(notebooks)
+        except orjson.JSONDecodeError:
             logger.error(f"DEBUG - Invalid JSON in notebooks field: {notebooks}")
             raise ValueError("Invalid JSON in notebooks field")
 
     transformations_list = []
     if transformations:
         try:
-            transformations_list = json.loads(transformations)
-        except json.JSONDecodeError:
+            transformations_list = orjson.loads(transformations)
+        except orjson.JSONDecodeError:
             logger.error(
                 f"DEBUG - Invalid JSON in transformations field: {transformations}"
             )
@@ -194,6 +257,49 @@ def parse_source_form_data(
     return source_data, file
 
 
+# Columns for the source list. Processing status is read through the command
+# record link in the same query rather than one get_command_status call per row.
+_SOURCE_LIST_FIELDS = """id, asset, created, title, updated, topics, command,
+                command.status AS command_status,
+                command.result.execution_metadata AS command_execution_metadata,
+                command.error_message AS command_error"""
+
+
+async def _source_list_stats(
+    source_ids: List[str],
+) -> tuple[dict[str, int], set[str]]:
+    """
+    Insight counts and embedded flags for a page of sources, as one grouped scan
+    per table instead of two correlated subqueries per row. The ids come from an
+    owner-filtered page, so child rows are not filtered by owner again: not every
+    insight carries one (transformation insights are stored without it).
+    """
+    if not source_ids:
+        return {}, set()
+    params = {"ids": [ensure_record_id(sid) for sid in source_ids]}
+    insight_rows, embedded_rows = await asyncio.gather(
+        repo_query(
+            """
+            SELECT source, count() AS count FROM source_insight
+            WHERE source INSIDE $ids
+            GROUP BY source
+            """,
+            params,
+        ),
+        repo_query(
+            """
+            SELECT source FROM source_embedding
+            WHERE source INSIDE $ids
+            GROUP BY source
+            """,
+            params,
+        ),
+    )
+    insights_count = {str(row["source"]): row.get("count", 0) for row in insight_rows}
+    embedded = {str(row["source"]) for row in embedded_rows}
+    return insights_count, embedded
+
+
 @router.get("/sources", response_model=List[SourceListResponse])
 async def get_sources(
     notebook_id: Optional[str] = Query(None, description="Filter by notebook ID"),
@@ -205,6 +311,8 @@ async def get_sources(
 ):
     """Get sources with pagination and sorting support."""
     try:
+        owner_rid = ensure_record_id(user_id)
+
         # Validate sort parameters
         if sort_by not in ["created", "updated"]:
             raise HTTPException(status_code=400, detail="sort_by must be 'created' or 'updated'")
@@ -223,9 +331,7 @@ async def get_sources(
 
             # Query sources for specific notebook - include command field
             query = f"""
-                SELECT id, asset, created, title, updated, topics, command,
-                (SELECT VALUE count() FROM source_insight WHERE source = $parent.id GROUP ALL)[0].count OR 0 AS insights_count,
-                ((SELECT VALUE id FROM source_embedding WHERE source = $parent.id LIMIT 1)) != NONE AS embedded
+                SELECT {_SOURCE_LIST_FIELDS}
                 FROM (select value in from reference where out=$notebook_id)
                 WHERE owner = $owner
                 {order_clause}
@@ -236,76 +342,23 @@ async def get_sources(
                     "notebook_id": ensure_record_id(notebook_id),
                     "limit": limit,
                     "offset": offset,
-                    "owner": ensure_record_id(user_id),
+                    "owner": owner_rid,
                 }
             )
         else:
             # Query all sources - include command field
             query = f"""
-                SELECT id, asset, created, title, updated, topics, command,
-                (SELECT VALUE count() FROM source_insight WHERE source = $parent.id GROUP ALL)[0].count OR 0 AS insights_count,
-                ((SELECT VALUE id FROM source_embedding WHERE source = $parent.id LIMIT 1)) != NONE AS embedded
+                SELECT {_SOURCE_LIST_FIELDS}
                 FROM source
                 WHERE owner = $owner
                 {order_clause}
                 LIMIT $limit START $offset
             """
-            result = await repo_query(query, {"limit": limit, "offset": offset, "owner": ensure_record_id(user_id)})
-
-        # Extract command IDs for batch status fetching
-        command_ids = []
-        command_to_source = {}
-
-        for row in result:
-            command = row.get("command")
-            if command:
-                command_str = str(command)
-                command_ids.append(command_str)
-                command_to_source[command_str] = row["id"]
-
-        # Batch fetch command statuses
-        command_statuses = {}
-        if command_ids:
-            try:
-                # Get status for all commands in batch (if the library supports it)
-                # If not, we'll fall back to individual calls, but limit concurrent requests
-                import asyncio
-
-                from surreal_commands import get_command_status
-
-                async def get_status_safe(command_id: str):
-                    try:
-                        status = await get_command_status(command_id)
-                        return (command_id, status)
-                    except Exception as e:
-                        logger.warning(
-                            f"Failed to get status for command {command_id}: {e}"
-                        )
-                        return (command_id, None)
-
-                # Limit concurrent requests to avoid overwhelming the command service
-                semaphore = asyncio.Semaphore(10)
-
-                async def get_status_with_limit(command_id: str):
-                    async with semaphore:
-                        return await get_status_safe(command_id)
-
-                # Fetch statuses concurrently but with limit
-                status_tasks = [get_status_with_limit(cmd_id) for cmd_id in command_ids]
-                status_results = await asyncio.gather(
-                    *status_tasks, return_exceptions=True
-                )
+            result = await repo_query(query, {"limit": limit, "offset": offset, "owner": owner_rid})
 
-                # Process results
-                for result_item in status_results:
-                    if isinstance(result_item, Exception):
-                        continue
-                    if isinstance(result_item, tuple) and len(result_item) == 2:
-                        cmd_id, status = result_item
-                        command_statuses[cmd_id] = status
-
-            except Exception as e:
-                logger.warning(f"Failed to batch fetch command statuses: {e}")
+        insights_count, embedded = await _source_list_stats(
+            [str(row["id"]) for row in result]
+        )
 
         # Convert result to response model
         response_list = []
@@ -315,21 +368,19 @@ async def get_sources(
             status = None
             processing_info = None
 
-            # Get status information if command exists
-            if command_id and command_id in command_statuses:
-                status_obj = command_statuses[command_id]
-                if status_obj:
-                    status = status_obj.status
-                    # Extract execution metadata from nested result structure
-                    result_data: dict[str, Any] | None = getattr(status_obj, "result", None)
-                    execution_metadata: dict[str, Any] = result_data.get("execution_metadata", {}) if isinstance(result_data, dict) else {}
-                    processing_info = {
-                        "started_at": execution_metadata.get("started_at"),
-                        "completed_at": execution_metadata.get("completed_at"),
-                        "error": getattr(status_obj, "error_message", None),
-                    }
+            # Get status information if the command record exists
+            if command_id and row.get("command_status"):
+                status = row["command_status"]
+                execution_metadata = row.get("command_execution_metadata")
+                if not isinstance(execution_metadata, dict):
+                    execution_metadata = {}
+                processing_info = {
+                    "started_at": execution_metadata.get("started_at"),
+                    "completed_at": execution_metadata.get("completed_at"),
+                    "error": row.get("command_error"),
+                }
             elif command_id:
-                # Command exists but status couldn't be fetched
+                # Command is linked but its record is missing
                 status = "unknown"
 
             response_list.append(
@@ -345,9 +396,9 @@ async def get_sources(
                     )
                     if row.get("asset")
                     else None,
-                    embedded=row.get("embedded", False),
+                    embedded=str(row["id"]) in embedded,
                     embedded_chunks=0,  # Removed from query - not needed in list view
-                    insights_count=row.get("insights_count", 0),
+                    insights_count=insights_count.get(str(row["id"]), 0),
                     created=str(row["created"]),
                     updated=str(row["updated"]),
                     # Status fields
@@ -394,13 +445,17 @@ async def create_source(
             source_data.drive_file_id,
             len(source_data.drive_resource_key or ""),
         )
-        # Verify all specified notebooks exist (backward compatibility support)
-        for notebook_id in (source_data.notebooks or []):
-            notebook = await Notebook.get(notebook_id)
-            if not notebook:
-                raise HTTPException(
-                    status_code=404, detail=f"Notebook {notebook_id} not found"
-                )
+        # Verify all specified notebooks exist (backward compatibility support),
+        # with one lookup for the whole list
+        if source_data.notebooks:
+            found_notebooks = await Notebook.get_many(
+                [with_table_prefix(nb_id, "notebook") for nb_id in source_data.notebooks]
+            )
+            for notebook_id in source_data.notebooks:
+                if with_table_prefix(notebook_id, "notebook") not in found_notebooks:
+                    raise HTTPException(
+                        status_code=404, detail=f"Notebook {notebook_id} not found"
+                    )
 
         # Handle file upload if provided
         file_path = None
@@ -463,23 +518,21 @@ async def create_source(
             )
 
         # Validate transformations exist
-        transformation_ids = source_data.transformations or []
+        transformation_ids = [
+            with_table_prefix(str(trans_id), "transformation")
+            for trans_id in source_data.transformations or []
+        ]
         # Deduplicate IDs to avoid running the same transformation multiple times
         transformation_ids = list(dict.fromkeys(transformation_ids))
 
-        # Load transformations and also de-dupe by name (case-insensitive) to avoid
-        # multiple records of the same logical transformation (e.g., many "Dense Summary").
+        # Load transformations (one query for all ids) and also de-dupe by name
+        # (case-insensitive) to avoid multiple records of the same logical
+        # transformation (e.g., many "Dense Summary").
+        transformations = await Transformation.get_many(transformation_ids)
         seen_names = set()
         unique_transformation_ids: list[str] = []
         for trans_id in transformation_ids:
-            try:
-                transformation = await Transformation.get(trans_id)
-            except NotFoundError:
-                logger.warning(
-                    "create_source: requested transformation missing, skipping id=%s",
-                    trans_id,
-                )
-                continue
+            transformation = transformations.get(trans_id)
             if not transformation:
                 logger.warning(
                     "create_source: requested transformation missing, skipping id=%s",
@@ -499,15 +552,7 @@ async def create_source(
         # If client provided none (or all were skipped), fall back to defaults that are marked apply_default
         if not transformation_ids:
             logger.info("create_source: no valid transformations supplied, loading defaults (apply_default=true)")
-            default_trans = await repo_query(
-                """
-                SELECT id FROM transformation 
-                WHERE apply_default = true 
-                  AND (owner IS NONE OR owner = $owner)
-                """,
-                {"owner": ensure_record_id(user_id)},
-            )
-            transformation_ids = [t["id"] for t in default_trans] if default_trans else []
+            transformation_ids = await Transformation.get_default_ids(user_id)
             logger.info("create_source: resolved default transformations=%s", transformation_ids)
 
         logger.info(
@@ -517,21 +562,19 @@ async def create_source(
 
         # Branch based on processing mode
         if source_data.async_processing:
-            # ASYNC PATH: Create source record first, then queue command
+            # ASYNC PATH: Queue command, then create the source record
             logger.info("Using async processing path")
 
-            # Create minimal source record - let SurrealDB generate the ID
+            # Pick the source id up front so the command can be queued first and
+            # the record (with its command link and notebooks) written once.
+            # The source_graph will skip adding duplicate notebook references
             source = Source(
+                id=f"source:{uuid4().hex}",
                 title=source_data.title or "Processing...",
                 topics=[],
                 owner=user_id,
             )
-            await source.save()
-
-            # Add source to notebooks immediately so it appears in the UI
-            # The source_graph will skip adding duplicates
-            for notebook_id in (source_data.notebooks or []):
-                await source.add_to_notebook(notebook_id)
+            command_id = None
 
             try:
                 import commands.source_commands  # noqa: F401
@@ -572,6 +615,7 @@ async def create_source(
                     logger.warning(
                         f"Command {command_id} not found after submit; running sync fallback"
                     )
+                    await source.save_with_notebooks(source_data.notebooks)
                     result = execute_command_sync(
                         "open_notebook",
                         "process_source",
@@ -608,7 +652,7 @@ async def create_source(
                     )
 
                 source.command = ensure_record_id(command_id)
-                await source.save()
+                await source.save_with_notebooks(source_data.notebooks)
 
                 return SourceResponse(
                     id=source.id or "",
@@ -629,6 +673,9 @@ async def create_source(
                 raise
             except Exception as e:
                 logger.error(f"Failed to submit async processing command: {e}")
+                if command_id:
+                    # The command was queued ahead of the insert that just failed
+                    await _cancel_queued_command(command_id)
                 try:
                     await source.delete()
                 except Exception:
@@ -650,18 +697,14 @@ async def create_source(
                 # Import command modules to ensure they're registered
                 import commands.source_commands  # noqa: F401
 
-                # Create source record - let SurrealDB generate the ID
+                # Create source record linked to its notebooks in one transaction
+                # The source_graph will skip adding duplicates
                 source = Source(
                     title=source_data.title or "Processing...",
                     topics=[],
                     owner=user_id,
                 )
-                await source.save()
-
-                # Add source to notebooks immediately so it appears in the UI
-                # The source_graph will skip adding duplicates
-                for notebook_id in (source_data.notebooks or []):
-                    await source.add_to_notebook(notebook_id)
+                await source.save_with_notebooks(source_data.notebooks)
 
                 # Execute command synchronously
                 command_input = SourceProcessingInput(
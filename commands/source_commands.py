@@ -10,6 +10,7 @@ from surreal_commands import CommandInput, CommandOutput, command
 from open_notebook.database.repository import ensure_record_id, repo_query
 from open_notebook.domain.notebook import Source
 from open_notebook.domain.transformation import Transformation
+from open_notebook.exceptions import NotFoundError
 from open_notebook.config import GCS_BUCKET, STORAGE_BACKEND
 from open_notebook.utils.google_drive import GoogleDriveClient
 from open_notebook.utils.storage import save_bytes_to_storage
@@ -53,6 +54,10 @@ class SourceProcessingInput(CommandInput):
     owner: Optional[str] = None
 
 
+class SourceNotInsertedError(RuntimeError):
+    """The API queued the command before its source record was written; retried."""
+
+
 class SourceProcessingOutput(CommandOutput):
     success: bool
     source_id: str
@@ -180,13 +185,34 @@ async def process_source_command(
         logger.info(f"Transformations: {input_data.transformations}")
         logger.info(f"Embed: {input_data.embed}")
 
+        # 1. Get existing source record to update its command field.
+        # The API enqueues this command before inserting the source record, so a
+        # miss may just mean that insert has not landed yet. Check before any
+        # Drive fetch or transformation loading so a retry repeats no work.
+        try:
+            source = await Source.get(input_data.source_id)
+        except NotFoundError:
+            source = None
+        if not source:
+            raise SourceNotInsertedError(f"Source '{input_data.source_id}' not found")
+
+        # Update source with command reference
+        source.command = (
+            ensure_record_id(input_data.execution_context.command_id)
+            if input_data.execution_context
+            else None
+        )
+        await source.save()
+
+        logger.info(f"Updated source {source.id} with command reference")
+
         # If Drive metadata is present, fetch the file using user's credentials
         if input_data.content_state:
             await _maybe_fetch_drive_file(input_data.content_state, input_data.owner)
             _materialize_content_file(input_data.content_state)
         original_file_path = input_data.content_state.get("_orig_file_path") if input_data.content_state else None
 
-        # 1. Load transformation objects from IDs (shared or same owner)
+        # 2. Load transformation objects from IDs (shared or same owner)
         transformations = []
         for trans_id in input_data.transformations:
             logger.info(f"Loading transformation: {trans_id}")
@@ -199,21 +225,6 @@ async def process_source_command(
 
         logger.info(f"Loaded {len(transformations)} transformations")
 
-        # 2. Get existing source record to update its command field
-        source = await Source.get(input_data.source_id)
-        if not source:
-            raise ValueError(f"Source '{input_data.source_id}' not found")
-
-        # Update source with command reference
-        source.command = (
-            ensure_record_id(input_data.execution_context.command_id)
-            if input_data.execution_context
-            else None
-        )
-        await source.save()
-
-        logger.info(f"Updated source {source.id} with command reference")
-
         # Fallback path when source_graph is unavailable (e.g., optional deps missing)
         if source_graph is None:
             logger.warning("source_graph unavailable; using fallback inline processing.")
@@ -341,6 +352,10 @@ async def process_source_command(
             processing_time=processing_time,
         )
 
+    except SourceNotInsertedError as e:
+        logger.warning(f"Source record not inserted yet, will retry: {e}")
+        raise
+
     except RuntimeError as e:
         # Transaction conflicts should be retried by surreal-commands
         logger.warning(f"Transaction conflict, will retry: {e}")
@@ -1,3 +1,4 @@
+import functools
 import os
 import time
 from contextlib import asynccontextmanager
@@ -66,10 +67,30 @@ def parse_record_ids(obj: Any) -> Any:
     return obj
 
 
-def ensure_record_id(value: Union[str, RecordID]) -> RecordID:
-    """Ensure a value is a RecordID."""
+def with_table_prefix(value: str, table: str) -> str:
+    """Return `value` as a full `table:id` string, adding the table prefix if missing."""
+    prefix = table + ":"
+    return value if value.startswith(prefix) else prefix + value
+
+
+def ensure_record_id(
+    value: Union[str, RecordID], default_table: Optional[str] = None
+) -> RecordID:
+    """
+    Ensure a value is a RecordID. With `default_table`, bare ids (without that
+    table's prefix) are treated as ids within that table.
+    """
     if isinstance(value, RecordID):
         return value
+    return _record_id_from_str(value, default_table)
+
+
+# Ids are re-parsed several times per request (owner, notebook, source params);
+# string ids are short and the parse is deterministic, so memoize it.
+@functools.lru_cache(maxsize=16384)
+def _record_id_from_str(value: str, default_table: Optional[str]) -> RecordID:
+    if default_table is not None and not value.startswith(default_table + ":"):
+        return RecordID(default_table, value)
     return RecordID.parse(value)
 
 
@@ -184,6 +205,58 @@ async def repo_relate(
     )
 
 
+async def repo_create_related(
+    record_id: Union[str, RecordID],
+    data: Dict[str, Any],
+    relationship: str,
+    targets: List[Union[str, RecordID]],
+) -> Dict[str, Any]:
+    """
+    Create a record with a known id and relate it to each target in one
+    transaction: a single round-trip, and the record never exists without its edges.
+    """
+    data.pop("id", None)
+    data["created"] = datetime.now(timezone.utc)
+    data["updated"] = datetime.now(timezone.utc)
+    _coerce_owner(data)
+    relate = f"RELATE $id->{relationship}->$targets;" if targets else ""
+    query = f"""
+        BEGIN TRANSACTION;
+        CREATE ONLY $id CONTENT $data;
+        {relate}
+        COMMIT TRANSACTION;
+    """
+    # Run exactly once via query_raw: repo_query's reset-and-retry could replay
+    # CREATE ONLY after a commit and report a spurious "already exists", and
+    # query() only hands back the first statement's result.
+    async with db_connection() as connection:
+        response = await connection.query_raw(
+            query,
+            {
+                "id": ensure_record_id(record_id),
+                "data": data,
+                "targets": [ensure_record_id(target) for target in targets],
+            },
+        )
+    if response.get("error"):
+        raise RuntimeError(response["error"].get("message", str(response["error"])))
+    # BEGIN/COMMIT produce no entries: one result for CREATE, then one for RELATE
+    statements = response.get("result") or []
+    for statement in statements:
+        if statement.get("status") != "OK":
+            raise RuntimeError(str(statement.get("result")))
+    if len(statements) != (2 if targets else 1):
+        raise RuntimeError(
+            f"Unexpected result count {len(statements)} creating {record_id}"
+        )
+    if targets and len(statements[1]["result"] or []) != len(targets):
+        raise RuntimeError(f"Not every {relationship} edge was created for {record_id}")
+    created = parse_record_ids(statements[0]["result"])
+    if isinstance(created, list):
+        created = created[0] if created else {}
+    return created if isinstance(created, dict) else {}
+
+
 async def repo_upsert(
     table: str, id: Optional[str], data: Dict[str, Any], add_timestamp: bool = False
 ) -> List[Dict[str, Any]]:
@@ -29,7 +29,7 @@ class ObjectModel(BaseModel):
     updated: Optional[datetime] = None
 
     @classmethod
-    async def get_all(cls: Type[T], order_by=None) -> List[T]:
+    async def get_all(cls: Type[T], order_by=None, owner: Optional[str] = None) -> List[T]:
         try:
             # If called from a specific subclass, use its table_name
             if cls.table_name:
@@ -40,17 +40,22 @@ class ObjectModel(BaseModel):
                 raise InvalidInputError(
                     "get_all() must be called from a specific model class"
                 )
+            query = f"SELECT * FROM {table_name}"
+            params: Dict[str, Any] = {}
+            if owner:
+                # Filter in the database (owner is indexed) rather than by caller
+                query += " WHERE owner = $owner"
+                params["owner"] = ensure_record_id(owner)
             if order_by:
-                query = f"SELECT * FROM {table_name} ORDER BY {order_by}"
-            else:
-                query = f"SELECT * FROM {table_name}"
+                query += f" ORDER BY {order_by}"
 
             logger.debug(
-                "ObjectModel.get_all start table=%s order_by=%s",
+                "ObjectModel.get_all start table=%s order_by=%s owner=%s",
                 table_name,
                 order_by,
+                owner,
             )
-            result = await repo_query(query)
+            result = await repo_query(query, params)
             objects = []
             for obj in result:
                 try:
@@ -102,6 +107,32 @@ class ObjectModel(BaseModel):
             logger.exception(e)
             raise NotFoundError(f"Object with id {id} not found - {str(e)}")
 
+    @classmethod
+    async def get_many(
+        cls: Type[T], ids: List[str], owner: Optional[str] = None
+    ) -> Dict[str, T]:
+        """
+        Fetch several records of this model in one query, keyed by id.
+        Ids that do not exist (or are not owned by `owner`, when given) are absent.
+        """
+        if not ids:
+            return {}
+        # Selecting from the record ids themselves is a direct key lookup,
+        # unlike `WHERE id IN $ids` which scans the table.
+        query = "SELECT * FROM $ids"
+        params: Dict[str, Any] = {"ids": [ensure_record_id(i) for i in ids]}
+        if owner:
+            query += " WHERE owner = $owner"
+            params["owner"] = ensure_record_id(owner)
+        try:
+            result = await repo_query(query, params)
+        except Exception as e:
+            logger.error(f"Error fetching {cls.table_name} records: {str(e)}")
+            logger.exception(e)
+            raise DatabaseOperationError(e)
+        objects = (cls(**row) for row in result or [])
+        return {str(obj.id): obj for obj in objects}
+
     @classmethod
     def _get_class_by_table_name(cls, table_name: str) -> Optional[Type["ObjectModel"]]:
         """Find the appropriate subclass based on table_name."""
@@ -1,12 +1,18 @@
 import asyncio
 from typing import Any, ClassVar, Dict, List, Literal, Optional, Tuple, Union
+from uuid import uuid4
 
 from loguru import logger
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, ValidationError, field_validator
 from surreal_commands import submit_command
 from surrealdb import RecordID
 
-from open_notebook.database.repository import ensure_record_id, repo_query
+from open_notebook.database.repository import (
+    ensure_record_id,
+    repo_create_related,
+    repo_query,
+    with_table_prefix,
+)
 from open_notebook.domain.base import ObjectModel
 from open_notebook.domain.models import model_manager
 from open_notebook.exceptions import DatabaseOperationError, InvalidInputError
@@ -44,16 +50,21 @@ class Notebook(ObjectModel):
             logger.exception(e)
             raise DatabaseOperationError(e)
 
-    async def get_notes(self) -> List["Note"]:
+    async def get_notes(self, owner: Optional[str] = None) -> List["Note"]:
         try:
+            params: Dict[str, Any] = {"id": ensure_record_id(self.id)}
+            owner_filter = ""
+            if owner:
+                owner_filter = " and in.owner = $owner"
+                params["owner"] = ensure_record_id(owner)
             srcs = await repo_query(
-                """
+                f"""
             select * omit note.content, note.embedding from (
-                select in as note from artifact where out=$id
+                select in as note from artifact where out=$id{owner_filter}
                 fetch note
             ) order by note.updated desc
             """,
-                {"id": ensure_record_id(self.id)},
+                params,
             )
             return [Note(**src["note"]) for src in srcs] if srcs else []
         except Exception as e:
@@ -61,30 +72,8 @@ class Notebook(ObjectModel):
             logger.exception(e)
             raise DatabaseOperationError(e)
 
-    async def get_chat_sessions(self) -> List["ChatSession"]:
-        try:
-            srcs = await repo_query(
-                """
-                select * from (
-                    select
-                    <- chat_session as chat_session
-                    from refers_to
-                    where out=$id
-                    fetch chat_session
-                )
-                order by chat_session.updated desc
-            """,
-                {"id": ensure_record_id(self.id)},
-            )
-            return (
-                [ChatSession(**src["chat_session"][0]) for src in srcs] if srcs else []
-            )
-        except Exception as e:
-            logger.error(
-                f"Error fetching chat sessions for notebook {self.id}: {str(e)}"
-            )
-            logger.exception(e)
-            raise DatabaseOperationError(e)
+    async def get_chat_sessions(self, owner: Optional[str] = None) -> List["ChatSession"]:
+        return await ChatSession.get_for_notebook(self.id, owner=owner)
 
 
 class Asset(BaseModel):
@@ -267,6 +256,35 @@ class Source(ObjectModel):
             raise InvalidInputError("Notebook ID must be provided")
         return await self.relate("reference", notebook_id)
 
+    async def save_with_notebooks(self, notebook_ids: Optional[List[str]]) -> None:
+        """
+        Create this (new) source and its notebook references in one transaction,
+        instead of save() followed by one add_to_notebook() round-trip per notebook.
+        A missing id is generated client-side so the edges can be written alongside.
+        """
+        generated_id = not self.id
+        if generated_id:
+            self.id = f"{self.table_name}:{uuid4().hex}"
+        try:
+            self.model_validate(self.model_dump(), strict=True)
+            result = await repo_create_related(
+                self.id,
+                self._prepare_save_data(),
+                "reference",
+                [with_table_prefix(nb_id, "notebook") for nb_id in notebook_ids or [] if nb_id],
+            )
+        except Exception as e:
+            if generated_id:
+                self.id = None
+            if isinstance(e, ValidationError):
+                logger.error(f"Validation failed: {e}")
+                raise
+            logger.error(f"Error saving source with notebooks: {e}")
+            raise DatabaseOperationError(e)
+        for key, value in result.items():
+            if hasattr(self, key):
+                setattr(self, key, value)
+
     async def vectorize(self) -> str:
         """
         Submit vectorization as a background job using the vectorize_source command.
@@ -436,6 +454,47 @@ class ChatSession(ObjectModel):
     model_override: Optional[str] = None
     owner: Optional[str] = None
 
+    @classmethod
+    async def get_for_notebook(
+        cls, notebook_id: Optional[str], owner: Optional[str] = None
+    ) -> List["ChatSession"]:
+        """Sessions related to a notebook, newest first; only needs the notebook id."""
+        try:
+            if owner:
+                # Driven by the chat_session owner index instead of loading every
+                # session of the notebook and filtering by owner afterwards.
+                rows = await repo_query(
+                    """
+                    select * from chat_session
+                    where owner = $owner and $id in ->refers_to->notebook
+                    order by updated desc
+                """,
+                    {"id": ensure_record_id(notebook_id), "owner": ensure_record_id(owner)},
+                )
+                return [cls(**row) for row in rows] if rows else []
+            srcs = await repo_query(
+                """
+                select * from (
+                    select
+                    <- chat_session as chat_session
+                    from refers_to
+                    where out=$id
+                    fetch chat_session
+                )
+                order by chat_session.updated desc
+            """,
+                {"id": ensure_record_id(notebook_id)},
+            )
+            return (
+                [cls(**src["chat_session"][0]) for src in srcs] if srcs else []
+            )
+        except Exception as e:
+            logger.error(
+                f"Error fetching chat sessions for notebook {notebook_id}: {str(e)}"
+            )
+            logger.exception(e)
+            raise DatabaseOperationError(e)
+
     async def relate_to_notebook(self, notebook_id: str) -> Any:
         if not notebook_id:
             raise InvalidInputError("Notebook ID must be provided")
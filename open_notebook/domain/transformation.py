@@ -1,8 +1,18 @@
-from typing import ClassVar, Optional
+from typing import ClassVar, List, Optional
 
 from pydantic import Field
 
+from open_notebook.database.repository import ensure_record_id, repo_query
 from open_notebook.domain.base import ObjectModel, RecordModel
+from open_notebook.utils.cache import TTLCache
+
+# Default (apply_default) transformation ids per owner. Source creation looks
+# these up on every request; any transformation write clears the cache.
+DEFAULT_TRANSFORMATIONS_CACHE_TTL = 60.0
+DEFAULT_TRANSFORMATIONS_CACHE_MAXSIZE = 1024
+_default_ids_cache: TTLCache[str, List[str]] = TTLCache(
+    DEFAULT_TRANSFORMATIONS_CACHE_MAXSIZE, ttl=DEFAULT_TRANSFORMATIONS_CACHE_TTL
+)
 
 
 class Transformation(ObjectModel):
@@ -14,6 +24,34 @@ class Transformation(ObjectModel):
     apply_default: bool
     owner: Optional[str] = None
 
+    @classmethod
+    async def get_default_ids(cls, owner: str) -> List[str]:
+        """Ids of transformations marked apply_default that are global or owned by `owner`."""
+        cached = _default_ids_cache.get(owner)
+        if cached is not None:
+            return list(cached)
+
+        rows = await repo_query(
+            """
+            SELECT id FROM transformation
+            WHERE apply_default = true
+              AND (owner IS NONE OR owner = $owner)
+            """,
+            {"owner": ensure_record_id(owner)},
+        )
+        ids = [str(row["id"]) for row in rows or []]
+        _default_ids_cache.set(owner, ids)
+        return list(ids)
+
+    async def save(self) -> None:
+        await super().save()
+        _default_ids_cache.clear()
+
+    async def delete(self) -> bool:
+        deleted = await super().delete()
+        _default_ids_cache.clear()
+        return deleted
+
 
 class DefaultPrompts(RecordModel):
     record_id: ClassVar[str] = "open_notebook:default_prompts"
@@ -1,5 +1,6 @@
 import asyncio
 import concurrent.futures
+import hashlib
 import re
 import sqlite3
 from typing import Annotated, Callable, Coroutine, List, Optional, Tuple, TypeVar
@@ -17,6 +18,7 @@ from open_notebook.config import LANGGRAPH_CHECKPOINT_FILE
 from open_notebook.domain.notebook import Notebook
 from open_notebook.graphs.image_generation import generate_image_message
 from open_notebook.graphs.utils import provision_langchain_model
+from open_notebook.utils import TTLCache, token_count
 
 
 T = TypeVar("T")
@@ -48,6 +50,28 @@ class ThreadState(TypedDict):
     image_generation: Optional[dict]
 
 
+# The chat system prompt only depends on the notebook and the selected context,
+# which stay the same across the turns of a conversation. Rendering the template
+# is cheap, but tokenizing a potentially large context is not, so the token count
+# is cached by the digest of the rendered prompt. Only digests and ints are kept:
+# a context can be megabytes, and holding the prompts themselves would pin that
+# much memory per entry.
+SYSTEM_PROMPT_TOKENS_CACHE_MAXSIZE = 1024
+_system_prompt_tokens_cache: TTLCache[bytes, int] = TTLCache(
+    SYSTEM_PROMPT_TOKENS_CACHE_MAXSIZE
+)
+
+
+def _render_system_prompt(state: ThreadState) -> Tuple[str, int]:
+    system_prompt = Prompter(prompt_template="chat").render(data=state)  # type: ignore[arg-type]
+    key = hashlib.sha256(system_prompt.encode()).digest()
+    tokens = _system_prompt_tokens_cache.get(key)
+    if tokens is None:
+        tokens = token_count(DATA_URI_RE.sub("[image omitted]", system_prompt))
+        _system_prompt_tokens_cache.set(key, tokens)
+    return system_prompt, tokens
+
+
 async def call_model_with_messages(state: ThreadState, config: RunnableConfig) -> dict:
     if state.get("image_generation"):
         logger.debug("Image generation path: payload present for thread %s", config.get("configurable", {}).get("thread_id"))
@@ -66,7 +90,7 @@ async def call_model_with_messages(state: ThreadState, config: RunnableConfig) -
         state["image_generation"] = None
         return {"messages": ai_message}
 
-    system_prompt = Prompter(prompt_template="chat").render(data=state)  # type: ignore[arg-type]
+    system_prompt, system_tokens = _render_system_prompt(state)
     logger.debug(
         "Text chat path: thread=%s messages=%s ctx_sources=%s ctx_notes=%s model_override=%s",
         config.get("configurable", {}).get("thread_id"),
@@ -85,12 +109,12 @@ async def call_model_with_messages(state: ThreadState, config: RunnableConfig) -
     model_id = config.get("configurable", {}).get("model_id") or state.get(
         "model_override"
     )
-    combined_payload_text = str(payload)
-    sanitized_text = DATA_URI_RE.sub("[image omitted]", combined_payload_text)
+    sanitized_messages = DATA_URI_RE.sub("[image omitted]", str(state.get("messages", [])))
     model = await provision_langchain_model(
-        sanitized_text,
+        sanitized_messages,
         model_id,
         "chat",
+        tokens=system_tokens + token_count(sanitized_messages),
         max_tokens=8192,
     )
 
@@ -6,6 +6,7 @@ To avoid circular imports, import functions directly:
 - from open_notebook.utils import split_text, token_count, compare_versions
 """
 
+from .cache import TTLCache
 from .text_utils import (
     clean_thinking_content,
     parse_thinking_content,
@@ -19,6 +20,7 @@ from .version_utils import (
     compare_versions,
     get_installed_version,
     get_version_from_github,
+    get_version_from_github_conditional,
 )
 
 __all__ = [
@@ -32,5 +34,7 @@ __all__ = [
     "token_cost",
     "compare_versions",
     "get_installed_version",
-    "get_version_from_github"
+    "get_version_from_github",
+    "get_version_from_github_conditional",
+    "TTLCache",
 ]
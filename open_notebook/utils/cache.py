@@ -0,0 +1,58 @@
+"""
+Small in-process cache for hot lookups (auth claims, ownership checks, rendered
+content) that are cheap to recompute but requested on nearly every call.
+"""
+
+import time
+from typing import Dict, Generic, Hashable, Iterator, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Bounded mapping whose entries expire `ttl` seconds after they are set.
+
+    With `ttl=None` entries never expire and only the size bound applies. Once
+    `maxsize` entries are held, setting a new key evicts the oldest one. Expiry
+    uses time.monotonic, so wall-clock deadlines must be passed as a per-entry
+    `ttl`. `None` is reserved for misses and cannot be stored as a value.
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: Dict[K, Tuple[Optional[float], V]] = {}
+
+    def get(self, key: K) -> Optional[V]:
+        """Return the live value for `key`, or None if missing or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        """Store `value`, expiring after `ttl` seconds (default: the cache's ttl)."""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        if key not in self._data and len(self._data) >= self.maxsize:
+            # Dicts keep insertion order, so this evicts the oldest entry
+            self._data.pop(next(iter(self._data)), None)
+        self._data[key] = (expires_at, value)
+
+    def pop(self, key: K) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
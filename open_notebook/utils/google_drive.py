@@ -3,7 +3,7 @@ import os
 import re
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
 
 import httpx
 from loguru import logger
@@ -36,6 +36,9 @@ class DriveFile:
     shortcut_resource_key: Optional[str] = None
 
 
+# Upper bound on concurrent shortcut lookups while listing a folder page
+RESOLVE_CONCURRENCY = 16
+
 _EXPORT_MIME_MAP: Dict[str, str] = {
     "application/vnd.google-apps.document": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
     "application/vnd.google-apps.spreadsheet": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
@@ -256,6 +259,18 @@ class GoogleDriveClient:
             return file
         return await self.get_file_metadata(file.shortcut_target_id, file.shortcut_resource_key)
 
+    async def _resolve_drive_files(self, files: List[DriveFile]) -> List[DriveFile]:
+        """
+        Resolve shortcuts for a batch of files concurrently, preserving order.
+        """
+        semaphore = asyncio.Semaphore(RESOLVE_CONCURRENCY)
+
+        async def _resolve_one(file: DriveFile) -> DriveFile:
+            async with semaphore:
+                return await self.resolve_drive_file(file)
+
+        return list(await asyncio.gather(*(_resolve_one(f) for f in files)))
+
     async def list_children(
         self,
         folder_id: str,
@@ -263,6 +278,26 @@ class GoogleDriveClient:
         recursive: bool = True,
         max_items: int = 500,
     ) -> List[DriveFile]:
+        return [
+            f
+            async for f in self.iter_children(
+                folder_id, resource_key, recursive=recursive, max_items=max_items
+            )
+        ]
+
+    async def iter_children(
+        self,
+        folder_id: str,
+        resource_key: Optional[str] = None,
+        recursive: bool = True,
+        max_items: int = 500,
+    ) -> AsyncGenerator[DriveFile, None]:
+        """
+        Yield the files in a folder page by page as they are listed, so callers
+        can start emitting results before the whole tree has been walked.
+        """
+        if max_items <= 0:
+            return
         # First fetch folder metadata to pick correct corpora/driveId (required for shared drives)
         folder_meta = await self.get_file_metadata(folder_id, resource_key)
         folder_meta = await self.resolve_drive_file(folder_meta)
@@ -291,7 +326,7 @@ class GoogleDriveClient:
         else:
             params["corpora"] = "user"
 
-        items: List[DriveFile] = []
+        count = 0
         page_token: Optional[str] = None
         async with httpx.AsyncClient(timeout=30) as client:
             while True:
@@ -331,8 +366,8 @@ class GoogleDriveClient:
                     len(data.get("files", [])),
                     bool(data.get("nextPageToken")),
                 )
-                for f in data.get("files", []):
-                    drive_file = DriveFile(
+                page_files = [
+                    DriveFile(
                         id=f.get("id"),
                         name=f.get("name"),
                         mime_type=f.get("mimeType"),
@@ -342,26 +377,29 @@ class GoogleDriveClient:
                         shortcut_target_id=(f.get("shortcutDetails") or {}).get("targetId"),
                         shortcut_resource_key=(f.get("shortcutDetails") or {}).get("targetResourceKey"),
                     )
-                    resolved = await self.resolve_drive_file(drive_file)
+                    for f in data.get("files", [])
+                ]
+                for resolved in await self._resolve_drive_files(page_files):
                     if resolved.mime_type == "application/vnd.google-apps.folder":
                         if recursive:
-                            sub_items = await self.list_children(
+                            async for sub_item in self.iter_children(
                                 resolved.id,
                                 resolved.resource_key,
                                 recursive=recursive,
-                                max_items=max_items - len(items),
-                            )
-                            items.extend(sub_items)
-                            if len(items) >= max_items:
-                                return items
+                                max_items=max_items - count,
+                            ):
+                                yield sub_item
+                                count += 1
+                            if count >= max_items:
+                                return
                         continue
-                    items.append(resolved)
-                    if len(items) >= max_items:
-                        return items
+                    yield resolved
+                    count += 1
+                    if count >= max_items:
+                        return
                 page_token = data.get("nextPageToken")
                 if not page_token:
                     break
-        return items
 
     async def download_file(
         self,
@@ -10,8 +10,11 @@ from open_notebook.config import GCS_BUCKET, STORAGE_BACKEND, UPLOADS_FOLDER
 
 def generate_unique_filename(original_filename: str, upload_folder: str) -> str:
     """
-    Generate a unique filename within upload_folder, appending a counter if needed.
-    Mirrors the logic used by the upload API so Drive imports behave consistently.
+    Reserve a unique filename within upload_folder and return its path.
+    The original name is kept when free; otherwise a short random token is
+    appended. The file is created with O_EXCL, so there is no directory walk and
+    concurrent uploads cannot claim the same path. Shared by the upload API and
+    Drive imports; callers must unlink the (empty) reservation if writing fails.
     """
     file_path = Path(upload_folder)
     file_path.mkdir(parents=True, exist_ok=True)
@@ -19,13 +22,14 @@ def generate_unique_filename(original_filename: str, upload_folder: str) -> str:
     stem = Path(original_filename).stem
     suffix = Path(original_filename).suffix
 
-    counter = 0
+    candidate = original_filename
     while True:
-        candidate = f"{stem} ({counter}){suffix}" if counter else original_filename
         full_path = file_path / candidate
-        if not full_path.exists():
+        try:
+            os.close(os.open(full_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666))
             return str(full_path)
-        counter += 1
+        except FileExistsError:
+            candidate = f"{stem} ({uuid4().hex[:8]}){suffix}"
 
 
 def save_bytes_to_storage(data: bytes, filename: str, prefix: Optional[str] = None) -> str:
@@ -56,7 +60,15 @@ def save_bytes_to_storage(data: bytes, filename: str, prefix: Optional[str] = No
 
     # Local filesystem
     unique_path = generate_unique_filename(filename, UPLOADS_FOLDER)
-    with open(unique_path, "wb") as f:
-        f.write(data)
+    try:
+        with open(unique_path, "wb") as f:
+            f.write(data)
+    except Exception:
+        # Don't leave the empty reservation behind
+        try:
+            os.unlink(unique_path)
+        except OSError:
+            pass
+        raise
     logger.info(f"Saved bytes locally: {unique_path}")
     return unique_path
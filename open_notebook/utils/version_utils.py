@@ -4,6 +4,7 @@ Handles version comparison, GitHub version fetching, and package version managem
 """
 
 from importlib.metadata import PackageNotFoundError, version
+from typing import Optional, Tuple
 from urllib.parse import urlparse
 
 import requests  # type: ignore
@@ -27,6 +28,22 @@ def get_version_from_github(repo_url: str, branch: str = "main") -> str:
         requests.RequestException: If there's an error fetching the file
         KeyError: If version information is not found in pyproject.toml
     """
+    version, _ = get_version_from_github_conditional(repo_url, branch)
+    return version  # type: ignore[return-value]
+
+
+def get_version_from_github_conditional(
+    repo_url: str, branch: str = "main", etag: Optional[str] = None
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Like get_version_from_github, but sends If-None-Match when an ETag from a
+    previous fetch is given.
+
+    Returns:
+        tuple: (version, etag)
+        - version: version string, or None if the file is unchanged (304)
+        - etag: ETag to send on the next request, if GitHub provided one
+    """
     # Parse the GitHub URL
     parsed_url = urlparse(repo_url)
     if "github.com" not in parsed_url.netloc:
@@ -45,7 +62,10 @@ def get_version_from_github(repo_url: str, branch: str = "main") -> str:
     )
 
     # Fetch the file with timeout
-    response = requests.get(raw_url, timeout=10)
+    headers = {"If-None-Match": etag} if etag else None
+    response = requests.get(raw_url, headers=headers, timeout=10)
+    if response.status_code == 304:
+        return None, etag
     response.raise_for_status()
 
     # Parse TOML content
@@ -62,7 +82,7 @@ def get_version_from_github(repo_url: str, branch: str = "main") -> str:
         except KeyError:
             raise KeyError("Version not found in pyproject.toml")
 
-    return version
+    return version, response.headers.get("ETag")
 
 
 def get_installed_version(package_name: str) -> str:
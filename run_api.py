@@ -18,14 +18,21 @@ if __name__ == "__main__":
     host = os.getenv("API_HOST", "127.0.0.1")
     port = int(os.getenv("API_PORT", "5055"))
     reload = os.getenv("API_RELOAD", "true").lower() == "true"
+    # "auto" picks uvloop/httptools when installed (pip install uvloop httptools)
+    # and falls back to asyncio/h11 otherwise; set explicitly to pin a backend.
+    loop = os.getenv("API_LOOP", "auto")
+    http = os.getenv("API_HTTP", "auto")
 
     print(f"Starting Open Notebook API server on {host}:{port}")
     print(f"Reload mode: {reload}")
+    print(f"Event loop: {loop}, HTTP parser: {http}")
 
     uvicorn.run(
         "api.main:app",
         host=host,
         port=port,
         reload=reload,
+        loop=loop,
+        http=http,
         reload_dirs=[str(current_dir)] if reload else None,
     )
@@ -0,0 +1,432 @@
+"""
+Tests for app JWT handling in api.auth.
+
+issue_app_jwt / decode_app_jwt hand-roll HS256 instead of going through
+PyJWT, so these pin them against PyJWT's own encoder and verifier.
+"""
+
+import base64
+import hashlib
+import hmac
+import time
+from types import SimpleNamespace
+
+import jwt
+import orjson
+import pytest
+
+from api import auth
+
+SECRET = "test-secret-" + "x" * 64
+OTHER_SECRET = "other-secret-" + "y" * 64
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _sign(header: bytes, payload: bytes, secret: str = SECRET) -> str:
+    signing_input = f"{_b64(header)}.{_b64(payload)}"
+    sig = hmac.new(secret.encode(), signing_input.encode(), hashlib.sha256).digest()
+    return f"{signing_input}.{_b64(sig)}"
+
+
+def _claims(**overrides):
+    now = int(time.time())
+    claims = {"sub": "user:me", "email": "me@example.com", "iat": now, "exp": now + 3600}
+    claims.update(overrides)
+    return claims
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    auth._token_cache.clear()
+    yield
+    auth._token_cache.clear()
+
+
+class TestDecodeHS256:
+    def test_accepts_pyjwt_token(self):
+        claims = _claims()
+        token = jwt.encode(claims, SECRET, algorithm="HS256")
+        assert auth._decode_hs256(token, SECRET) == claims
+
+    def test_rejects_tampered_signature(self):
+        token = jwt.encode(_claims(), SECRET, algorithm="HS256")
+        head, payload, sig = token.split(".")
+        flipped = ("A" if sig[0] != "A" else "B") + sig[1:]
+        with pytest.raises(jwt.InvalidSignatureError):
+            auth._decode_hs256(f"{head}.{payload}.{flipped}", SECRET)
+
+    def test_rejects_tampered_payload(self):
+        token = jwt.encode(_claims(), SECRET, algorithm="HS256")
+        head, _, sig = token.split(".")
+        forged = _b64(orjson.dumps(_claims(sub="user:admin")))
+        with pytest.raises(jwt.InvalidSignatureError):
+            auth._decode_hs256(f"{head}.{forged}.{sig}", SECRET)
+
+    def test_rejects_wrong_secret(self):
+        token = jwt.encode(_claims(), OTHER_SECRET, algorithm="HS256")
+        with pytest.raises(jwt.InvalidSignatureError):
+            auth._decode_hs256(token, SECRET)
+
+    def test_rejects_alg_none(self):
+        head = _b64(orjson.dumps({"alg": "none", "typ": "JWT"}))
+        payload = _b64(orjson.dumps(_claims()))
+        with pytest.raises(jwt.InvalidAlgorithmError):
+            auth._decode_hs256(f"{head}.{payload}.", SECRET)
+
+    def test_rejects_alg_mismatch(self):
+        token = jwt.encode(_claims(), SECRET, algorithm="HS512")
+        with pytest.raises(jwt.InvalidAlgorithmError):
+            auth._decode_hs256(token, SECRET)
+
+    def test_rejects_expired(self):
+        token = jwt.encode(_claims(exp=int(time.time()) - 10), SECRET, algorithm="HS256")
+        with pytest.raises(jwt.ExpiredSignatureError):
+            auth._decode_hs256(token, SECRET)
+
+    def test_rejects_not_yet_valid(self):
+        token = jwt.encode(_claims(nbf=int(time.time()) + 600), SECRET, algorithm="HS256")
+        with pytest.raises(jwt.ImmatureSignatureError):
+            auth._decode_hs256(token, SECRET)
+
+    def test_rejects_non_numeric_exp(self):
+        header = orjson.dumps({"alg": "HS256", "typ": "JWT"})
+        token = _sign(header, orjson.dumps(_claims(exp="tomorrow")))
+        with pytest.raises(jwt.DecodeError):
+            auth._decode_hs256(token, SECRET)
+
+    @pytest.mark.parametrize("token", ["", "abc", "a.b", "a.b.c.d"])
+    def test_rejects_wrong_segment_count(self, token):
+        with pytest.raises(jwt.DecodeError):
+            auth._decode_hs256(token, SECRET)
+
+    @pytest.mark.parametrize(
+        "token",
+        [
+            "!!!.e30.sig",  # header is not base64
+            f"{_b64(b'not json')}.e30.sig",  # header is not JSON
+            f"{_b64(orjson.dumps({'alg': 'HS256'}))}.e30.a",  # bad signature padding
+            "héader.e30.sig",  # non-ascii
+        ],
+    )
+    def test_rejects_malformed_segments(self, token):
+        with pytest.raises(jwt.InvalidTokenError):
+            auth._decode_hs256(token, SECRET)
+
+    def test_rejects_malformed_payload_with_valid_signature(self):
+        token = _sign(orjson.dumps({"alg": "HS256", "typ": "JWT"}), b"not json")
+        with pytest.raises(jwt.DecodeError):
+            auth._decode_hs256(token, SECRET)
+
+
+class TestDecodeAppJwtCache:
+    def test_cache_entry_does_not_outlive_exp(self, monkeypatch):
+        now, mono = time.time(), time.monotonic()
+        token = jwt.encode(_claims(exp=int(now) + 2), SECRET, algorithm="HS256")
+        auth.decode_app_jwt(token, SECRET)
+
+        # Past exp but within TOKEN_CACHE_TTL, the cached claims must not be served
+        monkeypatch.setattr(auth.time, "time", lambda: now + 3)
+        monkeypatch.setattr(auth.time, "monotonic", lambda: mono + 3)
+        with pytest.raises(jwt.ExpiredSignatureError):
+            auth.decode_app_jwt(token, SECRET)
+
+    def test_cache_is_keyed_by_secret(self):
+        token = jwt.encode(_claims(), SECRET, algorithm="HS256")
+        auth.decode_app_jwt(token, SECRET)
+        with pytest.raises(jwt.InvalidSignatureError):
+            auth.decode_app_jwt(token, OTHER_SECRET)
+
+
+
+def _middleware_client(monkeypatch, excluded_paths=None):
+    from starlette.applications import Starlette
+    from starlette.responses import PlainTextResponse
+    from starlette.routing import Route
+    from starlette.testclient import TestClient
+
+    async def ok(request):
+        return PlainTextResponse(getattr(request.state, "user_id", "anon"))
+
+    monkeypatch.setenv("AUTH_JWT_SECRET", SECRET)
+    app = Starlette(routes=[Route(p, ok, methods=["GET", "OPTIONS"]) for p in ("/", "/health", "/api/x")])
+    app.add_middleware(auth.JWTAuthMiddleware, excluded_paths=excluded_paths)
+    return TestClient(app)
+
+
+class TestJWTAuthMiddleware:
+    def test_default_exclusions_bypass_auth(self, monkeypatch):
+        client = _middleware_client(monkeypatch)
+        assert client.get("/health").status_code == 200
+        assert client.get("/").status_code == 200
+        assert client.get("/api/x").status_code == 401
+
+    def test_narrowed_exclusions_apply_to_health(self, monkeypatch):
+        client = _middleware_client(monkeypatch, excluded_paths=["/docs"])
+        assert client.get("/health").status_code == 401
+        assert client.get("/").status_code == 401
+
+    def test_options_bypasses_auth(self, monkeypatch):
+        client = _middleware_client(monkeypatch, excluded_paths=["/docs"])
+        assert client.options("/api/x").status_code == 200
+
+    def test_valid_token_sets_user(self, monkeypatch):
+        client = _middleware_client(monkeypatch)
+        token = jwt.encode(_claims(), SECRET, algorithm="HS256")
+        resp = client.get("/api/x", headers={"Authorization": f"Bearer {token}"})
+        assert resp.status_code == 200
+        assert resp.text == "user:me"
+
+    def test_expired_token_rejected(self, monkeypatch):
+        client = _middleware_client(monkeypatch)
+        token = jwt.encode(_claims(exp=int(time.time()) - 10), SECRET, algorithm="HS256")
+        resp = client.get("/api/x", headers={"Authorization": f"Bearer {token}"})
+        assert resp.status_code == 401
+
+
+class TestIssueAppJwt:
+    def test_pyjwt_accepts_issued_token(self, monkeypatch):
+        monkeypatch.setenv("AUTH_JWT_SECRET", SECRET)
+        user = SimpleNamespace(id="user:me", email="me@example.com", name="Me")
+        token = auth.issue_app_jwt(user, expires_in=60)
+
+        claims = jwt.decode(token, SECRET, algorithms=["HS256"])
+        assert claims["sub"] == "user:me"
+        assert claims["email"] == "me@example.com"
+        assert claims["name"] == "Me"
+        assert claims["exp"] - claims["iat"] == 60
+        assert jwt.get_unverified_header(token) == {"alg": "HS256", "typ": "JWT"}
+        assert auth.decode_app_jwt(token, SECRET) == claims
+
+    def test_issued_token_rejected_with_other_secret(self, monkeypatch):
+        monkeypatch.setenv("AUTH_JWT_SECRET", SECRET)
+        user = SimpleNamespace(id="user:me", email="me@example.com", name=None)
+        token = auth.issue_app_jwt(user)
+        with pytest.raises(jwt.InvalidSignatureError):
+            jwt.decode(token, OTHER_SECRET, algorithms=["HS256"])
+
+
+class TestGoogleTokenExchange:
+    @pytest.mark.asyncio
+    async def test_timeout_is_not_replayed(self, monkeypatch):
+        import httpx
+        from fastapi import HTTPException
+
+        from api.routers import auth as auth_router
+
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            raise httpx.ReadTimeout("read timed out", request=request)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(auth_router, "_get_http_client", lambda: client)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await auth_router._post_token_exchange({"code": "single-use"})
+        assert exc_info.value.status_code == 504
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_server_error_is_returned_without_retry(self, monkeypatch):
+        import httpx
+
+        from api.routers import auth as auth_router
+
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503, json={"error": "backend_error"})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(auth_router, "_get_http_client", lambda: client)
+
+        resp = await auth_router._post_token_exchange({"code": "single-use"})
+        assert resp.status_code == 503
+        assert len(calls) == 1
+
+
+class TestVerifyGoogleIdToken:
+    @pytest.fixture(autouse=True)
+    def google(self, monkeypatch):
+        from google.oauth2 import id_token
+
+        monkeypatch.setenv("GOOGLE_CLIENT_ID", "client-id")
+        auth._google_claims_cache.clear()
+        calls = []
+        claims = {"iss": "accounts.google.com", "sub": "g1", "email": "me@example.com"}
+
+        def verify(raw, request, audience):
+            calls.append(raw)
+            if raw == "bad":
+                raise ValueError("bad token")
+            return dict(claims, exp=time.time() + 60)
+
+        monkeypatch.setattr(id_token, "verify_oauth2_token", verify)
+        yield calls
+        auth._google_claims_cache.clear()
+
+    def test_verified_claims_are_reused(self, google):
+        first = auth.verify_google_id_token("raw")
+        assert auth.verify_google_id_token("raw") == first
+        assert google == ["raw"]
+
+    def test_claims_are_reverified_after_exp(self, google, monkeypatch):
+        now, mono = time.time(), time.monotonic()
+        auth.verify_google_id_token("raw")
+        monkeypatch.setattr(auth.time, "time", lambda: now + 120)
+        monkeypatch.setattr(auth.time, "monotonic", lambda: mono + 120)
+        auth.verify_google_id_token("raw")
+        assert google == ["raw", "raw"]
+
+    def test_failures_are_not_cached(self, google):
+        from fastapi import HTTPException
+
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                auth.verify_google_id_token("bad")
+        assert google == ["bad", "bad"]
+        assert len(auth._google_claims_cache) == 0
+
+
+class TestGetOrCreateUserFromGoogleClaims:
+    @pytest.fixture
+    def db(self, monkeypatch):
+        from open_notebook.database import repository
+
+        state = SimpleNamespace(rows=[], queries=[], saved=[])
+
+        async def fake_repo_query(query, vars=None):
+            state.queries.append((query, vars))
+            return state.rows
+
+        async def save(user):
+            state.saved.append(user)
+
+        monkeypatch.setattr(repository, "repo_query", fake_repo_query)
+        monkeypatch.setattr(auth.User, "save", save)
+        return state
+
+    CLAIMS = {"sub": "g1", "email": "me@example.com", "name": "Me", "picture": None}
+
+    @pytest.mark.asyncio
+    async def test_sub_match_wins_over_email_match(self, db):
+        db.rows = [
+            {"id": "user:by_email", "email": "me@example.com", "sub": "other"},
+            {"id": "user:by_sub", "email": "old@example.com", "sub": "g1"},
+        ]
+        user = await auth.get_or_create_user_from_google_claims(self.CLAIMS)
+
+        assert user.id == "user:by_sub"
+        assert len(db.queries) == 1
+        assert db.saved == []
+
+    @pytest.mark.asyncio
+    async def test_email_match_is_linked_to_sub(self, db):
+        db.rows = [{"id": "user:by_email", "email": "me@example.com", "sub": "dev-me"}]
+        user = await auth.get_or_create_user_from_google_claims(self.CLAIMS)
+
+        assert user.id == "user:by_email"
+        assert user.sub == "g1"
+        assert db.saved == [user]
+
+    @pytest.mark.asyncio
+    async def test_new_user_is_created(self, db):
+        user = await auth.get_or_create_user_from_google_claims(self.CLAIMS)
+
+        assert (user.email, user.sub) == ("me@example.com", "g1")
+        assert db.saved == [user]
+
+
+class TestGoogleCodeLogin:
+    @pytest.mark.asyncio
+    async def test_credentials_are_stored_with_one_upsert(self, monkeypatch):
+        import httpx
+
+        from api.routers import auth as auth_router
+        from open_notebook.utils.google_drive import DRIVE_SCOPES
+
+        queries = []
+        user = auth.User(id="user:me", email="me@example.com", sub="g1")
+
+        async def post_token_exchange(payload):
+            return httpx.Response(
+                200,
+                json={
+                    "id_token": "raw",
+                    "scope": " ".join(DRIVE_SCOPES),
+                    "refresh_token": "refresh",
+                    "access_token": "access",
+                    "expires_in": 3600,
+                },
+            )
+
+        async def get_or_create(claims):
+            return user
+
+        async def fake_repo_query(query, vars=None):
+            queries.append((query, vars))
+            return [{"id": "google_credential:1"}]
+
+        monkeypatch.setenv("AUTH_JWT_SECRET", SECRET)
+        monkeypatch.setattr(auth_router, "_GOOGLE_CONFIGURED", True)
+        monkeypatch.setattr(auth_router, "_post_token_exchange", post_token_exchange)
+        monkeypatch.setattr(
+            auth_router, "verify_google_id_token", lambda raw: {"email": "me@example.com"}
+        )
+        monkeypatch.setattr(auth_router, "get_or_create_user_from_google_claims", get_or_create)
+        monkeypatch.setattr(auth_router, "repo_query", fake_repo_query)
+
+        resp = await auth_router.login_with_google_code(code="c", redirect_uri="http://x")
+
+        assert resp.drive_scope is True
+        assert len(queries) == 1
+        query, params = queries[0]
+        assert "UPSERT google_credential" in query
+        assert "WHERE user = $user" in query
+        assert str(params["user"]) == "user:me"
+        assert params["refresh_token"] == "refresh"
+
+
+class TestDevLogin:
+    @pytest.mark.asyncio
+    async def test_get_or_create_is_one_upsert(self, monkeypatch):
+        from api.routers import auth as auth_router
+
+        queries = []
+
+        async def fake_repo_query(query, vars=None):
+            queries.append((query, vars))
+            return [{"id": "user:existing", "email": vars["email"], "sub": "g1", "name": "Real"}]
+
+        monkeypatch.setenv("AUTH_JWT_SECRET", SECRET)
+        monkeypatch.setattr(auth_router, "_DEV_LOGIN_ENABLED", True)
+        monkeypatch.setattr(auth_router, "repo_query", fake_repo_query)
+        request = SimpleNamespace(client=SimpleNamespace(host="127.0.0.1"))
+
+        resp = await auth_router.dev_login(request, email="me@example.com")
+
+        assert resp.user.id == "user:existing"
+        assert resp.user.name == "Real"
+        assert len(queries) == 1
+        query, params = queries[0]
+        assert "UPSERT user" in query
+        assert "sub = sub ?? $sub" in query
+        assert params == {"email": "me@example.com", "sub": "dev-me@example.com", "name": "me"}
+
+    @pytest.mark.asyncio
+    async def test_rejects_non_local_client(self, monkeypatch):
+        from fastapi import HTTPException
+
+        from api.routers import auth as auth_router
+
+        monkeypatch.setattr(auth_router, "_DEV_LOGIN_ENABLED", True)
+        request = SimpleNamespace(client=SimpleNamespace(host="10.0.0.5"))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await auth_router.dev_login(request, email="me@example.com")
+        assert exc_info.value.status_code == 403
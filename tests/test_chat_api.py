@@ -1,6 +1,7 @@
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import orjson
 import pytest
 from fastapi.testclient import TestClient
 
@@ -28,12 +29,11 @@ def test_execute_chat_returns_messages(mock_get_session, mock_graph, client):
     mock_session = DummySession()
     mock_get_session.return_value = mock_session
 
-    mock_graph.get_state.return_value = SimpleNamespace(values={"messages": []})
-    mock_graph.invoke.return_value = {
-        "messages": [
-            SimpleNamespace(id="m1", type="ai", content="Answer"),
-        ]
-    }
+    mock_graph.aget_state = AsyncMock(return_value=SimpleNamespace(values={"messages": []}))
+    mock_graph.aupdate_state = AsyncMock()
+    mock_graph.ainvoke = AsyncMock(
+        return_value={"messages": [SimpleNamespace(id="m1", type="ai", content="Answer")]}
+    )
 
     payload = {
         "session_id": "chat_session:test",
@@ -48,16 +48,19 @@ def test_execute_chat_returns_messages(mock_get_session, mock_graph, client):
     body = response.json()
     assert body["messages"][0]["content"] == "Answer"
     assert mock_session.saved is True
-    mock_graph.invoke.assert_called_once()
-    call_kwargs = mock_graph.invoke.call_args.kwargs
+    mock_graph.ainvoke.assert_called_once()
+    call_kwargs = mock_graph.ainvoke.call_args.kwargs
     assert "input" in call_kwargs
     assert call_kwargs["input"]["messages"][-1].content == "Hello?"
 
 
+@patch("api.routers.chat.generate_image_message", new_callable=AsyncMock)
 @patch("api.routers.chat.chat_graph")
 @patch("api.routers.chat.Model.get", new_callable=AsyncMock)
 @patch("api.routers.chat.ChatSession.get", new_callable=AsyncMock)
-def test_generate_image_sets_image_payload(mock_get_session, mock_get_model, mock_graph, client):
+def test_generate_image_sets_image_payload(
+    mock_get_session, mock_get_model, mock_graph, mock_generate, client
+):
     mock_session = DummySession()
     mock_get_session.return_value = mock_session
 
@@ -68,12 +71,11 @@ def test_generate_image_sets_image_payload(mock_get_session, mock_get_model, moc
         type="image",
     )
 
-    mock_graph.get_state.return_value = SimpleNamespace(values={"messages": []})
-    mock_graph.invoke.return_value = {
-        "messages": [
-            SimpleNamespace(id="img1", type="ai", content="![img](data:image/png;base64,AAA=)")
-        ]
-    }
+    mock_graph.aget_state = AsyncMock(return_value=SimpleNamespace(values={"messages": []}))
+    mock_graph.aupdate_state = AsyncMock()
+    mock_generate.return_value = SimpleNamespace(
+        id="img1", type="ai", content="![img](data:image/png;base64,AAA=)"
+    )
 
     payload = {
         "session_id": "chat_session:test",
@@ -88,19 +90,21 @@ def test_generate_image_sets_image_payload(mock_get_session, mock_get_model, moc
 
     assert response.status_code == 200
     data = response.json()
-    assert data["messages"][0]["type"] == "ai"
+    assert data["messages"][-1]["type"] == "ai"
 
-    mock_graph.invoke.assert_called_once()
-    state_values = mock_graph.invoke.call_args.kwargs["input"]
-    assert state_values["image_generation"]["image_model"]["name"] == "nanobanana-pro"
-    assert state_values["context"] == {"sources": [], "notes": []}
+    mock_generate.assert_awaited_once()
+    call_kwargs = mock_generate.call_args.kwargs
+    assert call_kwargs["image_request"]["image_model"]["name"] == "nanobanana-pro"
+    assert call_kwargs["context"] == {"sources": [], "notes": []}
+    assert call_kwargs["planner_model_id"] == "model:text"
 
 
+@patch("api.routers.chat.generate_image_message", new_callable=AsyncMock)
 @patch("api.routers.chat.chat_graph")
 @patch("api.routers.chat.Model.get", new_callable=AsyncMock)
 @patch("api.routers.chat.ChatSession.get", new_callable=AsyncMock)
 def test_chat_after_image_clears_image_payload(
-    mock_get_session, mock_get_model, mock_graph, client
+    mock_get_session, mock_get_model, mock_graph, mock_generate, client
 ):
     mock_session = DummySession()
     mock_get_session.return_value = mock_session
@@ -112,19 +116,22 @@ def test_chat_after_image_clears_image_payload(
         type="image",
     )
 
-    mock_graph.get_state.side_effect = [
-        SimpleNamespace(values={"messages": []}),
-        SimpleNamespace(
-            values={
-                "messages": [],
-                "image_generation": {"image_prompt": "previous"},
-            }
-        ),
-    ]
-    mock_graph.invoke.side_effect = [
-        {"messages": [SimpleNamespace(id="img1", type="ai", content="image")]},
-        {"messages": [SimpleNamespace(id="m2", type="ai", content="text reply")]},
-    ]
+    mock_graph.aget_state = AsyncMock(
+        side_effect=[
+            SimpleNamespace(values={"messages": []}),
+            SimpleNamespace(
+                values={
+                    "messages": [],
+                    "image_generation": {"image_prompt": "previous"},
+                }
+            ),
+        ]
+    )
+    mock_graph.aupdate_state = AsyncMock()
+    mock_generate.return_value = SimpleNamespace(id="img1", type="ai", content="image")
+    mock_graph.ainvoke = AsyncMock(
+        return_value={"messages": [SimpleNamespace(id="m2", type="ai", content="text reply")]}
+    )
 
     image_payload = {
         "session_id": "chat_session:test",
@@ -146,6 +153,88 @@ def test_chat_after_image_clears_image_payload(
     resp2 = client.post("/api/chat/execute", json=chat_payload)
     assert resp2.status_code == 200
 
-    assert mock_graph.invoke.call_count == 2
-    second_input = mock_graph.invoke.call_args_list[1].kwargs["input"]
-    assert second_input.get("image_generation") is None
+    mock_generate.assert_awaited_once()
+    mock_graph.ainvoke.assert_called_once()
+    chat_input = mock_graph.ainvoke.call_args.kwargs["input"]
+    assert chat_input.get("image_generation") is None
+
+
+@patch("api.routers.chat.ChatSession.get_for_notebook", new_callable=AsyncMock)
+@patch("api.routers.chat.Notebook.get", new_callable=AsyncMock)
+def test_notebook_owner_cache_holds_owner_not_model(mock_get_notebook, mock_sessions, client):
+    from api.routers import chat as chat_router
+
+    chat_router._notebook_owner_cache.clear()
+    mock_get_notebook.return_value = SimpleNamespace(
+        id="notebook:nb1", owner="user:dev", name="Old name"
+    )
+    mock_sessions.return_value = []
+
+    for _ in range(2):
+        resp = client.get("/api/chat/sessions", params={"notebook_id": "nb1"})
+        assert resp.status_code == 200
+
+    # Second request is served from the owner cache, which stores no model fields
+    assert mock_get_notebook.await_count == 1
+    assert chat_router._notebook_owner_cache.get("notebook:nb1") == "user:dev"
+    mock_sessions.assert_awaited_with("notebook:nb1", owner="user:dev")
+
+    # A cached owner still rejects other users
+    chat_router._notebook_owner_cache.set("notebook:nb1", "user:other")
+    resp = client.get("/api/chat/sessions", params={"notebook_id": "nb1"})
+    assert resp.status_code == 404
+    chat_router._notebook_owner_cache.clear()
+
+
+@pytest.mark.asyncio
+@patch("api.routers.chat.chat_graph")
+async def test_stream_renders_each_structured_chunk(mock_graph):
+    from api.routers import chat as chat_router
+
+    chat_router._render_cache.clear()
+
+    async def fake_astream(**kwargs):
+        for part in ("Hello", "world"):
+            chunk = SimpleNamespace(
+                id="run-1", type="AIMessageChunk", content=[{"type": "text", "text": part}]
+            )
+            yield "messages", (chunk, {})
+        final = SimpleNamespace(
+            id="run-1", type="ai", content=[{"type": "text", "text": "Hello world"}]
+        )
+        yield "values", {"messages": [final]}
+
+    mock_graph.astream = fake_astream
+
+    events = [
+        orjson.loads(raw[len(b"data: "):])
+        async for raw in chat_router.stream_chat_response("chat_session:test", {}, None)
+    ]
+
+    tokens = [e["content"] for e in events if e["type"] == "token"]
+    assert tokens == ["Hello", "world"]
+    messages = next(e for e in events if e["type"] == "messages")["messages"]
+    assert messages[0]["content"] == "Hello world"
+    assert events[-1] == {"type": "complete"}
+    chat_router._render_cache.clear()
+
+
+def test_render_message_memoizes_complete_messages():
+    from api.routers import chat as chat_router
+
+    chat_router._render_cache.clear()
+    calls = []
+
+    def render(content):
+        calls.append(content)
+        return " ".join(part["text"] for part in content)
+
+    with patch.object(chat_router, "render_message_content", side_effect=render):
+        message = {"id": "m1", "type": "ai", "content": [{"type": "text", "text": "Hi"}]}
+        assert chat_router._render_message(message) == "Hi"
+        assert chat_router._render_message(message) == "Hi"
+        assert chat_router._render_message({"id": "m2", "content": "plain"}) == "plain"
+
+    assert len(calls) == 1
+    assert list(chat_router._render_cache) == ["m1"]
+    chat_router._render_cache.clear()
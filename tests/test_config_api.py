@@ -0,0 +1,181 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from api.routers import config
+
+
+@pytest.fixture(autouse=True)
+def reset_config_state(monkeypatch):
+    monkeypatch.setattr(config, "_version_cache", config.VersionCache())
+    monkeypatch.setattr(config, "_version_refresh_task", None)
+    monkeypatch.setattr(config, "_config_response_cache", None)
+    monkeypatch.setattr(config, "_db_fail_count", 0)
+    monkeypatch.setattr(config, "_db_cooldown_until", 0.0)
+    monkeypatch.setattr(config, "_db_last_error", None)
+
+
+@pytest.fixture
+def github(monkeypatch):
+    """Stand-in for the conditional GitHub fetch; set .result to change the answer."""
+    state = SimpleNamespace(calls=[], result=("1.1.0", '"etag-1"'))
+
+    def fetch(url, branch, etag):
+        state.calls.append(etag)
+        if isinstance(state.result, Exception):
+            raise state.result
+        return state.result
+
+    monkeypatch.setattr(config, "get_version_from_github_conditional", fetch)
+    return state
+
+
+class TestDatabaseHealthCircuitBreaker:
+    @pytest.fixture
+    def db(self, monkeypatch):
+        state = SimpleNamespace(calls=0, online=False)
+
+        async def fake_repo_query(query, vars=None):
+            state.calls += 1
+            if not state.online:
+                raise ConnectionError("connection refused")
+            return [1]
+
+        monkeypatch.setattr(config, "repo_query", fake_repo_query)
+        return state
+
+    @pytest.mark.asyncio
+    async def test_opens_after_threshold_and_skips_probes(self, db):
+        for _ in range(config.DB_HEALTH_FAILURE_THRESHOLD):
+            assert (await config.check_database_health())["status"] == "offline"
+        assert db.calls == config.DB_HEALTH_FAILURE_THRESHOLD
+
+        result = await config.check_database_health()
+        assert result == {"status": "offline", "error": "connection refused"}
+        assert db.calls == config.DB_HEALTH_FAILURE_THRESHOLD
+
+    @pytest.mark.asyncio
+    async def test_probes_again_after_cooldown(self, db, monkeypatch):
+        now = config.time.monotonic()
+        monkeypatch.setattr(config.time, "monotonic", lambda: now)
+        for _ in range(config.DB_HEALTH_FAILURE_THRESHOLD):
+            await config.check_database_health()
+
+        db.online = True
+        monkeypatch.setattr(
+            config.time, "monotonic", lambda: now + config.DB_HEALTH_COOLDOWN_SECONDS + 1
+        )
+        assert await config.check_database_health() == {"status": "online"}
+        assert config._db_fail_count == 0
+
+    @pytest.mark.asyncio
+    async def test_success_resets_failure_count(self, db):
+        await config.check_database_health()
+        db.online = True
+        await config.check_database_health()
+        db.online = False
+        for _ in range(config.DB_HEALTH_FAILURE_THRESHOLD - 1):
+            await config.check_database_health()
+
+        assert config._db_cooldown_until == 0.0
+
+
+class TestVersionCache:
+    @pytest.mark.asyncio
+    async def test_concurrent_first_checks_share_one_fetch(self, github):
+        results = await asyncio.gather(
+            *(config.get_latest_version_cached("1.0.0") for _ in range(5))
+        )
+
+        assert results == [("1.1.0", True)] * 5
+        assert len(github.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_fresh_entry_is_served_without_fetch(self, github):
+        await config.get_latest_version_cached("1.0.0")
+        await config.get_latest_version_cached("1.0.0")
+
+        assert len(github.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_failure_keeps_last_known_version_and_backs_off(self, github, monkeypatch):
+        await config.get_latest_version_cached("1.0.0")
+        now = config.time.time()
+        monkeypatch.setattr(config.time, "time", lambda: now + config.VERSION_CACHE_TTL + 1)
+        github.result = RuntimeError("rate limited")
+
+        assert await config._refresh_version_single_flight("1.0.0") == ("1.1.0", True)
+        assert config._version_cache.check_failed
+        # Within the backoff the last known result is served without a fetch
+        assert await config.get_latest_version_cached("1.0.0") == ("1.1.0", True)
+        assert len(github.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_is_served_while_refreshing_in_background(
+        self, github, monkeypatch
+    ):
+        await config.get_latest_version_cached("1.0.0")
+        now = config.time.time()
+        monkeypatch.setattr(config.time, "time", lambda: now + config.VERSION_CACHE_TTL + 1)
+        github.result = ("1.2.0", '"etag-2"')
+
+        assert await config.get_latest_version_cached("1.0.0") == ("1.1.0", True)
+        await config._version_refresh_task
+        assert config._version_cache.latest_version == "1.2.0"
+
+    @pytest.mark.asyncio
+    async def test_not_modified_keeps_cached_version(self, github, monkeypatch):
+        await config.get_latest_version_cached("1.0.0")
+        now = config.time.time()
+        monkeypatch.setattr(config.time, "time", lambda: now + config.VERSION_CACHE_TTL + 1)
+        github.result = (None, '"etag-1"')
+
+        assert await config._refresh_version_single_flight("1.0.0") == ("1.1.0", True)
+        assert github.calls == [None, '"etag-1"']
+        assert config._version_cache.timestamp == now + config.VERSION_CACHE_TTL + 1
+
+    @pytest.mark.asyncio
+    async def test_not_modified_without_cached_version_is_a_failed_check(self, github):
+        github.result = (None, '"etag-1"')
+
+        assert await config._refresh_version_single_flight("1.0.0") == (None, False)
+        assert config._version_cache.check_failed
+
+
+class TestConfigResponseCache:
+    @pytest.mark.asyncio
+    async def test_payload_is_reused_within_ttl(self, monkeypatch):
+        builds = []
+
+        async def build_config():
+            builds.append(1)
+            await asyncio.sleep(0)
+            return {"version": "1.0.0", "dbStatus": "online"}
+
+        monkeypatch.setattr(config, "_build_config", build_config)
+
+        responses = await asyncio.gather(*(config.get_config(None) for _ in range(3)))
+
+        assert len(builds) == 1
+        assert {r.body for r in responses} == {b'{"version":"1.0.0","dbStatus":"online"}'}
+
+    @pytest.mark.asyncio
+    async def test_payload_is_rebuilt_after_ttl(self, monkeypatch):
+        builds = []
+
+        async def build_config():
+            builds.append(1)
+            return {"dbStatus": "online"}
+
+        now = config.time.monotonic()
+        monkeypatch.setattr(config, "_build_config", build_config)
+        monkeypatch.setattr(config.time, "monotonic", lambda: now)
+        await config.get_config(None)
+        monkeypatch.setattr(
+            config.time, "monotonic", lambda: now + config.CONFIG_RESPONSE_CACHE_TTL + 1
+        )
+        await config.get_config(None)
+
+        assert len(builds) == 2
+
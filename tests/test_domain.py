@@ -5,16 +5,18 @@ This test suite focuses on validation logic, business rules, and data structures
 that can be tested without database mocking.
 """
 
+from types import SimpleNamespace
+
 import pytest
 from pydantic import ValidationError
 
 from open_notebook.domain.base import RecordModel
 from open_notebook.domain.content_settings import ContentSettings
 from open_notebook.domain.models import ModelManager
-from open_notebook.domain.notebook import Note, Notebook, Source
+from open_notebook.domain.notebook import ChatSession, Note, Notebook, Source
 from open_notebook.domain.podcast import EpisodeProfile, SpeakerProfile
 from open_notebook.domain.transformation import Transformation
-from open_notebook.exceptions import InvalidInputError
+from open_notebook.exceptions import DatabaseOperationError, InvalidInputError
 
 # ============================================================================
 # TEST SUITE 1: RecordModel Singleton Pattern
@@ -120,6 +122,87 @@ class TestSourceDomain:
         assert "command" in save_data
 
 
+class FakeSurrealConnection:
+    """Stands in for AsyncSurreal.query_raw, returning its per-statement result shape."""
+
+    def __init__(self):
+        self.records = {}
+        self.edges = []
+        self.calls = 0
+
+    async def query_raw(self, query, params=None):
+        self.calls += 1
+        record_id = str(params["id"])
+        if record_id in self.records:
+            return {
+                "result": [
+                    {"result": f"Database record `{record_id}` already exists", "status": "ERR"},
+                    {"result": "The query was not executed due to a failed transaction", "status": "ERR"},
+                ]
+            }
+        record = {**params["data"], "id": params["id"]}
+        self.records[record_id] = record
+        results = [{"result": record, "status": "OK"}]
+        if "RELATE" in query:
+            edges = [
+                {"id": f"reference:{i}", "in": params["id"], "out": target}
+                for i, target in enumerate(params["targets"])
+            ]
+            self.edges.extend(edges)
+            results.append({"result": edges, "status": "OK"})
+        return {"result": results}
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    from open_notebook.database import repository
+
+    fake = FakeSurrealConnection()
+
+    async def get_client():
+        return fake
+
+    monkeypatch.setattr(repository, "_get_client", get_client)
+    return fake
+
+
+class TestSourceSaveWithNotebooks:
+    """Test suite for creating a source and its notebook references together."""
+
+    @pytest.mark.asyncio
+    async def test_creates_reference_edge_per_notebook(self, fake_db):
+        source = Source(title="Test")
+        await source.save_with_notebooks(["notebook:a", "b"])
+
+        assert source.id.startswith("source:")
+        assert fake_db.calls == 1
+        assert [(str(e["in"]), str(e["out"])) for e in fake_db.edges] == [
+            (source.id, "notebook:a"),
+            (source.id, "notebook:b"),
+        ]
+        assert source.created is not None
+
+    @pytest.mark.asyncio
+    async def test_failed_statement_is_not_replayed(self, fake_db):
+        fake_db.records["source:dup"] = {}
+        source = Source(id="source:dup", title="Test")
+
+        with pytest.raises(DatabaseOperationError, match="already exists"):
+            await source.save_with_notebooks(["notebook:a"])
+        assert fake_db.calls == 1
+        assert fake_db.edges == []
+
+    @pytest.mark.asyncio
+    async def test_validation_error_is_not_wrapped(self, fake_db):
+        source = Source(title="Test")
+        source.title = 123
+
+        with pytest.raises(ValidationError):
+            await source.save_with_notebooks(["notebook:a"])
+        assert source.id is None
+        assert fake_db.calls == 0
+
+
 # ============================================================================
 # TEST SUITE 5: Note Domain
 # ============================================================================
@@ -304,5 +387,184 @@ class TestEpisodeProfile:
         assert profile.num_segments == 5
 
 
+# ============================================================================
+# TEST SUITE 10: Batched and Owner-Filtered Queries
+# ============================================================================
+
+
+@pytest.fixture
+def fake_repo_query(monkeypatch):
+    """Patch repo_query in the domain modules; returns the recorded calls and canned rows."""
+    from open_notebook.domain import base, notebook, transformation
+
+    state = SimpleNamespace(calls=[], rows=[])
+
+    async def repo_query(query, vars=None):
+        state.calls.append((" ".join(query.split()), vars or {}))
+        return state.rows
+
+    for module in (base, notebook, transformation):
+        monkeypatch.setattr(module, "repo_query", repo_query)
+    return state
+
+
+class TestGetMany:
+    """Test suite for ObjectModel.get_many."""
+
+    @pytest.mark.asyncio
+    async def test_fetches_all_ids_in_one_query(self, fake_repo_query):
+        fake_repo_query.rows = [
+            {"id": "note:a", "title": "A", "content": "x"},
+            {"id": "note:b", "title": "B", "content": "y"},
+        ]
+
+        notes = await Note.get_many(["note:a", "note:b", "note:missing"])
+
+        assert list(notes) == ["note:a", "note:b"]
+        assert notes["note:b"].title == "B"
+        [(query, params)] = fake_repo_query.calls
+        assert query == "SELECT * FROM $ids"
+        assert [str(i) for i in params["ids"]] == ["note:a", "note:b", "note:missing"]
+
+    @pytest.mark.asyncio
+    async def test_owner_is_filtered_in_the_query(self, fake_repo_query):
+        await Note.get_many(["note:a"], owner="user:me")
+
+        [(query, params)] = fake_repo_query.calls
+        assert query == "SELECT * FROM $ids WHERE owner = $owner"
+        assert str(params["owner"]) == "user:me"
+
+    @pytest.mark.asyncio
+    async def test_no_ids_skips_the_query(self, fake_repo_query):
+        assert await Note.get_many([]) == {}
+        assert fake_repo_query.calls == []
+
+
+
+class TestChatSessionsForNotebook:
+    """Test suite for owner-filtered chat session lookup."""
+
+    @pytest.mark.asyncio
+    async def test_owner_is_filtered_in_the_query(self, fake_repo_query):
+        fake_repo_query.rows = [{"id": "chat_session:a", "title": "Mine", "owner": "user:me"}]
+
+        sessions = await Notebook(id="notebook:n1", name="N", description="").get_chat_sessions(
+            owner="user:me"
+        )
+
+        assert [s.id for s in sessions] == ["chat_session:a"]
+        [(query, params)] = fake_repo_query.calls
+        assert "where owner = $owner and $id in ->refers_to->notebook" in query
+        assert (str(params["id"]), str(params["owner"])) == ("notebook:n1", "user:me")
+
+    @pytest.mark.asyncio
+    async def test_without_owner_reads_the_notebook_edges(self, fake_repo_query):
+        fake_repo_query.rows = [{"chat_session": [{"id": "chat_session:a", "title": "Any"}]}]
+
+        sessions = await ChatSession.get_for_notebook("notebook:n1")
+
+        assert [s.id for s in sessions] == ["chat_session:a"]
+        [(query, params)] = fake_repo_query.calls
+        assert "owner" not in params
+
+
+
+class TestOwnerFilteredNotes:
+    """Test suite for owner-filtered note listings."""
+
+    @pytest.mark.asyncio
+    async def test_get_all_filters_owner_before_ordering(self, fake_repo_query):
+        fake_repo_query.rows = [{"id": "note:a", "title": "A", "content": "x", "owner": "user:me"}]
+
+        notes = await Note.get_all(order_by="updated desc", owner="user:me")
+
+        assert [n.id for n in notes] == ["note:a"]
+        [(query, params)] = fake_repo_query.calls
+        assert query == "SELECT * FROM note WHERE owner = $owner ORDER BY updated desc"
+        assert str(params["owner"]) == "user:me"
+
+    @pytest.mark.asyncio
+    async def test_notebook_notes_filter_owner_on_the_edge(self, fake_repo_query):
+        fake_repo_query.rows = [{"note": {"id": "note:a", "title": "A", "owner": "user:me"}}]
+
+        notes = await Notebook(id="notebook:n1", name="N", description="").get_notes(
+            owner="user:me"
+        )
+
+        assert [n.id for n in notes] == ["note:a"]
+        [(query, params)] = fake_repo_query.calls
+        assert "where out=$id and in.owner = $owner" in query
+        assert str(params["owner"]) == "user:me"
+
+
+
+class TestDefaultTransformationIds:
+    """Test suite for the per-owner default transformation id cache."""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        from open_notebook.domain import transformation
+
+        transformation._default_ids_cache.clear()
+        yield
+        transformation._default_ids_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_ids_are_cached_per_owner(self, fake_repo_query):
+        fake_repo_query.rows = [{"id": "transformation:t1"}]
+
+        assert await Transformation.get_default_ids("user:a") == ["transformation:t1"]
+        assert await Transformation.get_default_ids("user:a") == ["transformation:t1"]
+        await Transformation.get_default_ids("user:b")
+
+        assert [str(params["owner"]) for _, params in fake_repo_query.calls] == [
+            "user:a",
+            "user:b",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_cached_ids_expire(self, fake_repo_query, monkeypatch):
+        import time
+
+        from open_notebook.domain import transformation
+
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now)
+        await Transformation.get_default_ids("user:a")
+        monkeypatch.setattr(
+            time,
+            "monotonic",
+            lambda: now + transformation.DEFAULT_TRANSFORMATIONS_CACHE_TTL + 1,
+        )
+        await Transformation.get_default_ids("user:a")
+
+        assert len(fake_repo_query.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_save_clears_the_cache(self, fake_repo_query, monkeypatch):
+        from open_notebook.domain import base
+
+        async def save(self):
+            return None
+
+        monkeypatch.setattr(base.ObjectModel, "save", save)
+        await Transformation.get_default_ids("user:a")
+        await Transformation(
+            name="n", title="t", description="d", prompt="p", apply_default=True
+        ).save()
+        await Transformation.get_default_ids("user:a")
+
+        assert len(fake_repo_query.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_callers_cannot_mutate_the_cache(self, fake_repo_query):
+        fake_repo_query.rows = [{"id": "transformation:t1"}]
+
+        ids = await Transformation.get_default_ids("user:a")
+        ids.append("transformation:extra")
+
+        assert await Transformation.get_default_ids("user:a") == ["transformation:t1"]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
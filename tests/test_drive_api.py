@@ -0,0 +1,117 @@
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from open_notebook.utils.google_drive import DriveFile
+
+FOLDER_URL = "https://drive.google.com/drive/folders/folder123"
+
+
+class FakeDriveClient:
+    def __init__(self, files, fail_after=None, fail_with=None):
+        self.files = files
+        self.fail_after = fail_after
+        self.fail_with = fail_with
+        self.closed = False
+
+    async def iter_children(self, folder_id, resource_key=None, recursive=True, max_items=500):
+        try:
+            for i, f in enumerate(self.files):
+                if self.fail_after is not None and i == self.fail_after:
+                    raise self.fail_with
+                yield f
+        finally:
+            self.closed = True
+
+
+@pytest.fixture
+def client():
+    from api.main import app
+
+    return TestClient(app)
+
+
+def _use_drive_client(monkeypatch, fake):
+    from api.routers import drive
+
+    async def from_user(user_id):
+        return fake
+
+    monkeypatch.setattr(drive.GoogleDriveClient, "from_user", staticmethod(from_user))
+
+
+def test_resolve_stream_emits_one_json_object_per_line(monkeypatch, client):
+    fake = FakeDriveClient(
+        [
+            DriveFile(id="f1", name="a.pdf", mime_type="application/pdf"),
+            DriveFile(id="f2", name="Doc", mime_type="application/vnd.google-apps.document"),
+        ]
+    )
+    _use_drive_client(monkeypatch, fake)
+
+    resp = client.post("/api/drive/resolve/stream", json={"url": FOLDER_URL})
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    assert resp.content.endswith(b"\n")
+    items = [orjson.loads(line) for line in resp.content.splitlines()]
+    assert [item["id"] for item in items] == ["f1", "f2"]
+    assert items[0]["is_google_doc"] is False
+    assert items[1]["is_google_doc"] is True
+    assert items[1]["web_view_url"] == FOLDER_URL
+    assert fake.closed
+
+
+def test_resolve_stream_ends_with_error_line_on_late_failure(monkeypatch, client):
+    fake = FakeDriveClient(
+        [DriveFile(id="f1", name="a.pdf", mime_type="application/pdf")] * 2,
+        fail_after=1,
+        fail_with=RuntimeError("page fetch failed"),
+    )
+    _use_drive_client(monkeypatch, fake)
+
+    resp = client.post("/api/drive/resolve/stream", json={"url": FOLDER_URL})
+
+    assert resp.status_code == 200
+    lines = [orjson.loads(line) for line in resp.content.splitlines()]
+    assert lines[0]["id"] == "f1"
+    assert lines[-1] == {"error": "Failed to resolve Drive link"}
+    assert fake.closed
+
+
+def test_resolve_stream_maps_first_failure_to_status(monkeypatch, client):
+    fake = FakeDriveClient(
+        [DriveFile(id="f1", name="a.pdf", mime_type="application/pdf")],
+        fail_after=0,
+        fail_with=PermissionError("no access"),
+    )
+    _use_drive_client(monkeypatch, fake)
+
+    resp = client.post("/api/drive/resolve/stream", json={"url": FOLDER_URL})
+
+    assert resp.status_code == 403
+    assert fake.closed
+
+
+@pytest.mark.asyncio
+async def test_resolve_stream_closes_listing_when_client_disconnects(monkeypatch):
+    from api.routers.drive import DriveResolveRequest, resolve_drive_link_stream
+
+    fake = FakeDriveClient(
+        [DriveFile(id=f"f{i}", name="a.pdf", mime_type="application/pdf") for i in range(3)]
+    )
+    _use_drive_client(monkeypatch, fake)
+
+    resp = await resolve_drive_link_stream(
+        payload=DriveResolveRequest(url=FOLDER_URL), user_id="user:dev"
+    )
+    body = resp.body_iterator
+    await anext(body)
+    await body.aclose()  # what Starlette does when the client goes away
+
+    assert fake.closed
+
+
+def test_resolve_stream_rejects_non_drive_url(client):
+    resp = client.post("/api/drive/resolve/stream", json={"url": "https://example.com/x"})
+    assert resp.status_code == 400
@@ -18,6 +18,7 @@ from open_notebook.graphs.transformation import (
 from open_notebook.graphs.transformation import (
     graph as transformation_graph,
 )
+from open_notebook.utils import TTLCache
 
 # ============================================================================
 # TEST SUITE 1: Graph Tools
@@ -154,5 +155,74 @@ class TestTransformationGraph:
         assert hasattr(transformation_graph, "ainvoke")
 
 
+# ============================================================================
+# TEST SUITE 4: Chat Graph
+# ============================================================================
+
+
+class TestChatSystemPrompt:
+    """Test suite for the chat system prompt token-count cache."""
+
+    def test_token_count_cached_per_rendered_prompt(self, monkeypatch):
+        """Repeated turns reuse the token count; only ints are retained."""
+        from open_notebook.graphs import chat as chat_graph_module
+
+        class FakePrompter:
+            def __init__(self, prompt_template):
+                pass
+
+            def render(self, data):
+                return f"system prompt with {data['context']}"
+
+        counted = []
+
+        def fake_token_count(text):
+            counted.append(text)
+            return len(text)
+
+        monkeypatch.setattr(chat_graph_module, "Prompter", FakePrompter)
+        monkeypatch.setattr(chat_graph_module, "token_count", fake_token_count)
+        monkeypatch.setattr(
+            chat_graph_module, "_system_prompt_tokens_cache", TTLCache(maxsize=8)
+        )
+
+        state = {"notebook": None, "context": {"sources": ["a"]}, "messages": []}
+        first = chat_graph_module._render_system_prompt(state)
+        second = chat_graph_module._render_system_prompt(state)
+
+        assert first == second
+        assert first[0].startswith("system prompt with")
+        assert len(counted) == 1
+        cache = chat_graph_module._system_prompt_tokens_cache
+        [key] = cache
+        assert isinstance(key, bytes)
+        assert cache.get(key) == first[1]
+
+        other = dict(state, context={"sources": ["b"]})
+        chat_graph_module._render_system_prompt(other)
+        assert len(counted) == 2
+
+    def test_token_count_cache_is_bounded(self, monkeypatch):
+        """Oldest entries are evicted once the cache is full."""
+        from open_notebook.graphs import chat as chat_graph_module
+
+        class FakePrompter:
+            def __init__(self, prompt_template):
+                pass
+
+            def render(self, data):
+                return str(data["context"])
+
+        monkeypatch.setattr(chat_graph_module, "Prompter", FakePrompter)
+        monkeypatch.setattr(chat_graph_module, "token_count", len)
+        monkeypatch.setattr(
+            chat_graph_module, "_system_prompt_tokens_cache", TTLCache(maxsize=2)
+        )
+
+        for i in range(5):
+            chat_graph_module._render_system_prompt({"context": i})
+        assert len(chat_graph_module._system_prompt_tokens_cache) == 2
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
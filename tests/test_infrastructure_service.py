@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from api import infrastructure_service as infra
+
+CONFIG = infra.DbVmConfig(project="p", zone="z", name="db")
+
+
+@pytest.fixture
+def compute(monkeypatch):
+    """Record Compute API calls instead of sending them."""
+    calls = []
+    responses = {}
+
+    async def fake_request(method, url):
+        calls.append((method, url.rsplit("/", 1)[-1]))
+        await asyncio.sleep(0)
+        response = responses.get(method, {})
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(infra, "_request", fake_request)
+    monkeypatch.setattr(infra, "get_db_vm_config", lambda: CONFIG)
+    infra._invalidate_status_cache()
+    yield calls, responses
+    infra._invalidate_status_cache()
+
+
+class TestDbVmStatusCache:
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_request(self, compute):
+        calls, responses = compute
+        responses["GET"] = {"status": "RUNNING"}
+
+        statuses = await asyncio.gather(*(infra.get_db_vm_status() for _ in range(5)))
+
+        assert statuses == ["RUNNING"] * 5
+        assert calls == [("GET", "db")]
+
+    @pytest.mark.asyncio
+    async def test_status_is_refetched_after_ttl(self, compute, monkeypatch):
+        calls, responses = compute
+        responses["GET"] = {"status": "RUNNING"}
+        now = infra.time.monotonic()
+        monkeypatch.setattr(infra.time, "monotonic", lambda: now)
+
+        await infra.get_db_vm_status()
+        await infra.get_db_vm_status()
+        assert len(calls) == 1
+
+        responses["GET"] = {"status": "SUSPENDED"}
+        monkeypatch.setattr(
+            infra.time, "monotonic", lambda: now + infra.VM_STATUS_CACHE_TTL + 1
+        )
+        assert await infra.get_db_vm_status() == "SUSPENDED"
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_start_invalidates_cached_status(self, compute):
+        calls, responses = compute
+        responses["GET"] = {"status": "SUSPENDED"}
+
+        result = await infra.start_db_vm()
+
+        assert calls == [("GET", "db"), ("POST", "resume")]
+        assert result["status"] == "SUSPENDED"
+        assert infra._cached_status() is None
+
+
+class TestSuspendDbVm:
+    @pytest.mark.asyncio
+    async def test_suspend_skips_status_read(self, compute):
+        calls, _ = compute
+
+        result = await infra.suspend_db_vm()
+
+        assert calls == [("POST", "suspend")]
+        assert result["action"] == "suspend"
+
+    @pytest.mark.asyncio
+    async def test_not_running_is_not_retried_as_stop(self, compute):
+        calls, responses = compute
+        responses["POST"] = infra.ComputeApiError(
+            "Compute API call failed", status_code=400, reason="conditionNotMet"
+        )
+
+        result = await infra.suspend_db_vm()
+
+        assert calls == [("POST", "suspend")]
+        assert result["operation"] is None
+
+    @pytest.mark.asyncio
+    async def test_other_suspend_errors_fall_back_to_stop(self, compute):
+        calls, responses = compute
+        responses["POST"] = infra.ComputeApiError(
+            "Compute API call failed", status_code=400, reason="unsupportedOperation"
+        )
+
+        with pytest.raises(infra.ComputeApiError):
+            await infra.suspend_db_vm()
+
+        assert calls == [("POST", "suspend"), ("POST", "stop")]
+
+    @pytest.mark.asyncio
+    async def test_cached_terminated_status_skips_calls(self, compute):
+        calls, responses = compute
+        responses["GET"] = {"status": "TERMINATED"}
+        await infra.get_db_vm_status()
+
+        result = await infra.suspend_db_vm()
+
+        assert calls == [("GET", "db")]
+        assert result == {"status": "TERMINATED", "operation": None}
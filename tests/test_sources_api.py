@@ -0,0 +1,189 @@
+import pytest
+from fastapi import HTTPException
+
+from open_notebook.exceptions import DatabaseOperationError, NotFoundError
+
+
+def test_shared_gcs_client_uses_pooled_authorized_session(monkeypatch):
+    import google.auth
+    from google.auth.credentials import AnonymousCredentials
+    from google.auth.transport.requests import AuthorizedSession
+
+    from api.routers import sources
+
+    monkeypatch.setattr(
+        google.auth, "default", lambda scopes=None: (AnonymousCredentials(), "test-project")
+    )
+    sources._get_gcs_client.cache_clear()
+    try:
+        client = sources._get_gcs_client()
+        assert sources._get_gcs_client() is client
+
+        session = client._http
+        assert isinstance(session, AuthorizedSession)
+        adapter = session.get_adapter("https://storage.googleapis.com/")
+        assert adapter._pool_maxsize == sources.GCS_HTTP_POOL_SIZE
+        assert client.project == "test-project"
+    finally:
+        sources._get_gcs_client.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_failed_insert_cancels_queued_command(monkeypatch):
+    from api.models import SourceCreate
+    from api.routers import sources
+
+    queries = []
+
+    async def fake_repo_query(query, vars=None):
+        queries.append((query, vars))
+        return [{"id": "command:abc"}] if query.startswith("SELECT") else []
+
+    async def submit_command_job(module_name, command_name, command_args, context=None):
+        return "command:abc"
+
+    async def get_default_ids(cls, owner=None):
+        return []
+
+    async def save_with_notebooks(self, notebook_ids):
+        raise DatabaseOperationError("insert failed")
+
+    async def delete(self):
+        return True
+
+    monkeypatch.setattr(sources, "repo_query", fake_repo_query)
+    monkeypatch.setattr(sources.CommandService, "submit_command_job", staticmethod(submit_command_job))
+    monkeypatch.setattr(sources.Transformation, "get_default_ids", classmethod(get_default_ids))
+    monkeypatch.setattr(sources.Source, "save_with_notebooks", save_with_notebooks)
+    monkeypatch.setattr(sources.Source, "delete", delete)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await sources.create_source_json(
+            SourceCreate(type="text", content="hello", async_processing=True),
+            user_id="user:dev",
+        )
+
+    assert exc_info.value.status_code == 500
+    cancels = [(q, v) for q, v in queries if "canceled" in q]
+    assert len(cancels) == 1
+    assert str(cancels[0][1]["id"]) == "command:abc"
+
+
+@pytest.mark.asyncio
+async def test_worker_checks_source_before_fetching_content(monkeypatch):
+    from commands import source_commands
+
+    fetched = []
+
+    async def missing(cls, id):
+        raise NotFoundError(f"{id} not found")
+
+    async def fetch(content_state, owner):
+        fetched.append(content_state)
+
+    monkeypatch.setattr(source_commands.Source, "get", classmethod(missing))
+    monkeypatch.setattr(source_commands, "_maybe_fetch_drive_file", fetch)
+
+    with pytest.raises(source_commands.SourceNotInsertedError):
+        await source_commands.process_source_command(
+            source_commands.SourceProcessingInput(
+                source_id="source:pending",
+                content_state={"drive_file_id": "f1"},
+                notebook_ids=[],
+                transformations=["transformation:t1"],
+                embed=False,
+            )
+        )
+    assert fetched == []
+
+
+@pytest.fixture
+def source_list_db(monkeypatch):
+    from api.routers import sources
+
+    calls = []
+    rows = {
+        "list": [
+            {
+                "id": "source:s1",
+                "title": "Done",
+                "created": "2026-01-01",
+                "updated": "2026-01-02",
+                "command": "command:c1",
+                "command_status": "completed",
+                "command_execution_metadata": {"started_at": "t0", "completed_at": "t1"},
+                "command_error": None,
+            },
+            {"id": "source:s2", "title": "Legacy", "created": "2026-01-01", "updated": "2026-01-01"},
+            {
+                "id": "source:s3",
+                "title": "Orphaned",
+                "created": "2026-01-01",
+                "updated": "2026-01-01",
+                "command": "command:gone",
+                "command_status": None,
+            },
+        ],
+        # Child rows; transformation insights are stored without an owner
+        "source_insight": [
+            {"source": "source:s1", "owner": "user:dev"},
+            {"source": "source:s1", "owner": None},
+            {"source": "source:other", "owner": "user:dev"},
+        ],
+        "source_embedding": [{"source": "source:s1", "owner": "user:dev"}],
+    }
+
+    async def fake_repo_query(query, vars=None):
+        table = next((t for t in ("source_insight", "source_embedding") if t in query), "list")
+        calls.append((table, vars))
+        if table == "list":
+            return rows[table]
+        # Apply the grouped scan's filters to the child rows
+        ids = {str(i) for i in vars["ids"]}
+        counts: dict = {}
+        for row in rows[table]:
+            if row["source"] not in ids:
+                continue
+            if "owner = $owner" in query and row["owner"] != str(vars["owner"]):
+                continue
+            counts[row["source"]] = counts.get(row["source"], 0) + 1
+        return [{"source": source, "count": count} for source, count in counts.items()]
+
+    monkeypatch.setattr(sources, "repo_query", fake_repo_query)
+    return calls
+
+
+def test_source_list_reads_command_status_from_the_list_query(source_list_db):
+    from fastapi.testclient import TestClient
+
+    from api.main import app
+
+    resp = TestClient(app).get("/api/sources")
+
+    assert resp.status_code == 200
+    done, legacy, orphaned = resp.json()
+    assert (done["command_id"], done["status"]) == ("command:c1", "completed")
+    assert done["processing_info"] == {"started_at": "t0", "completed_at": "t1", "error": None}
+    assert (legacy["command_id"], legacy["status"], legacy["processing_info"]) == (None, None, None)
+    # A linked command whose record is gone still reports a status
+    assert (orphaned["command_id"], orphaned["status"]) == ("command:gone", "unknown")
+    assert orphaned["processing_info"] is None
+    assert [table for table, _ in source_list_db].count("list") == 1
+    assert str(source_list_db[0][1]["owner"]) == "user:dev"
+
+
+def test_source_list_stats_take_one_query_per_table(source_list_db):
+    """Owner-less insights still count: the page's ids are already owner-scoped."""
+    from fastapi.testclient import TestClient
+
+    from api.main import app
+
+    resp = TestClient(app).get("/api/sources")
+
+    done, legacy, _ = resp.json()
+    assert (done["insights_count"], done["embedded"]) == (2, True)
+    assert (legacy["insights_count"], legacy["embedded"]) == (0, False)
+    stats = [(table, params) for table, params in source_list_db if table != "list"]
+    assert sorted(table for table, _ in stats) == ["source_embedding", "source_insight"]
+    for _, params in stats:
+        assert [str(i) for i in params["ids"]] == ["source:s1", "source:s2", "source:s3"]
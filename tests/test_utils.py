@@ -298,5 +298,89 @@ class TestContextBuilder:
         assert builder.include_insights is False
 
 
+# ============================================================================
+# TEST SUITE 5: Storage Utilities
+# ============================================================================
+
+
+class TestStorageUtilities:
+    """Test suite for upload filename reservation and local byte storage."""
+
+    def test_generate_unique_filename_keeps_free_name(self, tmp_path):
+        """A free name is reserved as-is."""
+        from open_notebook.utils.storage import generate_unique_filename
+
+        path = generate_unique_filename("report.pdf", str(tmp_path))
+        assert path == str(tmp_path / "report.pdf")
+        assert (tmp_path / "report.pdf").exists()
+
+    def test_generate_unique_filename_avoids_clash(self, tmp_path):
+        """A taken name gets a token appended and never reuses a path."""
+        from open_notebook.utils.storage import generate_unique_filename
+
+        first = generate_unique_filename("report.pdf", str(tmp_path))
+        second = generate_unique_filename("report.pdf", str(tmp_path))
+        assert first != second
+        assert second.startswith(str(tmp_path / "report ("))
+        assert second.endswith(").pdf")
+
+    def test_save_bytes_removes_reservation_on_failure(self, tmp_path, monkeypatch):
+        """A failed write doesn't leave an empty reserved file behind."""
+        from open_notebook.utils import storage
+
+        monkeypatch.setattr(storage, "STORAGE_BACKEND", "local")
+        monkeypatch.setattr(storage, "UPLOADS_FOLDER", str(tmp_path))
+
+        with pytest.raises(TypeError):
+            storage.save_bytes_to_storage("not bytes", "report.pdf")  # type: ignore[arg-type]
+        assert list(tmp_path.iterdir()) == []
+
+        path = storage.save_bytes_to_storage(b"data", "report.pdf")
+        assert open(path, "rb").read() == b"data"
+
+
+
+# ============================================================================
+# TEST SUITE 6: TTL Cache
+# ============================================================================
+
+
+class TestTTLCache:
+    """Test suite for the bounded in-process TTL cache."""
+
+    def test_entries_expire_after_ttl(self, monkeypatch):
+        """An entry is served until its ttl passes, then dropped."""
+        import time
+
+        from open_notebook.utils import TTLCache
+
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now)
+        cache: TTLCache[str, int] = TTLCache(maxsize=4, ttl=10)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=30)
+        assert cache.get("a") == 1
+
+        monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert len(cache) == 1
+
+    def test_oldest_entry_is_evicted_when_full(self):
+        """Setting a new key on a full cache evicts the oldest; updates don't."""
+        from open_notebook.utils import TTLCache
+
+        cache: TTLCache[str, int] = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("b", 3)
+        assert list(cache) == ["a", "b"]
+
+        cache.set("c", 4)
+        assert list(cache) == ["b", "c"]
+        assert cache.get("a") is None
+        assert cache.get("b") == 3
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])